@@ -45,7 +45,15 @@ import hcraft.requirements as requirements
 import hcraft.env as env
 import hcraft.examples as examples
 import hcraft.world as world
+import hcraft.compiled as compiled
+import hcraft.compiled_purpose as compiled_purpose
+import hcraft.reachability as reachability
+import hcraft.heuristics as heuristics
 import hcraft.planning as planning
+import hcraft.plan_cache as plan_cache
+import hcraft.plan_validation as plan_validation
+import hcraft.pddl as pddl
+import hcraft.episode_metrics as episode_metrics
 
 from hcraft.elements import Item, Stack, Zone
 from hcraft.transformation import Transformation
@@ -74,7 +82,15 @@ __all__ = [
     "solving_behaviors",
     "requirements",
     "world",
+    "compiled",
+    "compiled_purpose",
+    "reachability",
+    "heuristics",
     "env",
     "planning",
+    "plan_cache",
+    "plan_validation",
+    "pddl",
+    "episode_metrics",
     "examples",
 ]
@@ -44,12 +44,10 @@ class GetItem(Behavior):
         graph = HEBGraph(behavior=self, all_behaviors=self.all_behaviors)
 
         # Any of the Tranformation that gives the item
-        for transfo in self.env.world.transformations:
-            produced_items = transfo.production("player")
-            item_is_added = self.item in produced_items
+        for transfo in self.env.world.producers(self.item):
             required_items = transfo.min_required("player")
             item_is_not_required = self.item not in required_items
-            if item_is_added and item_is_not_required:
+            if item_is_not_required:
                 sub_behavior = Behavior(AbleAndPerformTransformation.get_name(transfo))
                 graph.add_node(sub_behavior)
 
@@ -130,7 +128,7 @@ class PlaceItem(Behavior):
                 graph.add_node(sub_behavior)
 
         # Any of the Tranformation that places the item in the given zone
-        for transfo in self.env.world.transformations:
+        for transfo in self.env.world.zone_item_producers(self.item):
             is_added = self._zone_item_is_added(transfo)
             is_required = self._zone_item_is_required(transfo)
             if is_added and not is_required:
@@ -218,10 +216,9 @@ class ReachZone(Behavior):
         graph = HEBGraph(behavior=self, all_behaviors=self.all_behaviors)
 
         # Any of the Tranformation that has the zone as destination
-        for transfo in self.env.world.transformations:
-            if transfo.destination is not None and transfo.destination == self.zone:
-                sub_behavior = Behavior(AbleAndPerformTransformation.get_name(transfo))
-                graph.add_node(sub_behavior)
+        for transfo in self.env.world.entering(self.zone):
+            sub_behavior = Behavior(AbleAndPerformTransformation.get_name(transfo))
+            graph.add_node(sub_behavior)
 
         _ensure_has_node(graph, self)
         return graph
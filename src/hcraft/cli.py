@@ -5,6 +5,7 @@ from hcraft.elements import Item
 from hcraft.env import HcraftEnv
 from hcraft.examples import (
     MineHcraftEnv,
+    ProceduralHcraftEnv,
     RandomHcraftEnv,
     LightRecursiveHcraftEnv,
     RecursiveHcraftEnv,
@@ -34,6 +35,7 @@ def hcraft_cli(args: Optional[List[str]] = None) -> HcraftEnv:
     _light_recursive_sub_parser(subparsers)
     _treasure_sub_parser(subparsers)
     _random_sub_parser(subparsers)
+    _procedural_sub_parser(subparsers)
 
     parser.add_argument(
         "--max-step",
@@ -298,5 +300,58 @@ def _randomhcraft_from_cli(args: Namespace):
     )
 
 
+def _procedural_sub_parser(subparsers: "_SubParsersAction[ArgumentParser]"):
+    subparser = subparsers.add_parser(
+        "procedural",
+        help="ProceduralHcraft: Procedurally generated large-scale worlds.",
+        description="The goal of the environment is to get the last item"
+        " of the last layer of a procedurally generated world."
+        " Items are spread over 'depth' layers, each item consumes items"
+        " from previous layers and everything is reachable by construction.",
+    )
+    subparser.set_defaults(func=_proceduralhcraft_from_cli)
+    subparser.add_argument(
+        "--n-items", "-n", type=int, default=30, help="Number of items."
+    )
+    subparser.add_argument(
+        "--n-zones", "-z", type=int, default=3, help="Number of zones."
+    )
+    subparser.add_argument(
+        "--n-zones-items",
+        "-zi",
+        type=int,
+        default=3,
+        help="Number of items that can be placed in zones.",
+    )
+    subparser.add_argument(
+        "--depth", "-d", type=int, default=5, help="Number of layers of items."
+    )
+    subparser.add_argument(
+        "--inputs-probabilities",
+        "-p",
+        type=float,
+        nargs="+",
+        default=[0.3, 0.4, 0.2, 0.1],
+        help="Probability for a recipe to have 1, 2, ... inputs.",
+    )
+    subparser.add_argument(
+        "--seed", type=int, default=None, help="Seed of the random generator."
+    )
+
+
+def _proceduralhcraft_from_cli(args: Namespace):
+    window = _window_from_cli(args)
+    return ProceduralHcraftEnv(
+        n_items=args.n_items,
+        n_zones=args.n_zones,
+        n_zones_items=args.n_zones_items,
+        depth=args.depth,
+        inputs_probabilities=args.inputs_probabilities,
+        seed=args.seed,
+        render_window=window,
+        max_step=args.max_step,
+    )
+
+
 if __name__ == "__main__":
     hcraft_cli()
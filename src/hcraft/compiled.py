@@ -0,0 +1,668 @@
+"""# Compiled world
+
+A compiled world is a flat array representation of a `hcraft.world.World`
+meant for fast and batched computations over many states at once.
+
+Each state is flattened as a single integer vector:
+`[player_inventory (I), position (Z), zones_inventories (Z*J)]`
+where I is the number of items, Z the number of zones and J the number of zones items.
+
+Transformations are stored as sparse rows (CSR) of minimum conditions,
+maximum conditions and inventory changes over this flat state.
+Operations on the destination or on specific zones are stored with absolute slots.
+Operations on the current zone of zone-restricted transformations are also absolute,
+the others are stored relatively to the current zone, in their own sparse rows.
+
+A compiled world is usually obtained lazily from a world:
+
+```python
+compiled = env.world.compiled
+state = compiled.state_from(env.state)
+valid_actions = compiled.valid_mask(state)
+next_state = compiled.apply(state, valid_actions.nonzero()[0][0])
+```
+
+It can also be generated directly for large-scale worlds,
+see `hcraft.examples.procedural`.
+
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from hcraft.elements import Item, Stack, Zone
+from hcraft.transformation import (
+    CURRENT_ZONE,
+    DESTINATION,
+    PLAYER,
+    InventoryOperation,
+    InventoryOwner,
+    Transformation,
+    Use,
+    Yield,
+)
+
+if TYPE_CHECKING:
+    from hcraft.state import HcraftState
+    from hcraft.world import World
+
+NO_ZONE = -1
+"""Value used in `CompiledWorld.zone` and `CompiledWorld.destination` when unset."""
+
+
+@dataclass
+class SparseRows:
+    """Compressed sparse rows of integer values.
+
+    Rows are transformations unless stated otherwise.
+    """
+
+    indptr: np.ndarray
+    """Start of each row in indices and values, with one extra final end."""
+    indices: np.ndarray
+    """Column of each stored value."""
+    values: np.ndarray
+    """Stored values."""
+    rows: np.ndarray = field(init=False, repr=False)
+    """Row of each stored value."""
+
+    def __post_init__(self):
+        self.rows = np.repeat(
+            np.arange(self.n_rows, dtype=np.int32), np.diff(self.indptr)
+        )
+
+    @property
+    def n_rows(self) -> int:
+        """Number of rows."""
+        return self.indptr.shape[0] - 1
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored values."""
+        return self.indices.shape[0]
+
+    @classmethod
+    def from_coo(
+        cls,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        values: np.ndarray,
+        n_rows: int,
+        reduce: np.ufunc = np.add,
+    ) -> "SparseRows":
+        """Build sparse rows from coordinates, reducing duplicated coordinates.
+
+        Args:
+            rows: Row of each value.
+            cols: Column of each value.
+            values: Values to store.
+            n_rows: Total number of rows.
+            reduce: Ufunc used to combine values sharing the same coordinates.
+                Defaults to np.add.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        if values.shape[0] == 0:
+            return cls(indptr=indptr, indices=cols, values=values)
+
+        n_cols = int(cols.max()) + 1
+        keys, inverse = np.unique(rows * n_cols + cols, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        starts = np.flatnonzero(np.r_[True, np.diff(inverse[order]) != 0])
+        values = reduce.reduceat(values[order], starts)
+        np.cumsum(np.bincount(keys // n_cols, minlength=n_rows), out=indptr[1:])
+        return cls(indptr=indptr, indices=keys % n_cols, values=values)
+
+    @classmethod
+    def empty(cls, n_rows: int) -> "SparseRows":
+        """Sparse rows without any stored value."""
+        no_values = np.array([], dtype=np.int64)
+        return cls.from_coo(no_values, no_values, no_values, n_rows)
+
+    def row(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Columns and values stored in the given row."""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:end], self.values[start:end]
+
+    def count_per_row(self, flags: np.ndarray) -> np.ndarray:
+        """Count true flags in each row.
+
+        Args:
+            flags: Boolean array of shape (..., nnz), one flag per stored value.
+
+        Returns:
+            Integer array of shape (..., n_rows).
+        """
+        return self.sum_per_row(flags)
+
+    def sum_per_row(self, per_value: np.ndarray) -> np.ndarray:
+        """Sum quantities given for each stored value in each row.
+
+        Args:
+            per_value: Array of shape (..., nnz), one quantity per stored value.
+
+        Returns:
+            Array of shape (..., n_rows).
+        """
+        dtype = np.float64 if per_value.dtype.kind == "f" else np.int64
+        cumsum = np.zeros(per_value.shape[:-1] + (self.nnz + 1,), dtype=dtype)
+        np.cumsum(per_value, axis=-1, out=cumsum[..., 1:])
+        return cumsum[..., self.indptr[1:]] - cumsum[..., self.indptr[:-1]]
+
+    def dot(self, vectors: np.ndarray) -> np.ndarray:
+        """Dot product of each row with the given dense vectors.
+
+        Args:
+            vectors: Array of shape (..., n_columns).
+
+        Returns:
+            Array of shape (..., n_rows).
+        """
+        return self.sum_per_row(vectors[..., self.indices] * self.values)
+
+    def gather(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of the values of each given row.
+
+        Args:
+            rows: Rows to gather, possibly repeated.
+
+        Returns:
+            The index in rows of each gathered value and its position in indices.
+        """
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        owners = np.repeat(np.arange(rows.shape[0]), lengths)
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.arange(owners.shape[0]) - offsets[owners] + starts[owners]
+        return owners, positions
+
+
+@dataclass
+class CompiledWorld:
+    """Flat array representation of a HierarchyCraft world.
+
+    See `hcraft.compiled` for the layout of states and transformations.
+    """
+
+    n_items: int
+    n_zones: int
+    n_zones_items: int
+
+    min_conditions: SparseRows
+    """Minimum amounts required in absolute state slots."""
+    max_conditions: SparseRows
+    """Maximum amounts allowed in absolute state slots."""
+    changes: SparseRows
+    """Changes of amounts in absolute state slots."""
+
+    current_min_conditions: SparseRows
+    """Minimum amounts required in current zone items slots."""
+    current_max_conditions: SparseRows
+    """Maximum amounts allowed in current zone items slots."""
+    current_changes: SparseRows
+    """Changes of amounts in current zone items slots."""
+
+    zone: np.ndarray
+    """Zone slot to which each transformation is restricted, NO_ZONE if unrestricted."""
+    destination: np.ndarray
+    """Destination zone slot of each transformation, NO_ZONE if not moving."""
+
+    initial_state: np.ndarray
+    """Flat initial state."""
+
+    @property
+    def n_transformations(self) -> int:
+        """Number of transformations."""
+        return self.zone.shape[0]
+
+    @property
+    def state_size(self) -> int:
+        """Size of flat states."""
+        return self.n_items + self.n_zones + self.n_zones * self.n_zones_items
+
+    @property
+    def position_offset(self) -> int:
+        """First slot of the position in flat states."""
+        return self.n_items
+
+    @property
+    def zones_offset(self) -> int:
+        """First slot of zones inventories in flat states."""
+        return self.n_items + self.n_zones
+
+    def zone_item_slot(self, zone_slot: int, zone_item_slot: int) -> int:
+        """Flat state slot of the given zone item in the given zone."""
+        return self.zones_offset + zone_slot * self.n_zones_items + zone_item_slot
+
+    def state_from(self, state: "HcraftState") -> np.ndarray:
+        """Flatten the given HierarchyCraft state."""
+        return np.concatenate(
+            (
+                state.player_inventory,
+                state.position,
+                state.zones_inventories.ravel(),
+            )
+        ).astype(np.int32)
+
+    def split_state(
+        self, state: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Split flat states into player inventories, positions and zones inventories.
+
+        Returned arrays are views on the given flat states.
+        """
+        player_inventory = state[..., : self.n_items]
+        position = state[..., self.n_items : self.zones_offset]
+        zones_inventories = state[..., self.zones_offset :].reshape(
+            state.shape[:-1] + (self.n_zones, self.n_zones_items)
+        )
+        return player_inventory, position, zones_inventories
+
+    def zone_slots(self, states: np.ndarray) -> np.ndarray:
+        """Current zone slot of each flat state, NO_ZONE if the world has no zone."""
+        if self.n_zones == 0:
+            return np.full(states.shape[:-1], NO_ZONE, dtype=np.int64)
+        return np.argmax(states[..., self.n_items : self.zones_offset], axis=-1)
+
+    def valid_mask(self, states: np.ndarray) -> np.ndarray:
+        """Validity of every transformation in the given flat states.
+
+        Args:
+            states: Flat state of shape (S,) or batch of flat states of shape (N, S).
+
+        Returns:
+            Boolean array of shape (T,) or (N, T).
+        """
+        batch = np.atleast_2d(states)
+        zone_slots = self.zone_slots(batch)[:, np.newaxis]
+        valid = (self.zone == NO_ZONE) | (self.zone == zone_slots)
+        valid &= (self.destination == NO_ZONE) | (self.destination != zone_slots)
+
+        failures = self.min_conditions.count_per_row(
+            batch[:, self.min_conditions.indices] < self.min_conditions.values
+        )
+        failures += self.max_conditions.count_per_row(
+            batch[:, self.max_conditions.indices] > self.max_conditions.values
+        )
+        if self.n_zones > 0:
+            failures += self._current_failures(batch, zone_slots)
+        valid &= failures == 0
+
+        if states.ndim == 1:
+            return valid[0]
+        return valid
+
+    def is_valid(self, state: np.ndarray, transformation_id: int) -> bool:
+        """Is the given transformation valid in the given flat state."""
+        zone_slot = int(self.zone_slots(state))
+        if self.zone[transformation_id] not in (NO_ZONE, zone_slot):
+            return False
+        destination = self.destination[transformation_id]
+        if destination != NO_ZONE and destination == zone_slot:
+            return False
+        slots, values = self.min_conditions.row(transformation_id)
+        if np.any(state[slots] < values):
+            return False
+        slots, values = self.max_conditions.row(transformation_id)
+        if np.any(state[slots] > values):
+            return False
+        if zone_slot == NO_ZONE:
+            return True
+        current_offset = self.zone_item_slot(zone_slot, 0)
+        slots, values = self.current_min_conditions.row(transformation_id)
+        if np.any(state[current_offset + slots] < values):
+            return False
+        slots, values = self.current_max_conditions.row(transformation_id)
+        if np.any(state[current_offset + slots] > values):
+            return False
+        return True
+
+    def apply(
+        self, states: np.ndarray, transformations_ids: Union[int, np.ndarray]
+    ) -> np.ndarray:
+        """Apply transformations to flat states without checking their validity.
+
+        Args:
+            states: Flat state of shape (S,) or batch of flat states of shape (N, S).
+            transformations_ids: Transformation to apply to the state,
+                or one transformation per state of the batch.
+
+        Returns:
+            New flat states, the given states are left untouched.
+        """
+        batch = np.array(np.atleast_2d(states))
+        actions = np.broadcast_to(
+            np.asarray(transformations_ids, dtype=np.int64), batch.shape[:1]
+        )
+        zone_slots = self.zone_slots(batch)
+
+        owners, positions = self.changes.gather(actions)
+        np.add.at(
+            batch,
+            (owners, self.changes.indices[positions]),
+            self.changes.values[positions],
+        )
+        if self.n_zones > 0:
+            owners, positions = self.current_changes.gather(actions)
+            slots = self.zones_offset + zone_slots[owners] * self.n_zones_items
+            np.add.at(
+                batch,
+                (owners, slots + self.current_changes.indices[positions]),
+                self.current_changes.values[positions],
+            )
+
+        destinations = self.destination[actions]
+        moving = np.flatnonzero(destinations != NO_ZONE)
+        batch[moving, self.position_offset : self.zones_offset] = 0
+        batch[moving, self.position_offset + destinations[moving]] = 1
+
+        if states.ndim == 1:
+            return batch[0]
+        return batch
+
+    def to_world(
+        self,
+        items: Optional[List[Item]] = None,
+        zones: Optional[List[Zone]] = None,
+        zones_items: Optional[List[Item]] = None,
+    ) -> "World":
+        """Build the equivalent World, with one Transformation per compiled row.
+
+        Building Transformation objects is only practical for moderate sizes.
+
+        Args:
+            items: Items of each player slot. Defaults to items named by slot.
+            zones: Zones of each position slot. Defaults to zones named by slot.
+            zones_items: Items of each zone item slot.
+                Defaults to items named by slot.
+        """
+        from hcraft.world import World
+
+        if items is None:
+            items = [Item(f"item_{slot}") for slot in range(self.n_items)]
+        if zones is None:
+            zones = [Zone(f"zone_{slot}") for slot in range(self.n_zones)]
+        if zones_items is None:
+            zones_items = [
+                Item(f"zone_item_{slot}") for slot in range(self.n_zones_items)
+            ]
+
+        def slot_element(slot: int) -> Tuple[Union[InventoryOwner, Zone], Item]:
+            if slot < self.n_items:
+                return PLAYER, items[slot]
+            zone_slot, zone_item_slot = divmod(
+                slot - self.zones_offset, self.n_zones_items
+            )
+            return zones[zone_slot], zones_items[zone_item_slot]
+
+        def current_element(slot: int) -> Tuple[Union[InventoryOwner, Zone], Item]:
+            return CURRENT_ZONE, zones_items[slot]
+
+        transformations = []
+        for t_id in range(self.n_transformations):
+            inventory_changes = _row_inventory_changes(
+                t_id,
+                (self.min_conditions, self.max_conditions, self.changes),
+                slot_element,
+            )
+            inventory_changes += _row_inventory_changes(
+                t_id,
+                (
+                    self.current_min_conditions,
+                    self.current_max_conditions,
+                    self.current_changes,
+                ),
+                current_element,
+            )
+            zone, destination = self.zone[t_id], self.destination[t_id]
+            transformations.append(
+                Transformation(
+                    name=f"transformation_{t_id}",
+                    inventory_changes=inventory_changes,
+                    zone=zones[zone] if zone != NO_ZONE else None,
+                    destination=zones[destination] if destination != NO_ZONE else None,
+                )
+            )
+
+        player_inventory, position, zones_inventories = self.split_state(
+            self.initial_state
+        )
+        start_zone = zones[int(np.argmax(position))] if self.n_zones > 0 else None
+        start_zones_items = {}
+        for zone_slot, zone_item_slot in zip(*np.nonzero(zones_inventories)):
+            amount = int(zones_inventories[zone_slot, zone_item_slot])
+            stack = Stack(zones_items[zone_item_slot], amount)
+            start_zones_items.setdefault(zones[zone_slot], []).append(stack)
+        return World(
+            items=list(items),
+            zones=list(zones),
+            zones_items=list(zones_items),
+            transformations=transformations,
+            start_zone=start_zone,
+            start_items=[
+                Stack(items[slot], int(player_inventory[slot]))
+                for slot in np.flatnonzero(player_inventory)
+            ],
+            start_zones_items=start_zones_items,
+        )
+
+    def _current_failures(
+        self, batch: np.ndarray, zone_slots: np.ndarray
+    ) -> np.ndarray:
+        current_offsets = self.zones_offset + zone_slots * self.n_zones_items
+        failures = self.current_min_conditions.count_per_row(
+            np.take_along_axis(
+                batch, current_offsets + self.current_min_conditions.indices, axis=1
+            )
+            < self.current_min_conditions.values
+        )
+        failures += self.current_max_conditions.count_per_row(
+            np.take_along_axis(
+                batch, current_offsets + self.current_max_conditions.indices, axis=1
+            )
+            > self.current_max_conditions.values
+        )
+        return failures
+
+
+def compile_world(world: "World") -> CompiledWorld:
+    """Compile the given world into flat arrays.
+
+    Prefer using the lazily compiled `world.compiled`.
+    """
+    compiled = _CompiledWorldBuilder(world)
+    for t_id, transfo in enumerate(world.transformations):
+        compiled.add_transformation(t_id, transfo)
+    return compiled.build()
+
+
+class _CompiledWorldBuilder:
+    """Accumulate coordinates of compiled transformations."""
+
+    def __init__(self, world: "World") -> None:
+        self.world = world
+        self.items_slots = {item: slot for slot, item in enumerate(world.items)}
+        self.zones_slots = {zone: slot for slot, zone in enumerate(world.zones)}
+        self.zones_items_slots = {
+            item: slot for slot, item in enumerate(world.zones_items)
+        }
+        self.zones_offset = world.n_items + world.n_zones
+        self.coordinates: Dict[Tuple[bool, InventoryOperation], List[tuple]] = {
+            (relative, operation): []
+            for relative in (False, True)
+            for operation in _COMPILED_OPERATIONS
+        }
+        self.zone = np.full(len(world.transformations), NO_ZONE, dtype=np.int64)
+        self.destination = np.full(len(world.transformations), NO_ZONE, dtype=np.int64)
+
+    def add_transformation(self, t_id: int, transfo: Transformation) -> None:
+        if transfo.zone is not None:
+            self.zone[t_id] = self.zones_slots[transfo.zone]
+        if transfo.destination is not None:
+            self.destination[t_id] = self.zones_slots[transfo.destination]
+
+        for operation in _COMPILED_OPERATIONS:
+            for stack in transfo.get_changes(PLAYER, operation, []):
+                self._add(t_id, operation, self.items_slots[stack.item], stack)
+            zones_stacks = transfo.get_changes(InventoryOwner.ZONES, operation, {})
+            for zone, stacks in zones_stacks.items():
+                self._add_zone_stacks(t_id, operation, self.zones_slots[zone], stacks)
+            if self.destination[t_id] != NO_ZONE:
+                stacks = transfo.get_changes(DESTINATION, operation, [])
+                self._add_zone_stacks(t_id, operation, self.destination[t_id], stacks)
+            if self.world.n_zones == 0:
+                continue
+            stacks = transfo.get_changes(CURRENT_ZONE, operation, [])
+            if self.zone[t_id] != NO_ZONE:
+                self._add_zone_stacks(t_id, operation, self.zone[t_id], stacks)
+                continue
+            for stack in stacks:
+                slot = self.zones_items_slots[stack.item]
+                self._add(t_id, operation, slot, stack, relative=True)
+
+    def build(self) -> CompiledWorld:
+        world = self.world
+        sparse_rows = {
+            key: self._sparse_rows(coordinates, key[1])
+            for key, coordinates in self.coordinates.items()
+        }
+        initial_state = np.zeros(
+            world.n_items + world.n_zones + world.n_zones * world.n_zones_items,
+            dtype=np.int32,
+        )
+        for stack in world.start_items:
+            initial_state[self.items_slots[stack.item]] += stack.quantity
+        if world.n_zones > 0:
+            start_slot = 0
+            if world.start_zone is not None:
+                start_slot = self.zones_slots[world.start_zone]
+            initial_state[world.n_items + start_slot] = 1
+        for zone, stacks in world.start_zones_items.items():
+            for stack in stacks:
+                slot = self._zone_item_slot(
+                    self.zones_slots[zone], self.zones_items_slots[stack.item]
+                )
+                initial_state[slot] += stack.quantity
+
+        return CompiledWorld(
+            n_items=world.n_items,
+            n_zones=world.n_zones,
+            n_zones_items=world.n_zones_items,
+            min_conditions=sparse_rows[(False, InventoryOperation.MIN)],
+            max_conditions=sparse_rows[(False, InventoryOperation.MAX)],
+            changes=_merge_changes(
+                sparse_rows[(False, InventoryOperation.ADD)],
+                sparse_rows[(False, InventoryOperation.REMOVE)],
+            ),
+            current_min_conditions=sparse_rows[(True, InventoryOperation.MIN)],
+            current_max_conditions=sparse_rows[(True, InventoryOperation.MAX)],
+            current_changes=_merge_changes(
+                sparse_rows[(True, InventoryOperation.ADD)],
+                sparse_rows[(True, InventoryOperation.REMOVE)],
+            ),
+            zone=self.zone,
+            destination=self.destination,
+            initial_state=initial_state,
+        )
+
+    def _zone_item_slot(self, zone_slot: int, zone_item_slot: int) -> int:
+        return self.zones_offset + zone_slot * self.world.n_zones_items + zone_item_slot
+
+    def _add_zone_stacks(
+        self,
+        t_id: int,
+        operation: InventoryOperation,
+        zone_slot: int,
+        stacks: List[Stack],
+    ) -> None:
+        for stack in stacks:
+            zone_item_slot = self.zones_items_slots[stack.item]
+            slot = self._zone_item_slot(zone_slot, zone_item_slot)
+            self._add(t_id, operation, slot, stack)
+
+    def _add(
+        self,
+        t_id: int,
+        operation: InventoryOperation,
+        slot: int,
+        stack: Stack,
+        relative: bool = False,
+    ) -> None:
+        self.coordinates[(relative, operation)].append((t_id, slot, stack.quantity))
+
+    def _sparse_rows(
+        self, coordinates: List[tuple], operation: InventoryOperation
+    ) -> SparseRows:
+        n_rows = len(self.world.transformations)
+        if not coordinates:
+            return SparseRows.empty(n_rows)
+        rows, cols, values = np.array(coordinates, dtype=np.int64).T
+        if operation is InventoryOperation.REMOVE:
+            values = -values
+        return SparseRows.from_coo(
+            rows, cols, values, n_rows, reduce=_OPERATIONS_REDUCE[operation]
+        )
+
+
+_COMPILED_OPERATIONS = (
+    InventoryOperation.MIN,
+    InventoryOperation.MAX,
+    InventoryOperation.ADD,
+    InventoryOperation.REMOVE,
+)
+
+_OPERATIONS_REDUCE = {
+    InventoryOperation.MIN: np.maximum,
+    InventoryOperation.MAX: np.minimum,
+    InventoryOperation.ADD: np.add,
+    InventoryOperation.REMOVE: np.add,
+}
+
+
+def _merge_changes(added: SparseRows, removed: SparseRows) -> SparseRows:
+    """Sum added and removed amounts in a single sparse rows of non-zero changes."""
+    changes = SparseRows.from_coo(
+        np.concatenate((added.rows, removed.rows)),
+        np.concatenate((added.indices, removed.indices)),
+        np.concatenate((added.values, removed.values)),
+        added.n_rows,
+    )
+    changed = changes.values != 0
+    return SparseRows.from_coo(
+        changes.rows[changed],
+        changes.indices[changed],
+        changes.values[changed],
+        changes.n_rows,
+    )
+
+
+def _row_inventory_changes(
+    row: int,
+    conditions_and_changes: Tuple[SparseRows, SparseRows, SparseRows],
+    element_of_slot,
+) -> List[Union[Use, Yield]]:
+    """Inventory changes reproducing the given compiled row."""
+    min_rows, max_rows, changes_rows = conditions_and_changes
+    minimums = dict(zip(*min_rows.row(row)))
+    maximums = dict(zip(*max_rows.row(row)))
+    changes = dict(zip(*changes_rows.row(row)))
+
+    inventory_changes = []
+    for slot in sorted(set(minimums) | set(maximums) | set(changes)):
+        owner, item = element_of_slot(int(slot))
+        minimum = int(minimums[slot]) if slot in minimums else -np.inf
+        maximum = int(maximums[slot]) if slot in maximums else np.inf
+        change = int(changes.get(slot, 0))
+        if change > 0:
+            inventory_changes.append(
+                Yield(owner, item, create=change, min=minimum, max=maximum)
+            )
+        else:
+            inventory_changes.append(
+                Use(owner, item, consume=-change, min=minimum, max=maximum)
+            )
+    return inventory_changes
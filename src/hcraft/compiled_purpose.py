@@ -0,0 +1,381 @@
+"""# Compiled purpose
+
+A compiled purpose evaluates the completion of every task of a `hcraft.purpose.Purpose`
+in a few vectorized operations instead of one Python call per task.
+
+States are flattened with the same layout as `hcraft.compiled`:
+`[player_inventory (I), position (Z), zones_inventories (Z*J)]`.
+
+Each task is compiled into threshold rows `a·x >= b` over this flat state.
+A task is done when all its rows hold (conjunction),
+or for some tasks when any of its rows holds (disjunction),
+for example placing an item in any zone.
+Terminal groups are then done when all their tasks are done.
+
+Tasks of unknown types are not compiled and are evaluated in Python as usual.
+
+Each task also watches the slots used by its rows,
+so that after a step only tasks watching changed slots need to be evaluated again.
+
+A compiled purpose is built with the purpose and used by `Purpose.reward`
+and `Purpose.is_terminal`, it can also be used directly:
+
+```python
+compiled_purpose = env.purpose.compiled
+state = compiled_purpose.state_from(env.state)
+tasks_done = compiled_purpose.tasks_done(state)
+groups_done = compiled_purpose.groups_done(tasks_done)
+```
+
+## Batched evaluation
+
+Vectorized environments and batched rollouts can compute rewards and terminations
+of N environments at once from their stacked flat states,
+the termination flags of tasks being kept outside of the purpose in a (N, n_tasks) matrix:
+
+```python
+tasks_terminated = np.zeros((n_envs, compiled_purpose.n_tasks), dtype=bool)
+...
+rewards, terminated, tasks_terminated = compiled_purpose.evaluate_batch(
+    states, tasks_terminated
+)
+```
+
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from hcraft.compiled import SparseRows
+from hcraft.task import (
+    GetItemTask,
+    GoToZoneTask,
+    LinearConstraintsTask,
+    PlaceItemTask,
+    Task,
+)
+
+if TYPE_CHECKING:
+    from hcraft.purpose import Purpose
+    from hcraft.state import HcraftState
+    from hcraft.world import World
+
+
+Row = Tuple[List[int], List[int], int]
+"""Threshold row (slots, coefficients, threshold) meaning sum(coefs * x[slots]) >= threshold."""
+
+
+@dataclass
+class CompiledPurpose:
+    """Threshold matrices of all tasks of a purpose.
+
+    See `hcraft.compiled_purpose` for more details.
+    """
+
+    conditions: SparseRows
+    """Coefficients of threshold rows over flat state slots."""
+    thresholds: np.ndarray
+    """Minimum value of the dot product of each threshold row."""
+    tasks_rows: SparseRows
+    """Threshold rows of each task."""
+    any_row: np.ndarray
+    """Whether each task is done if any (instead of all) of its rows holds."""
+    rewards: np.ndarray
+    """Reward of each task when achieved."""
+    groups_tasks: SparseRows
+    """Tasks of each terminal group."""
+    compiled_tasks: np.ndarray
+    """Whether each task is compiled, others have to be evaluated in Python."""
+    slots_tasks: SparseRows
+    """Tasks watching each flat state slot."""
+    timestep_reward: float = 0.0
+    """Reward given at each step."""
+
+    @property
+    def n_tasks(self) -> int:
+        """Number of tasks."""
+        return self.tasks_rows.n_rows
+
+    @staticmethod
+    def state_from(state: "HcraftState") -> np.ndarray:
+        """Flatten the given HierarchyCraft state."""
+        return np.concatenate(
+            (
+                state.player_inventory,
+                state.position,
+                state.zones_inventories.ravel(),
+            )
+        )
+
+    @staticmethod
+    def states_from_arrays(
+        players_inventories: np.ndarray,
+        positions: np.ndarray,
+        zones_inventories: np.ndarray,
+    ) -> np.ndarray:
+        """Flatten stacked states arrays of shapes (N, I), (N, Z) and (N, Z, J)."""
+        n_states = players_inventories.shape[0]
+        return np.concatenate(
+            (
+                players_inventories,
+                positions,
+                zones_inventories.reshape(n_states, -1),
+            ),
+            axis=-1,
+        )
+
+    def tasks_done(self, states: np.ndarray) -> np.ndarray:
+        """Completion of every compiled task in the given flat states.
+
+        Tasks that are not compiled are never done here.
+
+        Args:
+            states: Flat state of shape (S,) or batch of flat states of shape (N, S).
+
+        Returns:
+            Boolean array of shape (n_tasks,) or (N, n_tasks).
+        """
+        rows_hold = self.conditions.dot(states) >= self.thresholds
+        n_holding = self.tasks_rows.dot(rows_hold)
+        n_rows = np.diff(self.tasks_rows.indptr)
+        done = np.where(self.any_row, n_holding > 0, n_holding == n_rows)
+        return done & self.compiled_tasks
+
+    def tasks_done_of(self, state: np.ndarray, tasks: np.ndarray) -> np.ndarray:
+        """Completion of only the given tasks in the given flat state.
+
+        Args:
+            state: Flat state of shape (S,).
+            tasks: Indexes of tasks to evaluate.
+
+        Returns:
+            Boolean array with the completion of each given task.
+        """
+        rows_owners, rows_positions = self.tasks_rows.gather(tasks)
+        rows = self.tasks_rows.indices[rows_positions]
+        values_owners, values_positions = self.conditions.gather(rows)
+        rows_sums = np.bincount(
+            values_owners,
+            weights=state[self.conditions.indices[values_positions]]
+            * self.conditions.values[values_positions],
+            minlength=rows.shape[0],
+        )
+        rows_hold = rows_sums >= self.thresholds[rows]
+        n_holding = np.bincount(
+            rows_owners, weights=rows_hold, minlength=tasks.shape[0]
+        )
+        n_rows = np.diff(self.tasks_rows.indptr)[tasks]
+        done = np.where(self.any_row[tasks], n_holding > 0, n_holding == n_rows)
+        return done & self.compiled_tasks[tasks]
+
+    def watching_tasks(self, slots: np.ndarray) -> np.ndarray:
+        """Sorted indexes of tasks watching any of the given flat state slots."""
+        _, positions = self.slots_tasks.gather(slots)
+        return np.unique(self.slots_tasks.indices[positions])
+
+    def evaluate_batch(
+        self, states: np.ndarray, tasks_terminated: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Rewards and terminations of a batch of states reached by a valid step.
+
+        Args:
+            states: Batch of flat states of shape (N, S).
+            tasks_terminated: Whether each task was already terminated
+                in each environment, of shape (N, n_tasks).
+
+        Returns:
+            Rewards of shape (N,), purpose termination of shape (N,)
+            and updated tasks termination of shape (N, n_tasks).
+
+        Raises:
+            ValueError: If some tasks of the purpose are not compiled.
+        """
+        if not np.all(self.compiled_tasks):
+            raise ValueError(
+                "Batched evaluation needs all tasks to be compiled, got tasks of types"
+                " without compiler."
+            )
+        tasks_done = self.tasks_done(states)
+        newly_done = tasks_done & ~tasks_terminated
+        rewards = self.timestep_reward + newly_done @ self.rewards
+        tasks_terminated = tasks_terminated | tasks_done
+        terminated = np.any(self.groups_done(tasks_terminated), axis=-1)
+        return rewards, terminated, tasks_terminated
+
+    def groups_done(self, tasks_done: np.ndarray) -> np.ndarray:
+        """Whether all tasks of each terminal group are done.
+
+        Args:
+            tasks_done: Boolean array of shape (n_tasks,) or (N, n_tasks).
+
+        Returns:
+            Boolean array of shape (n_groups,) or (N, n_groups).
+        """
+        n_tasks_in_groups = np.diff(self.groups_tasks.indptr)
+        return self.groups_tasks.dot(tasks_done) == n_tasks_in_groups
+
+
+def compile_purpose(purpose: "Purpose", world: "World") -> CompiledPurpose:
+    """Compile all tasks of the given purpose built on the given world."""
+    layout = _StateLayout(world.n_items, world.n_zones, world.n_zones_items)
+    rows_coo: Tuple[List[int], List[int], List[int]] = ([], [], [])
+    thresholds: List[int] = []
+    tasks_rows_coo: Tuple[List[int], List[int]] = ([], [])
+    any_row = np.zeros(len(purpose.tasks), dtype=bool)
+    compiled_tasks = np.zeros(len(purpose.tasks), dtype=bool)
+    rewards = np.zeros(len(purpose.tasks))
+
+    for task_index, task in enumerate(purpose.tasks):
+        rewards[task_index] = getattr(task, "_reward", 0.0)
+        compiled_task = _compile_task(task, world, layout)
+        if compiled_task is None:
+            continue
+        compiled_tasks[task_index] = True
+        task_rows, any_row[task_index] = compiled_task
+        for slots, coefficients, threshold in task_rows:
+            row_index = len(thresholds)
+            rows_coo[0].extend([row_index] * len(slots))
+            rows_coo[1].extend(slots)
+            rows_coo[2].extend(coefficients)
+            thresholds.append(threshold)
+            tasks_rows_coo[0].append(task_index)
+            tasks_rows_coo[1].append(row_index)
+
+    groups_tasks_coo: Tuple[List[int], List[int]] = ([], [])
+    for group_index, terminal_group in enumerate(purpose.terminal_groups):
+        for task in terminal_group.tasks:
+            groups_tasks_coo[0].append(group_index)
+            groups_tasks_coo[1].append(purpose.tasks.index(task))
+
+    conditions = SparseRows.from_coo(*rows_coo, n_rows=len(thresholds))
+    rows_task = np.array(tasks_rows_coo[0], dtype=np.int64)
+    return CompiledPurpose(
+        conditions=conditions,
+        thresholds=np.array(thresholds, dtype=np.int64),
+        tasks_rows=_membership_rows(*tasks_rows_coo, n_rows=len(purpose.tasks)),
+        any_row=any_row,
+        rewards=rewards,
+        groups_tasks=_membership_rows(
+            *groups_tasks_coo, n_rows=len(purpose.terminal_groups)
+        ),
+        compiled_tasks=compiled_tasks,
+        slots_tasks=SparseRows.from_coo(
+            conditions.indices,
+            rows_task[conditions.rows],
+            np.ones(conditions.nnz),
+            n_rows=layout.state_size,
+            reduce=np.maximum,
+        ),
+        timestep_reward=purpose.timestep_reward,
+    )
+
+
+def compile_task(task: Task, world: "World") -> Optional[Tuple[List[Row], bool]]:
+    """Threshold rows of the given task built on the given world.
+
+    Returns:
+        The task rows and whether any (instead of all) of them is enough,
+        None if the task has no compiler.
+    """
+    layout = _StateLayout(world.n_items, world.n_zones, world.n_zones_items)
+    return _compile_task(task, world, layout)
+
+
+def _compile_task(
+    task: Task, world: "World", layout: "_StateLayout"
+) -> Optional[Tuple[List[Row], bool]]:
+    task_compiler = _TASKS_COMPILERS.get(type(task))
+    if task_compiler is None:
+        return None
+    return task_compiler(task, world, layout)
+
+
+@dataclass
+class _StateLayout:
+    n_items: int
+    n_zones: int
+    n_zones_items: int
+
+    @property
+    def state_size(self) -> int:
+        return self.n_items + self.n_zones + self.n_zones * self.n_zones_items
+
+    def position_slot(self, zone_slot: int) -> int:
+        return self.n_items + zone_slot
+
+    def zone_item_slot(self, zone_slot: int, zone_item_slot: int) -> int:
+        zones_offset = self.n_items + self.n_zones
+        return zones_offset + zone_slot * self.n_zones_items + zone_item_slot
+
+
+def _membership_rows(rows: List[int], members: List[int], n_rows: int) -> SparseRows:
+    return SparseRows.from_coo(rows, members, np.ones(len(members)), n_rows=n_rows)
+
+
+def _compile_get_item(
+    task: GetItemTask, world: "World", _layout: _StateLayout
+) -> Tuple[List[Row], bool]:
+    item_slot = world.slot_from_item(task.item_stack.item)
+    return [([item_slot], [1], task.item_stack.quantity)], False
+
+
+def _compile_go_to_zone(
+    task: GoToZoneTask, world: "World", layout: _StateLayout
+) -> Tuple[List[Row], bool]:
+    zone_slot = world.slot_from_zone(task.zone)
+    return [([layout.position_slot(zone_slot)], [1], 1)], False
+
+
+def _compile_place_item(
+    task: PlaceItemTask, world: "World", layout: _StateLayout
+) -> Tuple[List[Row], bool]:
+    zone_item_slot = world.slot_from_zoneitem(task.item_stack.item)
+    zones_slots = range(world.n_zones)
+    if task.zone is not None:
+        zones_slots = [world.slot_from_zone(task.zone)]
+    rows = [
+        (
+            [layout.zone_item_slot(zone_slot, zone_item_slot)],
+            [1],
+            task.item_stack.quantity,
+        )
+        for zone_slot in zones_slots
+    ]
+    return rows, task.zone is None
+
+
+def _compile_linear_constraints(
+    task: LinearConstraintsTask, world: "World", layout: _StateLayout
+) -> Tuple[List[Row], bool]:
+    rows = []
+    for constraint in task.constraints:
+        terms, threshold = constraint.threshold_row()
+        slots, coefficients = [], []
+        for term in terms:
+            if term.zone is None:
+                slots.append(world.slot_from_item(term.item))
+            elif term.item is None:
+                slots.append(layout.position_slot(world.slot_from_zone(term.zone)))
+            else:
+                slots.append(
+                    layout.zone_item_slot(
+                        world.slot_from_zone(term.zone),
+                        world.slot_from_zoneitem(term.item),
+                    )
+                )
+            coefficients.append(term.coefficient)
+        rows.append((slots, coefficients, threshold))
+    return rows, task.any_constraint
+
+
+_TASKS_COMPILERS: Dict[
+    Type[Task], Callable[[Task, "World", _StateLayout], Tuple[List[Row], bool]]
+] = {
+    GetItemTask: _compile_get_item,
+    GoToZoneTask: _compile_go_to_zone,
+    PlaceItemTask: _compile_place_item,
+    LinearConstraintsTask: _compile_linear_constraints,
+}
+"""Compilers of each exactly matching task type, subclasses are evaluated in Python."""
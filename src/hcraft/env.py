@@ -275,6 +275,7 @@ from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
+from hcraft.episode_metrics import EpisodeSummary
 from hcraft.metrics import SuccessCounter
 from hcraft.purpose import Purpose
 from hcraft.render.render import HcraftWindow
@@ -284,10 +285,11 @@ from hcraft.solving_behaviors import (
     build_all_solving_behaviors,
     task_to_behavior_name,
 )
-from hcraft.planning import HcraftPlanningProblem
+from hcraft.planning import HcraftPlanningProblem, NativePlanningProblem
 from hcraft.state import HcraftState
 
 if TYPE_CHECKING:
+    from hcraft.episode_metrics import MetricsSink
     from hcraft.task import Task
     from hcraft.world import World
 
@@ -319,6 +321,7 @@ class HcraftEnv(Env):
         render_window: Optional[HcraftWindow] = None,
         name: str = "HierarchyCraft",
         max_step: Optional[int] = None,
+        metrics_sink: Optional["MetricsSink"] = None,
     ) -> None:
         """
         Args:
@@ -331,6 +334,8 @@ class HcraftEnv(Env):
             name: Name of the environement. Defaults to 'HierarchyCraft'.
             max_step: (Optional[int], optional): Maximum number of steps before episode truncation.
                 If None, never truncates the episode. Defaults to None.
+            metrics_sink: Sink exporting a summary of each episode,
+                see `hcraft.episode_metrics`. Defaults to None.
         """
         self.world = world
         self.invalid_reward = invalid_reward
@@ -348,6 +353,9 @@ class HcraftEnv(Env):
         self.episodes = 0
         self.task_successes: Optional[SuccessCounter] = None
         self.terminal_successes: Optional[SuccessCounter] = None
+        self.metrics_sink = metrics_sink
+        self._tasks_completion_step: Optional[np.ndarray] = None
+        self._episode_summarized = True
 
         if purpose is None:
             purpose = Purpose(None)
@@ -390,8 +398,12 @@ class HcraftEnv(Env):
         return DiscreteSpace(len(self.world.transformations))
 
     def action_masks(self) -> np.ndarray:
-        """Return boolean mask of valid actions."""
-        return np.array([t.is_valid(self.state) for t in self.world.transformations])
+        """Return boolean mask of valid actions.
+
+        The mask is maintained incrementally by the state,
+        see `hcraft.state.HcraftState.valid_actions`.
+        """
+        return self.state.valid_actions.copy()
 
     def step(
         self, action: Union[int, str, np.ndarray]
@@ -431,11 +443,17 @@ class HcraftEnv(Env):
 
         terminated = self.purpose.is_terminal(self.state)
 
-        self.task_successes.update(self.episodes)
-        self.terminal_successes.update(self.episodes)
+        self.task_successes.update()
+        self.terminal_successes.update()
 
         self.current_score += reward
         self.cumulated_score += reward
+        if self.metrics_sink is not None:
+            self._tasks_completion_step[self.task_successes.just_terminated] = (
+                self.current_step
+            )
+            if (terminated or self.truncated) and not self._episode_summarized:
+                self._write_episode_summary(terminated)
         return (
             self.state.observation,
             reward,
@@ -472,21 +490,36 @@ class HcraftEnv(Env):
             self.task_successes = SuccessCounter(self.purpose.tasks)
             self.terminal_successes = SuccessCounter(self.purpose.terminal_groups)
 
+        if self.metrics_sink is not None and not self._episode_summarized:
+            self._write_episode_summary(terminated=False)
+
         self.current_step = 0
         self.current_score = 0
         self.episodes += 1
 
-        self.task_successes.new_episode(self.episodes)
-        self.terminal_successes.new_episode(self.episodes)
+        if self.metrics_sink is not None:
+            self._tasks_completion_step = np.full(len(self.purpose.tasks), -1)
+            self._episode_summarized = False
+
+        self.task_successes.new_episode()
+        self.terminal_successes.new_episode()
 
         self.state.reset()
         self.purpose.reset()
         return self.state.observation, self.infos()
 
     def close(self):
-        """Closes the environment."""
+        """Closes the environment.
+
+        The summary of an unfinished episode is written to the metrics sink if any,
+        the sink itself is flushed but not closed.
+        """
         if self.render_window is not None:
             self.render_window.close()
+        if self.metrics_sink is not None and not self.metrics_sink.closed:
+            if not self._episode_summarized:
+                self._write_episode_summary(terminated=False)
+            self.metrics_sink.flush()
 
     @property
     def all_behaviors(self) -> Dict[str, "Behavior"]:
@@ -555,6 +588,25 @@ class HcraftEnv(Env):
         """
         return HcraftPlanningProblem(self.state, self.name, self.purpose, **kwargs)
 
+    def native_planning_problem(self, **kwargs) -> NativePlanningProblem:
+        """Build this hcraft environment planning problem solved by a native search.
+
+        It needs no planning dependency, see `hcraft.planning.NativePlanningProblem`.
+
+        Example:
+            ```python
+            problem = env.native_planning_problem(algorithm="gbfs")
+
+            done = False
+            _observation, _info = env.reset()
+            while not done:
+                action = problem.action_from_plan(env.state)
+                _observation, _reward, terminated, truncated, _info = env.step(action)
+                done = terminated or truncated
+            ```
+        """
+        return NativePlanningProblem(self.state, self.name, self.purpose, **kwargs)
+
     def infos(self) -> dict:
         infos = {
             "action_is_legal": self.action_masks(),
@@ -564,6 +616,30 @@ class HcraftEnv(Env):
         infos.update(self._tasks_infos())
         return infos
 
+    def _write_episode_summary(self, terminated: bool) -> None:
+        tasks_completion_step = {
+            task.name: step if step >= 0 else None
+            for task, step in zip(
+                self.purpose.tasks, self._tasks_completion_step.tolist()
+            )
+        }
+        terminal_group = next(
+            (group.name for group in self.purpose.terminal_groups if group.terminated),
+            None,
+        )
+        self.metrics_sink.write(
+            EpisodeSummary(
+                episode=self.episodes,
+                score=float(self.current_score),
+                length=self.current_step,
+                tasks_completion_step=tasks_completion_step,
+                terminal_group=terminal_group,
+                terminated=terminated,
+                truncated=self.truncated,
+            )
+        )
+        self._episode_summarized = True
+
     def _tasks_infos(self):
         infos = {}
         infos.update(self.task_successes.done_infos)
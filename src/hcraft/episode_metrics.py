@@ -0,0 +1,287 @@
+"""# Episode metrics
+
+Sinks exporting a summary of every episode of a HierarchyCraft environment to a file,
+to follow tasks completion across many episodes without logging step infos.
+
+Each summary holds the score and length of the episode,
+the step at which each task was completed (None if never completed)
+and the terminal group reached if any.
+
+Summaries are written by batches from a background thread,
+so that an environment step only records which tasks were just completed.
+
+Available sinks are:
+
+- `JSONLinesMetricsSink`: one JSON object per episode.
+- `CSVMetricsSink`: one row per episode.
+- `ParquetMetricsSink`: columnar Parquet file, needs pyarrow (`pip install hcraft[parquet]`).
+
+## Example
+
+```python
+from hcraft.episode_metrics import CSVMetricsSink
+
+with CSVMetricsSink("episodes.csv") as sink:
+    env = MineHcraftEnv(metrics_sink=sink)
+    for _ in range(1000):
+        ... # Run episodes as usual
+    env.close()
+```
+
+"""
+
+import csv
+import json
+import queue
+import threading
+from abc import abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+# pyarrow is an optional dependency.
+PYARROW_AVAILABLE = True
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+@dataclass
+class EpisodeSummary:
+    """Summary of a single episode."""
+
+    episode: int
+    """Number of the episode, starting at 1."""
+    score: float
+    """Sum of rewards obtained during the episode."""
+    length: int
+    """Number of steps of the episode."""
+    tasks_completion_step: Dict[str, Optional[int]] = field(default_factory=dict)
+    """Step at which each task was completed, None if never completed."""
+    terminal_group: Optional[str] = None
+    """Name of the terminal group reached if any."""
+    terminated: bool = False
+    """Whether the purpose was terminated."""
+    truncated: bool = False
+    """Whether the episode was truncated."""
+
+    def to_row(self) -> Dict[str, Any]:
+        """Flat row of the summary, with a column per task."""
+        row = {
+            "episode": self.episode,
+            "score": self.score,
+            "length": self.length,
+            "terminated": self.terminated,
+            "truncated": self.truncated,
+            "terminal_group": self.terminal_group,
+        }
+        for task_name, step in self.tasks_completion_step.items():
+            row[_completion_step_column(task_name)] = step
+        return row
+
+
+_FLUSH = object()
+_CLOSE = object()
+
+
+class MetricsSink:
+    """Base class of episode metrics sinks writing by batches in a background thread.
+
+    Subclasses only have to open their file in `_open_file`,
+    write a batch of rows with `_write_batch` and release their file in `_close_file`.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_size: int = 256,
+        flush_interval: float = 5.0,
+    ) -> None:
+        """
+        Args:
+            path: Path of the file to write to, overwritten if it exists.
+            batch_size: Number of episodes summaries written at once.
+                Defaults to 256.
+            flush_interval: Maximum time in seconds a summary waits before being written.
+                Defaults to 5.0.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.closed = False
+        self._queue: "queue.Queue" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._open_file()
+        self._thread = threading.Thread(
+            target=self._run, name=f"{type(self).__name__}({self.path})", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, summary: EpisodeSummary) -> None:
+        """Queue the given episode summary to be written."""
+        if self.closed:
+            raise ValueError(f"Cannot write to closed metrics sink {self.path}.")
+        self._raise_background_error()
+        self._queue.put(summary.to_row())
+
+    def flush(self) -> None:
+        """Write all queued summaries and wait until they are written."""
+        if self.closed:
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+        self._raise_background_error()
+
+    def close(self) -> None:
+        """Write all queued summaries and close the file."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        self._raise_background_error()
+
+    def __enter__(self) -> "MetricsSink":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    @abstractmethod
+    def _open_file(self) -> None:
+        """Open the file, before the background thread is started."""
+
+    @abstractmethod
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        """Write the given rows to the file."""
+
+    @abstractmethod
+    def _close_file(self) -> None:
+        """Close the file if it was opened."""
+
+    def _run(self) -> None:
+        rows: List[Dict[str, Any]] = []
+        n_pending = 0
+        closing = False
+        while not closing:
+            try:
+                message = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                message = _FLUSH
+            else:
+                n_pending += 1
+            if message is _CLOSE:
+                closing = True
+            elif message is not _FLUSH:
+                rows.append(message)
+            if rows and (
+                message is _FLUSH or message is _CLOSE or len(rows) >= self.batch_size
+            ):
+                self._safe_call(self._write_batch, rows)
+                rows = []
+            if not rows:
+                for _ in range(n_pending):
+                    self._queue.task_done()
+                n_pending = 0
+        try:
+            self._close_file()
+        except Exception as error:  # Raised back in the main thread
+            self._error = self._error or error
+
+    def _safe_call(self, function, *args) -> None:
+        if self._error is not None:
+            return
+        try:
+            function(*args)
+        except Exception as error:  # Raised back in the main thread
+            self._error = error
+
+    def _raise_background_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(
+                f"Failed to write episode metrics to {self.path}."
+            ) from self._error
+
+
+class JSONLinesMetricsSink(MetricsSink):
+    """Write each episode summary as a JSON object on its own line."""
+
+    def _open_file(self) -> None:
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        self._file.write("".join(json.dumps(row) + "\n" for row in rows))
+        self._file.flush()
+
+    def _close_file(self) -> None:
+        self._file.close()
+
+
+class CSVMetricsSink(MetricsSink):
+    """Write each episode summary as a CSV row.
+
+    Columns are given by the first summary, missing values are left empty.
+    """
+
+    def _open_file(self) -> None:
+        self._file = open(self.path, "w", encoding="utf-8", newline="")
+        self._writer: Optional[csv.DictWriter] = None
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0]))
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def _close_file(self) -> None:
+        self._file.close()
+
+
+class ParquetMetricsSink(MetricsSink):
+    """Write episode summaries as row groups of a Parquet file.
+
+    Columns are given by the first summary.
+    """
+
+    def __init__(self, path: Union[str, Path], **kwargs) -> None:
+        if not PYARROW_AVAILABLE:
+            raise ImportError(
+                "Missing pyarrow dependency for Parquet export. Install with:\n"
+                "pip install hcraft[parquet]"
+            )
+        super().__init__(path, **kwargs)
+
+    def _open_file(self) -> None:
+        # The Parquet writer is only created with the schema of the first summary
+        self._parquet_writer: Optional["pq.ParquetWriter"] = None
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        if self._parquet_writer is None:
+            schema = pa.schema(
+                [(column, _COLUMNS_TYPES.get(column, pa.int64())) for column in rows[0]]
+            )
+            self._parquet_writer = pq.ParquetWriter(self.path, schema)
+        table = pa.Table.from_pylist(rows, schema=self._parquet_writer.schema)
+        self._parquet_writer.write_table(table)
+
+    def _close_file(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def _completion_step_column(task_name: str) -> str:
+    return f"{task_name} completion step"
+
+
+if PYARROW_AVAILABLE:
+    _COLUMNS_TYPES = {
+        "score": pa.float64(),
+        "terminated": pa.bool_(),
+        "truncated": pa.bool_(),
+        "terminal_group": pa.string(),
+    }
+    """Parquet types of summary columns, others are (nullable) integers."""
@@ -48,6 +48,7 @@ See `hcraft.examples.minecraft` for more details.
 | Gym name                         | CLI name          | Reference                                       |
 |:---------------------------------|:------------------|:------------------------------------------------|
 | RandomHcraft-v1                  | `random`          | `hcraft.examples.random_simple`                 |
+| ProceduralHcraft-v1              | `procedural`      | `hcraft.examples.procedural`                    |
 
 ##Other examples
 | Gym name                         | CLI name          | Reference                                       |
@@ -60,6 +61,7 @@ See `hcraft.examples.minecraft` for more details.
 import hcraft.examples.minecraft as minecraft
 import hcraft.examples.minicraft as minicraft
 import hcraft.examples.random_simple as random_simple
+import hcraft.examples.procedural as procedural
 import hcraft.examples.recursive as recursive
 import hcraft.examples.light_recursive as light_recursive
 import hcraft.examples.tower as tower
@@ -73,6 +75,7 @@ from hcraft.examples.light_recursive import LightRecursiveHcraftEnv
 from hcraft.examples.tower import TowerHcraftEnv
 from hcraft.examples.treasure import TreasureEnv
 from hcraft.examples.random_simple import RandomHcraftEnv
+from hcraft.examples.procedural import ProceduralHcraftEnv
 
 EXAMPLE_ENVS = [
     MineHcraftEnv,
@@ -91,6 +94,7 @@ HCRAFT_GYM_ENVS = [
     "RecursiveHcraft-v1",
     "LightRecursiveHcraft-v1",
     "Treasure-v1",
+    "ProceduralHcraft-v1",
 ]
 
 
@@ -102,8 +106,10 @@ __all__ = [
     "tower",
     "treasure",
     "random_simple",
+    "procedural",
     "MineHcraftEnv",
     "RandomHcraftEnv",
+    "ProceduralHcraftEnv",
     "LightRecursiveHcraftEnv",
     "RecursiveHcraftEnv",
     "TowerHcraftEnv",
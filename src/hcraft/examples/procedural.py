@@ -0,0 +1,395 @@
+"""# ProceduralHcraft Environment
+
+Procedurally generated large-scale worlds for scaling studies and stress tests.
+
+Worlds are generated directly in their compiled form (see `hcraft.compiled`)
+with vectorized sampling, so that worlds with millions of transformations
+can be generated in seconds:
+
+```python
+from hcraft.examples.procedural import generate_compiled_world
+
+compiled = generate_compiled_world(n_items=10**6, n_zones=100, n_zones_items=1000)
+```
+
+Items are spread over `depth` layers.
+Items of the first layer can be obtained from nothing,
+items of other layers consume inputs from previous layers
+with at least one input from the layer just below.
+Zones form a random tree, rooted at the start zone,
+where each zone can be entered from its parent and left back to it.
+Some recipes are restricted to a zone, and some require a zone item
+placed beforehand in the zone where it is built.
+
+Every item, zone and zone item is reachable by construction.
+
+For moderate sizes, the procedural world can be used as a HierarchyCraft environment
+through `ProceduralHcraftEnv`, where the goal is to get the last item of the last layer.
+
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+from hcraft.compiled import NO_ZONE, CompiledWorld, SparseRows
+from hcraft.elements import Item
+from hcraft.env import HcraftEnv
+from hcraft.task import GetItemTask
+
+try:
+    import gymnasium as gym
+
+    gym.register(
+        id="ProceduralHcraft-v1",
+        entry_point="hcraft.examples.procedural:ProceduralHcraftEnv",
+    )
+
+except ImportError:
+    pass
+
+
+def generate_compiled_world(
+    n_items: int = 100,
+    n_zones: int = 0,
+    n_zones_items: int = 0,
+    depth: int = 5,
+    inputs_probabilities: Sequence[float] = (0.3, 0.4, 0.2, 0.1),
+    n_recipes: Optional[int] = None,
+    max_consumed: int = 2,
+    zone_restricted_ratio: float = 0.2,
+    zone_item_required_ratio: float = 0.1,
+    seed: Optional[int] = None,
+) -> CompiledWorld:
+    """Generate a random compiled world where everything is reachable.
+
+    Args:
+        n_items: Number of items the player can have.
+        n_zones: Number of zones. No zones if 0. Defaults to 0.
+        n_zones_items: Number of items that can be placed in zones. Defaults to 0.
+        depth: Number of layers of items. Defaults to 5.
+        inputs_probabilities: Probability for a recipe to have 1, 2, ... inputs.
+            Defaults to (0.3, 0.4, 0.2, 0.1).
+        n_recipes: Total number of recipes, at least one per item and per zone item.
+            Additional recipes are alternative ways to get items of upper layers.
+            Defaults to one recipe per item and per zone item.
+        max_consumed: Maximum amount of each input consumed by a recipe. Defaults to 2.
+        zone_restricted_ratio: Ratio of items recipes restricted to a zone.
+            Defaults to 0.2.
+        zone_item_required_ratio: Ratio of items recipes that require a zone item
+            in the zone where they are done. Defaults to 0.1.
+        seed: Seed of the random generator. Defaults to None.
+
+    Returns:
+        The generated compiled world. Use `CompiledWorld.to_world` for a World.
+    """
+    generator = _ProceduralGenerator(
+        n_items=n_items,
+        n_zones=n_zones,
+        n_zones_items=n_zones_items,
+        depth=depth,
+        inputs_probabilities=inputs_probabilities,
+        max_consumed=max_consumed,
+        rng=np.random.default_rng(seed),
+    )
+    n_recipes = n_items + n_zones_items if n_recipes is None else n_recipes
+    return generator.generate(
+        n_recipes, zone_restricted_ratio, zone_item_required_ratio
+    )
+
+
+class ProceduralHcraftEnv(HcraftEnv):
+    """ProceduralHcraft, a procedurally generated HierarchyCraft environment.
+
+    The goal is to get the last item of the last layer.
+    See `hcraft.examples.procedural` for details on the generation.
+    """
+
+    def __init__(
+        self,
+        n_items: int = 30,
+        n_zones: int = 3,
+        n_zones_items: int = 3,
+        depth: int = 5,
+        seed: Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            n_items: Number of items the player can have.
+            n_zones: Number of zones.
+            n_zones_items: Number of items that can be placed in zones.
+            depth: Number of layers of items.
+            seed: Seed of the random generator.
+            Other keyword arguments are given to `generate_compiled_world`
+            or to `HcraftEnv`.
+        """
+        self.n_items = n_items
+        self.n_zones = n_zones
+        self.n_zones_items = n_zones_items
+        self.depth = depth
+        self.seed = seed
+        generation_kwargs = {
+            key: kwargs.pop(key) for key in _GENERATION_PARAMETERS if key in kwargs
+        }
+        compiled = generate_compiled_world(
+            n_items=n_items,
+            n_zones=n_zones,
+            n_zones_items=n_zones_items,
+            depth=depth,
+            seed=seed,
+            **generation_kwargs,
+        )
+        self.items = [Item(str(slot)) for slot in range(n_items)]
+        world = compiled.to_world(items=self.items)
+        name = f"ProceduralHcraft-I{n_items}-Z{n_zones}-ZI{n_zones_items}-D{depth}"
+        if seed is not None:
+            name += f"-S{seed}"
+        if "purpose" not in kwargs:
+            kwargs["purpose"] = GetItemTask(self.items[-1])
+        super().__init__(world, name=name, **kwargs)
+
+
+_GENERATION_PARAMETERS = (
+    "inputs_probabilities",
+    "n_recipes",
+    "max_consumed",
+    "zone_restricted_ratio",
+    "zone_item_required_ratio",
+)
+
+
+class _ProceduralGenerator:
+    """Vectorized sampling of the sparse rows of a procedural world."""
+
+    def __init__(
+        self,
+        n_items: int,
+        n_zones: int,
+        n_zones_items: int,
+        depth: int,
+        inputs_probabilities: Sequence[float],
+        max_consumed: int,
+        rng: np.random.Generator,
+    ) -> None:
+        if n_items < 1:
+            raise ValueError("Procedural worlds need at least one item.")
+        if n_zones_items > 0 and n_zones == 0:
+            raise ValueError("Zones items cannot be placed without any zone.")
+        self.n_items = n_items
+        self.n_zones = n_zones
+        self.n_zones_items = n_zones_items
+        self.depth = max(1, min(depth, n_items))
+        probabilities = np.asarray(inputs_probabilities, dtype=np.float64)
+        self.inputs_probabilities = probabilities / probabilities.sum()
+        self.max_consumed = max_consumed
+        self.rng = rng
+
+        self.items_layer = np.arange(n_items) * self.depth // n_items
+        self.layers_start = np.searchsorted(self.items_layer, np.arange(self.depth + 1))
+        self.zones_offset = n_items + n_zones
+
+        self.rows, self.cols, self.values = [], [], []
+        self.min_rows, self.min_cols, self.min_values = [], [], []
+        self.zone, self.destination = [], []
+        self.n_rows = 0
+
+    def generate(
+        self,
+        n_recipes: int,
+        zone_restricted_ratio: float,
+        zone_item_required_ratio: float,
+    ) -> CompiledWorld:
+        n_extra_recipes = max(0, n_recipes - self.n_items - self.n_zones_items)
+        upper_items = np.arange(self.layers_start[1], self.n_items)
+        extra_products = np.array([], dtype=np.int64)
+        if upper_items.size > 0:
+            extra_products = self.rng.choice(upper_items, size=n_extra_recipes)
+        products = np.concatenate((np.arange(self.n_items), extra_products))
+
+        self._add_zones_tree()
+        zones_items_layer, zones_items_home = self._add_zones_items_recipes()
+        self._add_items_recipes(
+            products,
+            zone_restricted_ratio,
+            zone_item_required_ratio,
+            zones_items_layer,
+            zones_items_home,
+        )
+
+        rows = np.concatenate(self.rows)
+        cols = np.concatenate(self.cols)
+        values = np.concatenate(self.values)
+        min_rows = np.concatenate(self.min_rows)
+        no_rows = SparseRows.empty(self.n_rows)
+        initial_state = np.zeros(
+            self.zones_offset + self.n_zones * self.n_zones_items, dtype=np.int32
+        )
+        if self.n_zones > 0:
+            initial_state[self.n_items] = 1
+        return CompiledWorld(
+            n_items=self.n_items,
+            n_zones=self.n_zones,
+            n_zones_items=self.n_zones_items,
+            min_conditions=SparseRows.from_coo(
+                min_rows,
+                np.concatenate(self.min_cols),
+                np.concatenate(self.min_values),
+                self.n_rows,
+            ),
+            max_conditions=no_rows,
+            changes=SparseRows.from_coo(rows, cols, values, self.n_rows),
+            current_min_conditions=no_rows,
+            current_max_conditions=no_rows,
+            current_changes=no_rows,
+            zone=np.concatenate(self.zone).astype(np.int64),
+            destination=np.concatenate(self.destination).astype(np.int64),
+            initial_state=initial_state,
+        )
+
+    def _add_zones_tree(self) -> None:
+        """Add moves between each zone and its parent in a random tree."""
+        if self.n_zones < 2:
+            return
+        children = np.arange(1, self.n_zones)
+        parents = np.floor(self.rng.random(children.shape[0]) * children).astype(
+            np.int64
+        )
+        no_changes = np.array([], dtype=np.int64)
+        for zone, destination in ((parents, children), (children, parents)):
+            self._new_rows(
+                n_rows=zone.shape[0],
+                zone=zone,
+                destination=destination,
+                changes=(no_changes, no_changes, no_changes),
+                conditions=(no_changes, no_changes, no_changes),
+            )
+
+    def _add_zones_items_recipes(self):
+        """Add one recipe per zone item, placing it in its home zone."""
+        n_zones_items = self.n_zones_items
+        zones_items_layer = self.rng.integers(0, self.depth, size=n_zones_items)
+        zones_items_home = self.rng.integers(0, max(self.n_zones, 1), n_zones_items)
+        if n_zones_items == 0:
+            return zones_items_layer, zones_items_home
+
+        input_rows, inputs, consumed = self._sample_inputs(zones_items_layer)
+        placed_slots = (
+            self.zones_offset
+            + zones_items_home * n_zones_items
+            + np.arange(n_zones_items)
+        )
+        self._new_rows(
+            n_rows=n_zones_items,
+            zone=zones_items_home,
+            destination=np.full(n_zones_items, NO_ZONE),
+            changes=(
+                np.concatenate((np.arange(n_zones_items), input_rows)),
+                np.concatenate((placed_slots, inputs)),
+                np.concatenate((np.ones(n_zones_items, dtype=np.int64), -consumed)),
+            ),
+            conditions=(input_rows, inputs, consumed),
+        )
+        return zones_items_layer, zones_items_home
+
+    def _add_items_recipes(
+        self,
+        products: np.ndarray,
+        zone_restricted_ratio: float,
+        zone_item_required_ratio: float,
+        zones_items_layer: np.ndarray,
+        zones_items_home: np.ndarray,
+    ) -> None:
+        """Add recipes consuming inputs of previous layers to yield each product."""
+        n_recipes = products.shape[0]
+        recipes_layer = self.items_layer[products]
+        input_rows, inputs, consumed = self._sample_inputs(recipes_layer)
+
+        zone = np.full(n_recipes, NO_ZONE, dtype=np.int64)
+        if self.n_zones > 0:
+            restricted = self.rng.random(n_recipes) < zone_restricted_ratio
+            zone[restricted] = self.rng.integers(0, self.n_zones, restricted.sum())
+
+        required_rows = np.array([], dtype=np.int64)
+        required_slots = np.array([], dtype=np.int64)
+        if self.n_zones_items > 0:
+            order = np.argsort(zones_items_layer, kind="stable")
+            n_candidates = np.searchsorted(
+                zones_items_layer[order], recipes_layer, side="left"
+            )
+            requiring = (self.rng.random(n_recipes) < zone_item_required_ratio) & (
+                n_candidates > 0
+            )
+            required_rows = np.flatnonzero(requiring)
+            picks = np.floor(
+                self.rng.random(required_rows.shape[0]) * n_candidates[required_rows]
+            ).astype(np.int64)
+            required = order[picks]
+            zone[required_rows] = zones_items_home[required]
+            required_slots = (
+                self.zones_offset
+                + zones_items_home[required] * self.n_zones_items
+                + required
+            )
+
+        recipes = np.arange(n_recipes)
+        self._new_rows(
+            n_rows=n_recipes,
+            zone=zone,
+            destination=np.full(n_recipes, NO_ZONE),
+            changes=(
+                np.concatenate((recipes, input_rows)),
+                np.concatenate((products, inputs)),
+                np.concatenate((np.ones(n_recipes, dtype=np.int64), -consumed)),
+            ),
+            conditions=(
+                np.concatenate((input_rows, required_rows)),
+                np.concatenate((inputs, required_slots)),
+                np.concatenate((consumed, np.ones_like(required_rows))),
+            ),
+        )
+
+    def _sample_inputs(self, layers: np.ndarray):
+        """Sample inputs from previous layers for recipes of the given layers.
+
+        Returns:
+            Recipe of each input, input item slot and consumed amount.
+        """
+        n_inputs = 1 + self.rng.choice(
+            self.inputs_probabilities.shape[0],
+            size=layers.shape[0],
+            p=self.inputs_probabilities,
+        )
+        n_inputs[layers == 0] = 0
+        input_rows = np.repeat(np.arange(layers.shape[0]), n_inputs)
+        input_layers = layers[input_rows]
+        is_first_input = np.r_[True, np.diff(input_rows) != 0]
+
+        # The first input comes from the layer just below to ensure depth,
+        # others come from any previous layer.
+        low = np.where(is_first_input, self.layers_start[input_layers - 1], 0)
+        high = self.layers_start[input_layers]
+        inputs = low + np.floor(self.rng.random(input_rows.shape[0]) * (high - low))
+        consumed = self.rng.integers(1, self.max_consumed + 1, input_rows.shape[0])
+        return input_rows, inputs.astype(np.int64), consumed
+
+    def _new_rows(
+        self,
+        n_rows: int,
+        zone: np.ndarray,
+        destination: np.ndarray,
+        changes: tuple,
+        conditions: tuple,
+    ) -> None:
+        """Record new rows with local rows indexes in changes and conditions."""
+        rows, cols, values = changes
+        self.rows.append(rows + self.n_rows)
+        self.cols.append(cols)
+        self.values.append(values)
+        rows, cols, values = conditions
+        self.min_rows.append(rows + self.n_rows)
+        self.min_cols.append(cols)
+        self.min_values.append(values)
+        self.zone.append(zone)
+        self.destination.append(destination)
+        self.n_rows += n_rows
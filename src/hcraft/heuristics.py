@@ -0,0 +1,277 @@
+"""# Heuristics
+
+Relaxed planning heuristics of a HierarchyCraft world, computed on compiled arrays
+(see `hcraft.compiled`) for whole batches of states at once.
+
+Like `hcraft.reachability`, transformations are relaxed so that amounts are never consumed
+and maximum conditions are ignored. Then the cost of producing each state slot is
+the cost of its cheapest producing transformation plus one step,
+a transformation costing:
+
+* the maximum cost of its unmet conditions for hmax, an admissible heuristic.
+* the sum of the costs of its unmet conditions for hadd, more informed but not admissible.
+
+The cost of a task is then the cost of its unmet threshold rows
+(see `hcraft.compiled_purpose`), combined the same way.
+
+Relaxed transformations are prepared once per world,
+and costs from the initial state are kept as tables of costs per item, zone and zone item.
+They can guide search-based planners (see `hcraft.planning.search_plan`)
+or be used as potentials for reward shaping.
+
+## Example
+
+```python
+from hcraft.heuristics import RelaxedHeuristics
+
+heuristics = RelaxedHeuristics(env.world.compiled)
+diamond_cost = heuristics.items_costs()[env.world.slot_from_item(DIAMOND)]
+
+planning_problem = env.native_planning_problem(heuristic="hmax")
+```
+
+"""
+
+from enum import Enum
+from typing import TYPE_CHECKING, Dict, Tuple, Union
+
+import numpy as np
+
+from hcraft.compiled import SparseRows
+from hcraft.reachability import _relaxed_rows
+
+if TYPE_CHECKING:
+    from hcraft.compiled import CompiledWorld
+    from hcraft.compiled_purpose import CompiledPurpose
+    from hcraft.planning import Heuristic
+
+
+class RelaxedCost(Enum):
+    """How costs of conditions are combined in relaxed heuristics."""
+
+    HMAX = "hmax"
+    """Maximum of conditions costs, admissible."""
+    HADD = "hadd"
+    """Sum of conditions costs, not admissible."""
+
+
+class RelaxedHeuristics:
+    """Relaxed heuristics of a compiled world.
+
+    See `hcraft.heuristics` for more details.
+    """
+
+    def __init__(self, compiled: "CompiledWorld") -> None:
+        self.compiled = compiled
+        self.conditions, gains, _ = _relaxed_rows(compiled)
+        self.producers = SparseRows.from_coo(
+            gains.indices,
+            gains.rows,
+            np.ones(gains.nnz),
+            n_rows=compiled.state_size,
+            reduce=np.maximum,
+        )
+        """Relaxed transformations producing each flat state slot."""
+        self.max_gains = np.zeros(compiled.state_size, dtype=np.int64)
+        """Maximum amount a single relaxed transformation adds to each slot."""
+        np.maximum.at(self.max_gains, gains.indices, gains.values)
+        self._conditions_reducer = _RowsReducer(self.conditions)
+        self._producers_reducer = _RowsReducer(self.producers, empty=np.inf)
+        self._initial_costs: Dict[RelaxedCost, np.ndarray] = {}
+
+    def slots_costs(
+        self,
+        states: np.ndarray,
+        cost: Union[str, RelaxedCost] = RelaxedCost.HMAX,
+    ) -> np.ndarray:
+        """Relaxed cost of having each flat state slot positive from the given flat states.
+
+        Args:
+            states: Flat state of shape (S,) or batch of flat states of shape (N, S).
+            cost: How costs of conditions are combined. Defaults to hmax.
+
+        Returns:
+            Costs of shape (S,) or (N, S), np.inf for slots that cannot be produced.
+        """
+        batch = np.atleast_2d(states)
+        slots_costs = np.where(batch > 0, 0.0, self._production_costs(batch, cost))
+        if states.ndim == 1:
+            return slots_costs[0]
+        return slots_costs
+
+    def _production_costs(
+        self, batch: np.ndarray, cost: Union[str, RelaxedCost]
+    ) -> np.ndarray:
+        """Relaxed cost of producing more of each slot in a batch of flat states."""
+        cost = RelaxedCost(cost)
+        combine = np.maximum if cost is RelaxedCost.HMAX else np.add
+        conditions, producers = self.conditions, self.producers
+
+        missing = conditions.values - batch[:, conditions.indices]
+        unmet, applications = self._missing_applications(missing, conditions.indices)
+        production_costs = np.full(batch.shape, np.inf)
+        while True:
+            conditions_costs = _quantity_costs(
+                production_costs[:, conditions.indices], unmet, applications, cost
+            )
+            rows_costs = self._conditions_reducer(combine, conditions_costs) + 1
+            new_production_costs = self._producers_reducer(
+                np.minimum, rows_costs[:, producers.indices]
+            )
+            if np.array_equal(new_production_costs, production_costs):
+                break
+            production_costs = new_production_costs
+
+        return production_costs
+
+    def _missing_applications(
+        self, missing: np.ndarray, slots: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Where amounts of slots are missing and the applications needed to produce them."""
+        applications = np.ceil(missing / np.maximum(self.max_gains[slots], 1))
+        return missing > 0, applications
+
+    def tasks_costs(
+        self,
+        states: np.ndarray,
+        compiled_purpose: "CompiledPurpose",
+        cost: Union[str, RelaxedCost] = RelaxedCost.HMAX,
+    ) -> np.ndarray:
+        """Relaxed cost of achieving each task of a compiled purpose from the given states.
+
+        Threshold rows with a single positive coefficient cost the production
+        of their missing amount, other unmet rows cost a single step. Tasks that are not compiled cost nothing.
+
+        Args:
+            states: Flat state of shape (S,) or batch of flat states of shape (N, S).
+            compiled_purpose: Compiled purpose of the tasks.
+            cost: How costs of rows are combined. Defaults to hmax.
+
+        Returns:
+            Costs of shape (n_tasks,) or (N, n_tasks), np.inf for unreachable tasks.
+        """
+        cost = RelaxedCost(cost)
+        combine = np.maximum if cost is RelaxedCost.HMAX else np.add
+        batch = np.atleast_2d(states)
+        production_costs = self._production_costs(batch, cost)
+
+        conditions = compiled_purpose.conditions
+        single_slot = _single_positive_slot(conditions)
+        rows_missing = compiled_purpose.thresholds - conditions.dot(batch)
+        rows_costs = (rows_missing > 0).astype(np.float64)
+        has_slot = single_slot >= 0
+        slots = single_slot[has_slot]
+        unmet, applications = self._missing_applications(
+            rows_missing[:, has_slot], slots
+        )
+        rows_costs[:, has_slot] = _quantity_costs(
+            production_costs[:, slots], unmet, applications, cost
+        )
+
+        tasks_rows = compiled_purpose.tasks_rows
+        tasks_rows_costs = rows_costs[:, tasks_rows.indices]
+        tasks_reducer = _RowsReducer(tasks_rows)
+        all_costs = tasks_reducer(combine, tasks_rows_costs)
+        any_costs = tasks_reducer(np.minimum, tasks_rows_costs)
+        tasks_costs = np.where(compiled_purpose.any_row, any_costs, all_costs)
+        tasks_costs[:, ~compiled_purpose.compiled_tasks] = 0
+
+        if states.ndim == 1:
+            return tasks_costs[0]
+        return tasks_costs
+
+    def initial_costs(
+        self, cost: Union[str, RelaxedCost] = RelaxedCost.HMAX
+    ) -> np.ndarray:
+        """Relaxed cost of having each flat state slot positive from the initial state."""
+        cost = RelaxedCost(cost)
+        if cost not in self._initial_costs:
+            self._initial_costs[cost] = self.slots_costs(
+                self.compiled.initial_state, cost
+            )
+        return self._initial_costs[cost]
+
+    def items_costs(self, cost: Union[str, RelaxedCost] = RelaxedCost.HMAX):
+        """Relaxed cost of getting each item from the initial state."""
+        return self.initial_costs(cost)[: self.compiled.n_items]
+
+    def zones_costs(self, cost: Union[str, RelaxedCost] = RelaxedCost.HMAX):
+        """Relaxed cost of reaching each zone from the initial state."""
+        compiled = self.compiled
+        return self.initial_costs(cost)[
+            compiled.position_offset : compiled.zones_offset
+        ]
+
+    def zones_items_costs(self, cost: Union[str, RelaxedCost] = RelaxedCost.HMAX):
+        """Relaxed cost of placing each zone item in each zone, of shape (Z, J)."""
+        compiled = self.compiled
+        return self.initial_costs(cost)[compiled.zones_offset :].reshape(
+            compiled.n_zones, compiled.n_zones_items
+        )
+
+    def heuristic(
+        self,
+        compiled_purpose: "CompiledPurpose",
+        goal_tasks: np.ndarray,
+        cost: Union[str, RelaxedCost] = RelaxedCost.HMAX,
+    ) -> "Heuristic":
+        """Heuristic of the given goal tasks for `hcraft.planning.search_plan`.
+
+        Achieved goal tasks cost nothing, others are combined as their rows are.
+        """
+        cost = RelaxedCost(cost)
+        combine = np.maximum if cost is RelaxedCost.HMAX else np.add
+        goal_tasks = np.asarray(goal_tasks, dtype=np.int64)
+
+        def relaxed_heuristic(states: np.ndarray, achieved: np.ndarray) -> np.ndarray:
+            tasks_costs = self.tasks_costs(states, compiled_purpose, cost)
+            goal_costs = np.where(achieved, 0.0, tasks_costs[:, goal_tasks])
+            return combine.reduce(goal_costs, axis=-1, initial=0.0)
+
+        return relaxed_heuristic
+
+
+class _RowsReducer:
+    """Reduce values of each sparse row with a ufunc, empty rows being given a value."""
+
+    def __init__(self, sparse_rows: SparseRows, empty: float = 0.0) -> None:
+        self.n_rows = sparse_rows.n_rows
+        self.empty = empty
+        self.non_empty = np.flatnonzero(np.diff(sparse_rows.indptr) > 0)
+        self.starts = sparse_rows.indptr[self.non_empty]
+
+    def __call__(self, ufunc: np.ufunc, per_value: np.ndarray) -> np.ndarray:
+        reduced = np.full(per_value.shape[:-1] + (self.n_rows,), self.empty)
+        if self.non_empty.shape[0] > 0:
+            reduced[..., self.non_empty] = ufunc.reduceat(
+                per_value, self.starts, axis=-1
+            )
+        return reduced
+
+
+def _quantity_costs(
+    production_costs: np.ndarray,
+    unmet: np.ndarray,
+    applications: np.ndarray,
+    cost: RelaxedCost,
+) -> np.ndarray:
+    """Relaxed cost of producing missing amounts, nothing where none is missing.
+
+    Missing amounts need at least as many steps as applications of producers,
+    counted after the first production for hadd,
+    and as a lower bound of the first production cost for hmax.
+    """
+    if cost is RelaxedCost.HMAX:
+        costs = np.maximum(production_costs, applications)
+    else:
+        costs = production_costs + (applications - 1)
+    return np.where(unmet, costs, 0.0)
+
+
+def _single_positive_slot(conditions: SparseRows) -> np.ndarray:
+    """Slot of rows made of a single positive coefficient, -1 for other rows."""
+    single_slot = np.full(conditions.n_rows, -1, dtype=np.int64)
+    single = (np.diff(conditions.indptr) == 1)[conditions.rows]
+    single &= conditions.values > 0
+    single_slot[conditions.rows[single]] = conditions.indices[single]
+    return single_slot
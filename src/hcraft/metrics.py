@@ -1,49 +1,84 @@
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
+
+import numpy as np
 
 from hcraft.purpose import Task, TerminalGroup
 
 
 class SuccessCounter:
-    """Counter of success rates of tasks or terminal groups."""
+    """Counter of success rates of tasks or terminal groups.
+
+    Successes of the last episodes are kept in a ring buffer of shape (window, n_elements)
+    along with their running sums, so that each step updates all elements at once
+    and success rates are given without summing over episodes again.
+    """
 
-    def __init__(self, elements: List[Union[Task, TerminalGroup]]) -> None:
+    def __init__(
+        self, elements: List[Union[Task, TerminalGroup]], window: int = 10
+    ) -> None:
+        """
+        Args:
+            elements: Tasks or terminal groups to count successes of.
+            window: Number of last episodes used to compute success rates.
+                Defaults to 10.
+        """
+        if window < 1:
+            raise ValueError(f"Success window should be positive, got {window}.")
         self.elements = elements
-        self.step_states = {}
-        self.successes: Dict[Union[Task, TerminalGroup], Dict[int, bool]] = {
-            element: {} for element in self.elements
-        }
+        self.window = window
+        self.step_states = np.zeros(len(elements), dtype=bool)
+        self.successes = np.zeros((window, len(elements)), dtype=bool)
+        """Successes of each element in the last episodes, as a ring buffer."""
+        self.n_successes = np.zeros(len(elements), dtype=np.int64)
+        """Number of successes of each element in the last episodes."""
+        self.n_episodes = 0
+        """Number of episodes in the ring buffer."""
+        self.just_terminated = np.zeros(len(elements), dtype=bool)
+        """Elements terminated during the last step."""
+        self._cursor = -1
+        names = [self._name(element) for element in self.elements]
+        self._done_keys = [self._is_done_str(name) for name in names]
+        self._rate_keys = [self._success_str(name) for name in names]
 
     def step_reset(self):
         """Set the state of elements."""
-        self.step_states = {element: element.terminated for element in self.elements}
-
-    def new_episode(self, episode: int):
-        """Add a new episode successes."""
-        for element in self.elements:
-            self.successes[element][episode] = False
-            if len(self.successes[element]) > 10:
-                self.successes[element].pop(episode - 10)
-
-    def update(self, episode: int):
-        """Update the success state of the given element for the given episode."""
-        for element in self.elements:
-            # Just terminated
-            if element.terminated != self.step_states[element]:
-                self.successes[element][episode] = True
+        self.step_states = self._terminated()
+
+    def new_episode(self, episode: Optional[int] = None):
+        """Add a new episode successes.
+
+        Args:
+            episode: Deprecated and ignored, episodes are tracked by the ring buffer.
+        """
+        self._cursor = (self._cursor + 1) % self.window
+        self.n_successes -= self.successes[self._cursor]
+        self.successes[self._cursor] = False
+        self.n_episodes = min(self.n_episodes + 1, self.window)
+
+    def update(self, episode: Optional[int] = None):
+        """Update the success state of elements for the current episode.
+
+        Args:
+            episode: Deprecated and ignored, episodes are tracked by the ring buffer.
+        """
+        # Just terminated
+        self.just_terminated = self._terminated() != self.step_states
+        new_successes = self.just_terminated & ~self.successes[self._cursor]
+        self.successes[self._cursor] |= new_successes
+        self.n_successes += new_successes
+
+    @property
+    def rates(self) -> np.ndarray:
+        """Success rate of each element over the last episodes."""
+        return self.n_successes / max(1, self.n_episodes)
 
     @property
     def done_infos(self) -> Dict[str, bool]:
-        return {
-            self._is_done_str(self._name(element)): element.terminated
-            for element in self.elements
-        }
+        return dict(zip(self._done_keys, self._terminated().tolist()))
 
     @property
     def rates_infos(self) -> Dict[str, float]:
-        return {
-            self._success_str(self._name(element)): self._rate(element)
-            for element in self.elements
-        }
+        return dict(zip(self._rate_keys, self.rates.tolist()))
 
     @staticmethod
     def _success_str(name: str):
@@ -61,6 +96,9 @@ class SuccessCounter:
             group_name = f"Terminal group '{element.name}'"
         return group_name
 
-    def _rate(self, element: Union[Task, TerminalGroup]) -> float:
-        n_episodes = max(1, len(self.successes[element]))
-        return sum(self.successes[element].values()) / n_episodes
+    def _terminated(self) -> np.ndarray:
+        return np.fromiter(
+            (element.terminated for element in self.elements),
+            dtype=bool,
+            count=len(self.elements),
+        )
@@ -0,0 +1,438 @@
+"""# PDDL export
+
+Native writer of PDDL 2.1 numeric domains and problems of HierarchyCraft worlds,
+without the unified planning dependency (see `hcraft.planning`).
+
+Files are streamed action by action from the compiled world (see `hcraft.compiled`),
+so that writing them is linear in the size of the world.
+The domain and problems follow the same types, predicates and functions
+as the unified planning problem of `hcraft.planning.HcraftPlanningProblem`:
+
+- types `zone`, `player_item` and `zone_item`, all zones and items being domain constants.
+- predicates `(pos ?zone)` and `(visited ?zone)`.
+- functions `(amount ?item)` and `(amount_at ?item ?zone)`.
+
+Each transformation is an action named `a_<transformation id>_<transformation name>`.
+The goal of a problem is made of the compiled threshold rows
+(see `hcraft.compiled_purpose`) of the best terminal group of a purpose.
+
+As problems only need the domain constants, many problem instances
+with different initial states or goals can share a single domain file.
+
+## Example
+
+```python
+from hcraft.pddl import PDDLExporter
+
+exporter = PDDLExporter(env.world, name="minehcraft")
+exporter.write_domain("domain.pddl")
+exporter.write_problem("problem.pddl", env.state, env.purpose)
+
+# Batch export of many instances sharing the same domain file
+exporter.export_batch(
+    "benchmark",
+    [(f"instance_{i}", state, purpose) for i, (state, purpose) in enumerate(instances)],
+)
+```
+
+"""
+
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from hcraft.compiled import NO_ZONE
+from hcraft.compiled_purpose import compile_purpose
+from hcraft.purpose import Purpose
+
+if TYPE_CHECKING:
+    from hcraft.compiled_purpose import CompiledPurpose
+    from hcraft.state import HcraftState
+    from hcraft.task import Task
+    from hcraft.world import World
+
+PDDLFile = Union[str, Path, TextIO]
+"""Path of a file to write to, or an opened text file."""
+PDDLState = Union["HcraftState", np.ndarray]
+"""HierarchyCraft state, or flat state of the compiled world where only the position is visited."""
+PDDLGoal = Optional[Union[Purpose, "Task", List["Task"]]]
+"""Purpose, or tasks of a purpose, whose best terminal group is the goal."""
+
+
+class PDDLExporter:
+    """Writer of PDDL domain and problems of a HierarchyCraft world.
+
+    See `hcraft.pddl` for more details.
+    """
+
+    def __init__(self, world: "World", name: str = "hcraft") -> None:
+        """
+        Args:
+            world: World to export.
+            name: Name of the domain, prefix of problems names. Defaults to "hcraft".
+        """
+        self.world = world
+        self.compiled = world.compiled
+        self.name = _pddl_name(name)
+        self.domain_name = f"{self.name}-domain"
+
+        names = _unique_names(
+            [item.name for item in world.items]
+            + [f"{item.name}_in_zone" for item in world.zones_items]
+            + [zone.name for zone in world.zones]
+        )
+        n_items, n_zones_items = world.n_items, world.n_zones_items
+        self.items_names = names[:n_items]
+        """PDDL constant of each item."""
+        self.zones_items_names = names[n_items : n_items + n_zones_items]
+        """PDDL constant of each zone item."""
+        self.zones_names = names[n_items + n_zones_items :]
+        """PDDL constant of each zone."""
+        self.actions_names = [
+            f"a_{t_id}_{_pddl_name(transfo.name)}"
+            for t_id, transfo in enumerate(world.transformations)
+        ]
+        """PDDL action of each transformation."""
+
+    def write_domain(self, file: PDDLFile) -> None:
+        """Write the PDDL domain of the world."""
+        compiled = self.compiled
+        requirements = [":strips", ":typing", ":numeric-fluents"]
+        if np.any(compiled.destination != NO_ZONE):
+            requirements.append(":negative-preconditions")
+        with _text_file(file) as text_file:
+            text_file.write(
+                f"(define (domain {self.domain_name})\n"
+                f" (:requirements {' '.join(requirements)})\n"
+                " (:types zone player_item zone_item)\n"
+                " (:constants\n"
+                f"{_typed_constants(self.zones_names, 'zone')}"
+                f"{_typed_constants(self.items_names, 'player_item')}"
+                f"{_typed_constants(self.zones_items_names, 'zone_item')}"
+                " )\n"
+                " (:predicates (pos ?zone - zone) (visited ?zone - zone))\n"
+                " (:functions\n"
+                "  (amount ?item - player_item)\n"
+                "  (amount_at ?item - zone_item ?zone - zone)\n"
+                " )\n"
+            )
+            for t_id in range(compiled.n_transformations):
+                text_file.write(self._action(t_id))
+            text_file.write(")\n")
+
+    def write_problem(
+        self,
+        file: PDDLFile,
+        state: PDDLState,
+        purpose: PDDLGoal,
+        name: Optional[str] = None,
+    ) -> None:
+        """Write a PDDL problem of the world from the given state to the given purpose.
+
+        Args:
+            file: File to write the problem to.
+            state: Initial state of the problem.
+            purpose: Purpose whose best terminal group is the goal of the problem.
+                Tasks that are not compiled (see `hcraft.compiled_purpose`) cannot be exported.
+            name: Name of the problem. Defaults to "<name>-problem".
+        """
+        name = _pddl_name(name) if name is not None else f"{self.name}-problem"
+        goal = self._goal(purpose)
+        with _text_file(file) as text_file:
+            text_file.write(
+                f"(define (problem {name})\n (:domain {self.domain_name})\n"
+            )
+            if "(or " in goal:
+                # Only goals of tasks done in any of their rows are disjunctive
+                text_file.write(" (:requirements :disjunctive-preconditions)\n")
+            text_file.write(" (:init\n")
+            text_file.writelines(self._init(state))
+            text_file.write(f" )\n (:goal {goal})\n)\n")
+
+    def export_batch(
+        self,
+        directory: Union[str, Path],
+        instances: Iterable[Tuple[str, PDDLState, PDDLGoal]],
+        domain_filename: str = "domain.pddl",
+    ) -> List[Path]:
+        """Write the domain once and a problem file for each instance in a directory.
+
+        Args:
+            directory: Directory to write files in, created if needed.
+            instances: Name, initial state and purpose of each problem instance,
+                each problem being written to "<name>.pddl".
+            domain_filename: Filename of the shared domain. Defaults to "domain.pddl".
+
+        Returns:
+            Paths of the written problems files.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.write_domain(directory / domain_filename)
+        problems_paths = []
+        for name, state, purpose in instances:
+            problem_path = directory / f"{name}.pddl"
+            self.write_problem(problem_path, state, purpose, name=name)
+            problems_paths.append(problem_path)
+        return problems_paths
+
+    def transformation_id(self, action: str) -> int:
+        """Transformation of a PDDL action name or plan step like "(a_0_search start)"."""
+        action_name = action.strip().strip("()").split()[0]
+        return int(action_name.split("_")[1])
+
+    def slot_fluent(self, slot: int) -> str:
+        """PDDL fluent of the given flat state slot."""
+        compiled = self.compiled
+        if slot < compiled.position_offset:
+            return f"(amount {self.items_names[slot]})"
+        if slot < compiled.zones_offset:
+            return f"(pos {self.zones_names[slot - compiled.position_offset]})"
+        zone_slot, zone_item_slot = divmod(
+            slot - compiled.zones_offset, compiled.n_zones_items
+        )
+        return (
+            f"(amount_at {self.zones_items_names[zone_item_slot]}"
+            f" {self.zones_names[zone_slot]})"
+        )
+
+    def _current_zone_fluent(self, zone_item_slot: int) -> str:
+        return f"(amount_at {self.zones_items_names[zone_item_slot]} ?loc)"
+
+    def _action(self, t_id: int) -> str:
+        compiled = self.compiled
+        parameters, preconditions, effects = "", [], []
+        if compiled.n_zones > 0:
+            parameters = "?loc - zone"
+            preconditions.append("(pos ?loc)")
+        zone_slot = compiled.zone[t_id]
+        if zone_slot != NO_ZONE and compiled.n_zones > 1:
+            preconditions.append(f"(pos {self.zones_names[zone_slot]})")
+        destination = compiled.destination[t_id]
+        if destination != NO_ZONE:
+            destination_name = self.zones_names[destination]
+            preconditions.append(f"(not (pos {destination_name}))")
+            effects.extend(
+                [
+                    "(not (pos ?loc))",
+                    f"(pos {destination_name})",
+                    f"(visited {destination_name})",
+                ]
+            )
+
+        for slot_fluent, min_rows, max_rows, changes_rows in (
+            (
+                self.slot_fluent,
+                compiled.min_conditions,
+                compiled.max_conditions,
+                compiled.changes,
+            ),
+            (
+                self._current_zone_fluent,
+                compiled.current_min_conditions,
+                compiled.current_max_conditions,
+                compiled.current_changes,
+            ),
+        ):
+            for slot, value in _row_items(min_rows, t_id):
+                preconditions.append(f"(>= {slot_fluent(slot)} {value})")
+            for slot, value in _row_items(max_rows, t_id):
+                preconditions.append(f"(<= {slot_fluent(slot)} {value})")
+            for slot, value in _row_items(changes_rows, t_id):
+                fluent = slot_fluent(slot)
+                if value > 0:
+                    effects.append(f"(increase {fluent} {value})")
+                else:
+                    effects.append(f"(decrease {fluent} {-value})")
+
+        action = f" (:action {self.actions_names[t_id]}\n  :parameters ({parameters})\n"
+        if preconditions:
+            action += f"  :precondition (and {' '.join(preconditions)})\n"
+        return action + f"  :effect (and {' '.join(effects)}))\n"
+
+    def _init(self, state: PDDLState) -> Iterator[str]:
+        compiled = self.compiled
+        if isinstance(state, np.ndarray):
+            flat_state = state
+            _, position, _ = compiled.split_state(state)
+            discovered_zones = position > 0
+        else:
+            flat_state = compiled.state_from(state)
+            discovered_zones = state.discovered_zones > 0
+        flat_state = flat_state.tolist()
+
+        position_offset, zones_offset = compiled.position_offset, compiled.zones_offset
+        for zone_slot, zone_name in enumerate(self.zones_names):
+            if flat_state[position_offset + zone_slot] > 0:
+                yield f"  (pos {zone_name})\n"
+            if discovered_zones[zone_slot]:
+                yield f"  (visited {zone_name})\n"
+        for slot in range(position_offset):
+            yield f"  (= {self.slot_fluent(slot)} {flat_state[slot]})\n"
+        for slot in range(zones_offset, compiled.state_size):
+            yield f"  (= {self.slot_fluent(slot)} {flat_state[slot]})\n"
+
+    def _goal(self, purpose: PDDLGoal) -> str:
+        if purpose is None:
+            return "(and )"
+        if not isinstance(purpose, Purpose):
+            purpose = Purpose(purpose)
+        if not purpose.terminal_groups:
+            return "(and )"
+        compiled_purpose = purpose.compiled
+        if compiled_purpose is None:
+            compiled_purpose = compile_purpose(purpose, self.world)
+
+        goals = []
+        for task in purpose.best_terminal_group.tasks:
+            task_index = purpose.tasks.index(task)
+            if not compiled_purpose.compiled_tasks[task_index]:
+                raise NotImplementedError(
+                    f"Task {task} is not compiled and cannot be exported to PDDL."
+                )
+            rows, _ = compiled_purpose.tasks_rows.row(task_index)
+            conditions = [
+                self._row_condition(compiled_purpose, row, task) for row in rows
+            ]
+            if compiled_purpose.any_row[task_index] and len(conditions) > 1:
+                goals.append(f"(or {' '.join(conditions)})")
+            else:
+                goals.extend(conditions)
+        return f"(and {' '.join(goals)})"
+
+    def _row_condition(
+        self, compiled_purpose: "CompiledPurpose", row: int, task: "Task"
+    ) -> str:
+        """PDDL condition of a threshold row of a compiled purpose."""
+        compiled = self.compiled
+        slots, coefficients = compiled_purpose.conditions.row(row)
+        threshold = int(compiled_purpose.thresholds[row])
+        terms = list(zip(slots.tolist(), coefficients.tolist()))
+        if any(
+            compiled.position_offset <= slot < compiled.zones_offset
+            for slot, _ in terms
+        ):
+            # Being in a zone is only exported as having visited it
+            if len(terms) != 1 or not 0 < threshold <= terms[0][1]:
+                raise NotImplementedError(
+                    f"Conditions on positions of task {task} cannot be exported to PDDL."
+                )
+            zone_slot = terms[0][0] - compiled.position_offset
+            return f"(visited {self.zones_names[zone_slot]})"
+
+        expressions = [
+            self.slot_fluent(slot)
+            if coefficient == 1
+            else f"(* {_number(coefficient)} {self.slot_fluent(slot)})"
+            for slot, coefficient in terms
+        ]
+        if not expressions:
+            expression = "0"
+        elif len(expressions) == 1:
+            expression = expressions[0]
+        else:
+            expression = f"(+ {' '.join(expressions)})"
+        return f"(>= {expression} {_number(threshold)})"
+
+
+def _row_items(sparse_rows, row: int) -> Iterator[Tuple[int, int]]:
+    slots, values = sparse_rows.row(row)
+    return zip(slots.tolist(), values.tolist())
+
+
+def _number(value: int) -> str:
+    if value < 0:
+        return f"(- {-value})"
+    return str(value)
+
+
+def _typed_constants(names: List[str], pddl_type: str) -> str:
+    if not names:
+        return ""
+    return f"  {' '.join(names)} - {pddl_type}\n"
+
+
+_PDDL_KEYWORDS = {
+    "action",
+    "all",
+    "and",
+    "at",
+    "constants",
+    "decrease",
+    "define",
+    "domain",
+    "duration",
+    "effect",
+    "either",
+    "end",
+    "exists",
+    "forall",
+    "goal",
+    "imply",
+    "increase",
+    "init",
+    "maximize",
+    "metric",
+    "minimize",
+    "not",
+    "number",
+    "object",
+    "objects",
+    "or",
+    "over",
+    "parameters",
+    "precondition",
+    "predicates",
+    "problem",
+    "requirements",
+    "start",
+    "types",
+    "when",
+}
+"""Words of PDDL that some planners do not accept as names."""
+
+
+def _pddl_name(name: str) -> str:
+    """Valid PDDL name from any name, starting with a letter."""
+    pddl_name = re.sub(r"[^a-z0-9_\-]", "_", name.lower())
+    if not pddl_name or not pddl_name[0].isalpha():
+        pddl_name = f"e_{pddl_name}"
+    if pddl_name in _PDDL_KEYWORDS:
+        pddl_name = f"{pddl_name}_"
+    return pddl_name
+
+
+def _unique_names(names: List[str]) -> List[str]:
+    """Valid and distinct PDDL names of the given names."""
+    unique_names = []
+    used = set()
+    for name in names:
+        pddl_name = _pddl_name(name)
+        unique_name, suffix = pddl_name, 1
+        while unique_name in used:
+            unique_name = f"{pddl_name}_{suffix}"
+            suffix += 1
+        used.add(unique_name)
+        unique_names.append(unique_name)
+    return unique_names
+
+
+@contextmanager
+def _text_file(file: PDDLFile) -> Iterator[TextIO]:
+    if isinstance(file, (str, Path)):
+        with open(file, "w", encoding="utf-8") as text_file:
+            yield text_file
+    else:
+        yield file
@@ -0,0 +1,217 @@
+"""# Plan cache
+
+Bounded cache of plans found for a HierarchyCraft world, keyed by state and goal,
+to avoid calling planners again on states that were already planned from.
+
+Plans are kept as lists of transformations ids.
+Each plan is replayed on the compiled world (see `hcraft.compiled`) when added,
+so that any state it visits gives back the remaining suffix of the plan.
+A state is identified by its flat compiled state and its discovered zones.
+
+Least recently used plans are dropped when the cache is full.
+The cache can be saved to a JSON file and loaded back with the same world,
+its elements in the same order (see `hcraft.world.World.layout_hash`).
+
+## Example
+
+```python
+from hcraft.plan_cache import PlanCache
+
+plan_cache = PlanCache(env.world, path="plans.json")
+for _ in range(100):
+    problem = env.planning_problem(plan_cache=plan_cache)
+    ... # Run episodes as usual, only new states are planned from
+plan_cache.save()
+```
+
+"""
+
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+from warnings import warn
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from hcraft.state import HcraftState
+    from hcraft.world import World
+
+_StateKey = bytes
+_PlanKey = Tuple[str, _StateKey]
+
+
+class PlanCache:
+    """Least recently used cache of plans of a HierarchyCraft world.
+
+    See `hcraft.plan_cache` for more details.
+    """
+
+    def __init__(
+        self,
+        world: "World",
+        max_size: int = 1024,
+        path: Optional[Union[str, Path]] = None,
+    ) -> None:
+        """
+        Args:
+            world: World in which plans are found.
+            max_size: Maximum number of plans kept. Defaults to 1024.
+            path: JSON file the cache is loaded from if it exists and saved to.
+                Defaults to None, for a cache kept in memory only.
+        """
+        if max_size < 1:
+            raise ValueError(f"Plan cache size should be positive, got {max_size}.")
+        self.world = world
+        self.max_size = max_size
+        self.path = Path(path) if path is not None else None
+        self.hits = 0
+        """Number of plans given back by the cache."""
+        self.misses = 0
+        """Number of states and goals without plan in the cache."""
+        self._plans: "OrderedDict[_PlanKey, _CachedPlan]" = OrderedDict()
+        self._suffixes: Dict[_PlanKey, Tuple[_PlanKey, int]] = {}
+        if self.path is not None and self.path.exists():
+            self.load(self.path)
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def get(self, state: "HcraftState", goal: str) -> Optional[List[int]]:
+        """Plan to the given goal from the given state if one was cached.
+
+        Args:
+            state: State to plan from.
+            goal: Key of the goal of the plan.
+
+        Returns:
+            Transformations ids of the plan, or None if no cached plan visits the state.
+        """
+        state_key = _state_key(
+            self.world.compiled.state_from(state), state.discovered_zones > 0
+        )
+        suffix = self._suffixes.get((goal, state_key))
+        if suffix is None:
+            self.misses += 1
+            return None
+        plan_key, start = suffix
+        self._plans.move_to_end(plan_key)
+        self.hits += 1
+        return list(self._plans[plan_key].plan[start:])
+
+    def add(self, state: "HcraftState", goal: str, plan: List[int]) -> None:
+        """Cache the plan found to the given goal from the given state.
+
+        Plans are assumed valid from the given state.
+
+        Args:
+            state: State the plan starts from.
+            goal: Key of the goal of the plan.
+            plan: Transformations ids of the plan.
+        """
+        self._add(
+            self.world.compiled.state_from(state),
+            state.discovered_zones > 0,
+            goal,
+            plan,
+        )
+
+    def save(self, path: Optional[Union[str, Path]] = None) -> None:
+        """Save cached plans to a JSON file, by default the path of the cache."""
+        path = Path(path) if path is not None else self.path
+        if path is None:
+            raise ValueError("No path was given to save the plan cache to.")
+        content = {
+            "world": self.world.layout_hash(),
+            "plans": [
+                {
+                    "goal": plan_key[0],
+                    "state": cached.state.tolist(),
+                    "discovered_zones": cached.discovered_zones.tolist(),
+                    "plan": cached.plan,
+                }
+                for plan_key, cached in self._plans.items()
+            ],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(content, file)
+        os.replace(tmp_path, path)
+
+    def load(self, path: Union[str, Path]) -> None:
+        """Add plans saved to a JSON file with the same world."""
+        with open(path, "r", encoding="utf-8") as file:
+            content = json.load(file)
+        if content["world"] != self.world.layout_hash():
+            warn(f"Plan cache {path} was saved for another world and is ignored.")
+            return
+        for saved in content["plans"]:
+            self._add(
+                np.array(saved["state"], dtype=np.int32),
+                np.array(saved["discovered_zones"], dtype=bool),
+                saved["goal"],
+                saved["plan"],
+            )
+
+    def _add(
+        self,
+        state: np.ndarray,
+        discovered_zones: np.ndarray,
+        goal: str,
+        plan: List[int],
+    ) -> None:
+        plan_key = (goal, _state_key(state, discovered_zones))
+        if plan_key in self._plans:
+            self._remove(plan_key)
+        plan = [int(action) for action in plan]
+        cached = _CachedPlan(
+            state,
+            discovered_zones,
+            plan,
+            visited_keys=_visited_keys(self.world, state, discovered_zones, plan),
+        )
+        self._plans[plan_key] = cached
+        for start, state_key in enumerate(cached.visited_keys):
+            self._suffixes[(goal, state_key)] = (plan_key, start)
+        while len(self._plans) > self.max_size:
+            self._remove(next(iter(self._plans)))
+
+    def _remove(self, plan_key: _PlanKey) -> None:
+        goal = plan_key[0]
+        cached = self._plans.pop(plan_key)
+        for state_key in cached.visited_keys:
+            if self._suffixes.get((goal, state_key), (None,))[0] == plan_key:
+                del self._suffixes[(goal, state_key)]
+
+
+@dataclass
+class _CachedPlan:
+    """Plan cached with the state it starts from."""
+
+    state: np.ndarray
+    discovered_zones: np.ndarray
+    plan: List[int]
+    visited_keys: List[_StateKey] = field(default_factory=list)
+    """Keys of states visited by the plan, before each of its steps and at its end."""
+
+
+def _visited_keys(
+    world: "World", state: np.ndarray, discovered_zones: np.ndarray, plan: List[int]
+) -> List[_StateKey]:
+    """Replay the plan from the given state to get the keys of the states it visits."""
+    compiled = world.compiled
+    keys = [_state_key(state, discovered_zones)]
+    for action in plan:
+        state = compiled.apply(state, action)
+        _, position, _ = compiled.split_state(state)
+        discovered_zones = discovered_zones | (position > 0)
+        keys.append(_state_key(state, discovered_zones))
+    return keys
+
+
+def _state_key(state: np.ndarray, discovered_zones: np.ndarray) -> _StateKey:
+    return state.astype(np.int32).tobytes() + discovered_zones.astype(bool).tobytes()
@@ -0,0 +1,210 @@
+"""# Plan validation
+
+Check plans, sequences of transformations ids, on the compiled world (see `hcraft.compiled`)
+without stepping an environment, for example to evaluate planners or generated plans.
+
+A plan is valid if each of its transformations can be applied in turn from the given state.
+Validation stops at the first invalid step
+and gives the state reached before it, with the reward obtained along the way
+and whether the purpose was terminated, computed on the compiled purpose
+(see `hcraft.compiled_purpose`).
+
+Thousands of candidate plans can be checked at once with `validate_plans`,
+every plan of the batch being advanced by one step in a few vectorized operations.
+
+## Example
+
+```python
+from hcraft.plan_validation import validate_plan, validate_plans
+
+validation = validate_plan(env.world, env.state, plan, env.purpose)
+if not validation.valid:
+    print(f"Step {validation.first_invalid_step} of the plan cannot be applied.")
+
+validations = validate_plans(env.world, env.state, candidate_plans, env.purpose)
+best_plan = candidate_plans[np.argmax(np.where(validations.valid, validations.rewards, -np.inf))]
+```
+
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Sequence, Union
+
+import numpy as np
+
+from hcraft.compiled_purpose import compile_purpose
+
+if TYPE_CHECKING:
+    from hcraft.purpose import Purpose
+    from hcraft.state import HcraftState
+    from hcraft.world import World
+
+NO_ACTION = -1
+"""Padding ending plans shorter than others in an array of plans."""
+
+
+@dataclass
+class PlanValidation:
+    """Validation of a single plan."""
+
+    first_invalid_step: Optional[int]
+    """Index of the first step that cannot be applied, None if the plan is valid."""
+    final_state: np.ndarray
+    """Flat state reached before the first invalid step, or at the end of the plan."""
+    reward: float
+    """Sum of rewards obtained until the first invalid step."""
+    terminated: bool
+    """Whether the purpose was terminated until the first invalid step."""
+
+    @property
+    def valid(self) -> bool:
+        """Whether every step of the plan can be applied."""
+        return self.first_invalid_step is None
+
+
+@dataclass
+class PlansValidation:
+    """Validation of a batch of plans."""
+
+    first_invalid_step: np.ndarray
+    """Index of the first step of each plan that cannot be applied, -1 for valid plans."""
+    final_states: np.ndarray
+    """Flat state reached by each plan before its first invalid step, of shape (N, S)."""
+    rewards: np.ndarray
+    """Sum of rewards obtained by each plan until its first invalid step."""
+    terminated: np.ndarray
+    """Whether the purpose was terminated by each plan until its first invalid step."""
+
+    @property
+    def valid(self) -> np.ndarray:
+        """Whether every step of each plan can be applied."""
+        return self.first_invalid_step < 0
+
+    def plan(self, index: int) -> PlanValidation:
+        """Validation of the plan at the given index of the batch."""
+        first_invalid_step = int(self.first_invalid_step[index])
+        return PlanValidation(
+            first_invalid_step=first_invalid_step if first_invalid_step >= 0 else None,
+            final_state=self.final_states[index],
+            reward=float(self.rewards[index]),
+            terminated=bool(self.terminated[index]),
+        )
+
+
+def validate_plan(
+    world: "World",
+    state: Union["HcraftState", np.ndarray],
+    plan: Sequence[int],
+    purpose: Optional["Purpose"] = None,
+) -> PlanValidation:
+    """Validate a plan from the given state on the compiled world.
+
+    Args:
+        world: World in which the plan is applied.
+        state: State the plan starts from, or its flat state.
+        plan: Transformations ids of the plan.
+        purpose: Purpose giving rewards and termination, its tasks already terminated
+            giving no reward again. Defaults to None, for no reward.
+
+    Returns:
+        Validation of the plan.
+
+    Raises:
+        ValueError: If some tasks of the purpose are not compiled.
+    """
+    return validate_plans(world, state, [plan], purpose).plan(0)
+
+
+def validate_plans(
+    world: "World",
+    states: Union["HcraftState", np.ndarray],
+    plans: Union[Sequence[Sequence[int]], np.ndarray],
+    purpose: Optional["Purpose"] = None,
+) -> PlansValidation:
+    """Validate a batch of plans on the compiled world, all plans advancing together.
+
+    Args:
+        world: World in which the plans are applied.
+        states: State all plans start from, its flat state of shape (S,),
+            or the flat state each plan starts from of shape (N, S).
+        plans: Transformations ids of each plan, either as sequences of any length
+            or as an array of shape (N, L) padded with `NO_ACTION`.
+        purpose: Purpose giving rewards and termination, its tasks already terminated
+            giving no reward again. Defaults to None, for no reward.
+
+    Returns:
+        Validation of each plan.
+
+    Raises:
+        ValueError: If some tasks of the purpose are not compiled.
+    """
+    compiled = world.compiled
+    actions = _padded_plans(plans)
+    n_plans = actions.shape[0]
+    if not isinstance(states, np.ndarray):
+        states = compiled.state_from(states)
+    states = np.array(np.broadcast_to(states, (n_plans, compiled.state_size)))
+
+    first_invalid_step = np.full(n_plans, -1, dtype=np.int64)
+    rewards = np.zeros(n_plans)
+    terminated = np.zeros(n_plans, dtype=bool)
+    compiled_purpose, tasks_terminated = None, None
+    if purpose is not None:
+        compiled_purpose = purpose.compiled
+        if compiled_purpose is None:
+            compiled_purpose = compile_purpose(purpose, world)
+        if not np.all(compiled_purpose.compiled_tasks):
+            raise ValueError(
+                "Plan validation needs all tasks to be compiled, got tasks of types"
+                " without compiler."
+            )
+        tasks_terminated = np.tile(
+            np.array([task.terminated for task in purpose.tasks], dtype=bool),
+            (n_plans, 1),
+        )
+        terminated = np.any(compiled_purpose.groups_done(tasks_terminated), axis=-1)
+
+    ended = np.zeros(n_plans, dtype=bool)
+    for step in range(actions.shape[1]):
+        step_actions = actions[:, step]
+        ended |= step_actions == NO_ACTION
+        plans_ids = np.flatnonzero(~ended & (first_invalid_step < 0))
+        if plans_ids.shape[0] == 0:
+            break
+
+        plans_actions = step_actions[plans_ids]
+        known = (plans_actions >= 0) & (plans_actions < compiled.n_transformations)
+        valid = np.zeros(plans_ids.shape[0], dtype=bool)
+        valid[known] = compiled.valid_mask(states[plans_ids[known]])[
+            np.arange(np.count_nonzero(known)), plans_actions[known]
+        ]
+        first_invalid_step[plans_ids[~valid]] = step
+
+        plans_ids, plans_actions = plans_ids[valid], plans_actions[valid]
+        states[plans_ids] = compiled.apply(states[plans_ids], plans_actions)
+        if compiled_purpose is not None:
+            step_rewards, step_terminated, tasks_terminated[plans_ids] = (
+                compiled_purpose.evaluate_batch(
+                    states[plans_ids], tasks_terminated[plans_ids]
+                )
+            )
+            rewards[plans_ids] += step_rewards
+            terminated[plans_ids] |= step_terminated
+
+    return PlansValidation(
+        first_invalid_step=first_invalid_step,
+        final_states=states,
+        rewards=rewards,
+        terminated=terminated,
+    )
+
+
+def _padded_plans(plans: Union[Sequence[Sequence[int]], np.ndarray]) -> np.ndarray:
+    """Plans as an array of shape (N, L) padded with NO_ACTION."""
+    if isinstance(plans, np.ndarray):
+        return np.atleast_2d(plans).astype(np.int64)
+    max_length = max((len(plan) for plan in plans), default=0)
+    actions = np.full((len(plans), max_length), NO_ACTION, dtype=np.int64)
+    for plan_index, plan in enumerate(plans):
+        actions[plan_index, : len(plan)] = plan
+    return actions
@@ -42,12 +42,52 @@ else:
 
 ```
 
+## Native planning
+
+Without any planning dependency, plans can also be found by a native graph search
+(breadth-first, greedy best-first or A*) directly over the compiled world states,
+see `hcraft.planning.NativePlanningProblem` and `hcraft.planning.search_plan`:
+
+```python
+planning_problem = env.native_planning_problem(algorithm="gbfs")
+action = planning_problem.action_from_plan(env.state)
+```
+
+It is fast enough to replan at every step on small environments.
+
+## Portfolio planning
+
+As no single planner is best on every environment, several planners and configurations,
+including the native search, can be run in parallel processes.
+The first valid plan found is kept, other planners are stopped
+and the name of the planner that found it is recorded in `stats`:
+
+```python
+planning_problem = env.planning_problem(
+    portfolio=["enhsp", "aries", ("native", {"algorithm": "gbfs", "heuristic": "hadd"})],
+)
+```
+
+## Plan cache
+
+Plans found from a state can be reused whenever a state they visit is met again,
+for example over many episodes of the same environment, see `hcraft.plan_cache`.
+Plans taken from the cache are recorded in `stats` with "cache" as planner:
+
+```python
+plan_cache = PlanCache(env.world)
+planning_problem = env.planning_problem(plan_cache=plan_cache)
+```
+
 ## HierarchyCraft as PDDL2.1 domain & problem
 
 The Unified Planning Framework itself allows to write planning problems in the PDDL2.1 language,
 commonly used in the planning community. For instructions, refer to the
 [UPF documentation](https://unified-planning.readthedocs.io/en/stable/interoperability.html).
 
+PDDL files can also be written directly from the compiled world without any planning dependency,
+much faster for large worlds and with batch export of many problems, see `hcraft.pddl`.
+
 
 ![](../../docs/images/PDDL_HierarchyCraft_domain.png)
 
@@ -87,13 +127,36 @@ If multiple terminal groups exists in the purpose, the PDDL goal will be the hig
 
 """
 
+import heapq
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from enum import Enum
 from warnings import warn
-from typing import TYPE_CHECKING, Dict, Optional, Union, List
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Set, Tuple, Union, List
 from copy import deepcopy
 
+import numpy as np
+
+from hcraft.compiled_purpose import compile_purpose
+from hcraft.heuristics import RelaxedCost, RelaxedHeuristics
+from hcraft.reachability import analyze_reachability
 
 from hcraft.transformation import Transformation, InventoryOwner
-from hcraft.task import Task, GetItemTask, PlaceItemTask, GoToZoneTask
+from hcraft.task import (
+    Task,
+    GetItemTask,
+    PlaceItemTask,
+    GoToZoneTask,
+    LinearConstraint,
+    LinearConstraintsTask,
+    Term,
+)
 from hcraft.purpose import Purpose
 from hcraft.elements import Zone, Item
 
@@ -101,8 +164,11 @@ from hcraft.elements import Zone, Item
 UPF_AVAILABLE = True
 try:
     import unified_planning.shortcuts as ups
-    from unified_planning.plans import SequentialPlan
-    from unified_planning.engines.results import PlanGenerationResult
+    from unified_planning.plans import ActionInstance, SequentialPlan
+    from unified_planning.engines.results import (
+        PlanGenerationResult,
+        PlanGenerationResultStatus,
+    )
     from unified_planning.model.problem import Problem
 
     UserType = ups.UserType
@@ -116,6 +182,8 @@ try:
     AND = ups.And
     GE = ups.GE
     LE = ups.LE
+    Plus = ups.Plus
+    Times = ups.Times
 
 
 except ImportError:
@@ -123,9 +191,24 @@ except ImportError:
 
 
 if TYPE_CHECKING:
+    from hcraft.compiled import CompiledWorld
+    from hcraft.compiled_purpose import CompiledPurpose
+    from hcraft.plan_cache import PlanCache
+    from hcraft.reachability import Reachability
     from hcraft.state import HcraftState
+    from hcraft.world import World
 
-Statistics = Dict[str, Union[int, float]]
+Statistics = Dict[str, Union[int, float, str]]
+
+NATIVE_PLANNER = "native"
+"""Name of the native search (see `NativePlanningProblem`) in planning portfolios."""
+
+PortfolioPlanner = Union[str, Tuple[str, Dict[str, Any]]]
+"""Planner of a portfolio, given by its name or by its name and parameters.
+
+Parameters are given to the unified planning engine,
+or to `NativePlanningProblem` for the native search.
+"""
 
 
 class HcraftPlanningProblem:
@@ -138,6 +221,8 @@ class HcraftPlanningProblem:
         purpose: Optional["Purpose"],
         timeout: float = 60,
         planner_name: Optional[str] = None,
+        plan_cache: Optional["PlanCache"] = None,
+        portfolio: Optional[List[PortfolioPlanner]] = None,
     ) -> None:
         """Initialize a HierarchyCraft planning problem on the given state and purpose.
 
@@ -147,6 +232,13 @@ class HcraftPlanningProblem:
             purpose: Purpose used to compute the planning goal.
             timeout: Time budget (s) for the plan to be found before giving up.
                 Set to -1 for no limit. Defaults to 60.
+            plan_cache: Cache of plans of the same world, possibly shared between problems,
+                used before calling the planner and filled with its plans.
+                Defaults to None, for no caching.
+            portfolio: Planners run in parallel processes instead of a single planner,
+                the first valid plan found is kept and other planners are stopped.
+                See `PortfolioPlanner`, the native search being named "native".
+                Defaults to None, for a single planner.
         """
         if not UPF_AVAILABLE:
             raise ImportError(
@@ -159,12 +251,23 @@ class HcraftPlanningProblem:
         self.stats: List["Statistics"] = []
         self.timeout = timeout
         self.planner_name = planner_name
+        self.plan_cache = plan_cache
+        self.portfolio = portfolio
+        self._native_problems: Dict[int, NativePlanningProblem] = {}
+        for index, planner in enumerate(portfolio or []):
+            planner_name, params = _portfolio_planner(planner)
+            if planner_name == NATIVE_PLANNER:
+                self._native_problems[index] = NativePlanningProblem(
+                    state, name, purpose, timeout=timeout, **params
+                )
+        self._goal_key = " & ".join(str(goal) for goal in self.upf_problem.goals)
 
     def action_from_plan(self, state: "HcraftState") -> Optional[int]:
         """Get the next gym action from a given state.
 
         If a plan is already existing, just use the next action in the plan.
-        If no plan exists, first update and solve the planning problem.
+        If no plan exists, first update and solve the planning problem,
+        unless a plan from this state is found in the plan cache.
 
         Args:
             state (HcraftState): Current state of the hcraft environement.
@@ -174,7 +277,9 @@ class HcraftPlanningProblem:
         """
         if self.plan is None:
             self.update_problem_to_state(self.upf_problem, state)
-            self.solve()
+            if not self._plan_from_cache(state):
+                self.solve()
+                self._add_plan_to_cache(state)
         if not self.plan.actions:  # Empty plan, nothing to do
             return None
         plan_action_name = str(self.plan.actions.pop(0))
@@ -186,37 +291,89 @@ class HcraftPlanningProblem:
     def update_problem_to_state(self, upf_problem: "Problem", state: "HcraftState"):
         """Update the planning problem initial state to the given state.
 
+        Only fluents that changed since the last update of the same problem are set,
+        by comparing state arrays to the ones of the last update.
+
         Args:
+            upf_problem: Unified planning problem to update.
             state: HierarchyCraft state to use as reference for the
                 initial state of the planning problem.
         """
-        current_pos = state.current_zone
-        for zone in state.world.zones:
-            discovered = state.has_discovered(zone)
-            if current_pos is not None:
-                upf_problem.set_initial_value(
-                    self.pos(self.zones_obj[zone]), zone == current_pos
-                )
+        synced = _SyncedState.from_state(state)
+        previous = None
+        if self._synced_problem is upf_problem:
+            previous = self._synced_state
+
+        for (zone_index,) in synced.changed(previous, "position"):
+            upf_problem.set_initial_value(
+                self.pos(self._zones_objs[zone_index]),
+                bool(synced.position[zone_index]),
+            )
+        for (zone_index,) in synced.changed(previous, "discovered_zones"):
+            upf_problem.set_initial_value(
+                self.visited(self._zones_objs[zone_index]),
+                bool(synced.discovered_zones[zone_index]),
+            )
+        for (item_index,) in synced.changed(previous, "player_inventory"):
             upf_problem.set_initial_value(
-                self.visited(self.zones_obj[zone]), discovered
+                self.amount(self._items_objs[item_index]),
+                int(synced.player_inventory[item_index]),
+            )
+        for zone_index, zone_item_index in synced.changed(
+            previous, "zones_inventories"
+        ):
+            upf_problem.set_initial_value(
+                self.amount_at(
+                    self._zone_items_objs[zone_item_index],
+                    self._zones_objs[zone_index],
+                ),
+                int(synced.zones_inventories[zone_index, zone_item_index]),
             )
 
-        for item in state.world.items:
-            quantity = state.amount_of(item)
-            upf_problem.set_initial_value(self.amount(self.items_obj[item]), quantity)
-
-        for zone in state.world.zones:
-            for zone_item in state.world.zones_items:
-                quantity = state.amount_of(zone_item, zone)
-                upf_problem.set_initial_value(
-                    self.amount_at(
-                        self.zone_items_obj[zone_item], self.zones_obj[zone]
-                    ),
-                    quantity,
-                )
+        self._synced_problem = upf_problem
+        self._synced_state = synced
+
+    def _plan_from_cache(self, state: "HcraftState") -> bool:
+        """Use the cached plan from the given state if any."""
+        if self.plan_cache is None:
+            return False
+        actions = self.plan_cache.get(state, self._goal_key)
+        if actions is None:
+            return False
+        self.plan = self._sequential_plan(
+            state.world.compiled.state_from(state), actions
+        )
+        self.plans.append(deepcopy(self.plan))
+        self.stats.append({"planner": "cache"})
+        return True
+
+    def _add_plan_to_cache(self, state: "HcraftState") -> None:
+        if self.plan_cache is None:
+            return
+        actions = [int(str(action).split("_")[0]) for action in self.plan.actions]
+        self.plan_cache.add(state, self._goal_key, actions)
+
+    def _sequential_plan(
+        self, flat_state: np.ndarray, actions: List[int]
+    ) -> "SequentialPlan":
+        """Plan of the given transformations, located in the zone of each of their steps."""
+        compiled = self._compiled
+        actions_instances = []
+        for action in actions:
+            parameters = ()
+            if self._zones_objs:
+                zone_slot = compiled.zone_slots(flat_state)
+                parameters = (self._zones_objs[int(zone_slot)],)
+            actions_instances.append(
+                ActionInstance(self.upf_problem.actions[action], parameters)
+            )
+            flat_state = compiled.apply(flat_state, action)
+        return SequentialPlan(actions_instances)
 
     def solve(self) -> "PlanGenerationResult":
-        """Solve the current planning problem with a planner."""
+        """Solve the current planning problem with a planner, or a portfolio of planners."""
+        if self.portfolio:
+            return self._solve_portfolio()
         planner_kwargs = {"problem_kind": self.upf_problem.kind}
         if self.planner_name is not None:
             planner_kwargs.update(name=self.planner_name)
@@ -231,13 +388,86 @@ class HcraftPlanningProblem:
         self.stats.append(_read_statistics(results))
         return results
 
+    def _solve_portfolio(self) -> "PlanGenerationResult":
+        """Run planners of the portfolio in parallel until one finds a valid plan."""
+        flat_state = self._synced_state.flat_state()
+        for native_problem in self._native_problems.values():
+            native_problem.state = flat_state
+        results_queue = multiprocessing.Queue()
+        processes = []
+        for index, planner in enumerate(self.portfolio):
+            solver = self._native_problems.get(index)
+            if solver is None:
+                solver = _portfolio_planner(planner)
+            process = multiprocessing.Process(
+                target=_solve_in_portfolio,
+                args=(index, solver, self.upf_problem, self.timeout, results_queue),
+                daemon=True,
+            )
+            process.start()
+            processes.append(process)
+
+        deadline = None
+        if self.timeout >= 0:
+            deadline = time.perf_counter() + self.timeout + _PORTFOLIO_GRACE_TIME
+        winner: Optional[Tuple[int, List[int], Statistics]] = None
+        reported: Set[int] = set()
+        try:
+            while winner is None and len(reported) < len(processes):
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                try:
+                    results = [results_queue.get(timeout=_PORTFOLIO_POLL_INTERVAL)]
+                except queue.Empty:
+                    if any(process.is_alive() for process in processes):
+                        continue
+                    # Results put by planners ending during the poll are still queued
+                    results = _queued_results(results_queue)
+                    if not results:
+                        break
+                for index, actions, stats in results:
+                    reported.add(index)
+                    if winner is not None or actions is None:
+                        continue
+                    if self._is_valid_plan(flat_state, actions):
+                        winner = (index, actions, stats)
+        finally:
+            for process in processes:
+                _stop_portfolio_process(process)
+            results_queue.close()
+
+        if winner is None:
+            raise ValueError("Not plan could be found for this problem.")
+        index, actions, stats = winner
+        planner_name, params = _portfolio_planner(self.portfolio[index])
+        plan = self._sequential_plan(flat_state, actions)
+        self.plan = plan
+        self.plans.append(deepcopy(plan))
+        self.stats.append({**stats, "planner": _portfolio_label(planner_name, params)})
+        return PlanGenerationResult(
+            PlanGenerationResultStatus.SOLVED_SATISFICING, plan, planner_name
+        )
+
+    def _is_valid_plan(self, flat_state: np.ndarray, actions: List[int]) -> bool:
+        """Whether each transformation of the plan can be applied in turn."""
+        compiled = self._compiled
+        for action in actions:
+            if not compiled.is_valid(flat_state, action):
+                return False
+            flat_state = compiled.apply(flat_state, action)
+        return True
+
     def _init_problem(
         self, state: "HcraftState", name: str, purpose: Optional["Purpose"]
     ) -> "Problem":
         """Build a unified planning problem from the given world and purpose.
 
+        Types, objects, fluents and actions are cloned from the planning template
+        of the world, built only once for worlds with the same content.
+        Only the goal and initial state are set for each problem.
+
         Args:
-            world: HierarchyCraft world to generate the problem from.
+            state: HierarchyCraft state of the world to generate the problem from.
             name: Name given to the planning problem.
             purpose: Purpose of the agent.
                 Will be used to set the goal of the planning problem.
@@ -245,28 +475,52 @@ class HcraftPlanningProblem:
         Returns:
             Problem: Unified planning problem.
         """
-        upf_problem = Problem(name)
+        world = state.world
+        self._use_template(_planning_template(world, self._build_template))
+        self._compiled = world.compiled
+        self._zones_objs = [self.zones_obj[zone] for zone in world.zones]
+        self._items_objs = [self.items_obj[item] for item in world.items]
+        self._zone_items_objs = [
+            self.zone_items_obj[item] for item in world.zones_items
+        ]
+        self._synced_problem: Optional["Problem"] = None
+        self._synced_state: Optional["_SyncedState"] = None
+
+        upf_problem = self._template.problem.clone()
+        upf_problem.name = name
+
+        if purpose is not None and purpose.terminal_groups:
+            upf_problem.add_goal(self._purpose_to_goal(purpose))
+        else:
+            warn("No purpose was given, thus all plans will be empty.")
+
+        self.update_problem_to_state(upf_problem, state)
+        return upf_problem
+
+    def _build_template(self, world: "World") -> "_PlanningTemplate":
+        """Build the types, objects, fluents and actions of the given world."""
         self.zone_type = UserType("zone")
         self.player_item_type = UserType("player_item")
         self.zone_item_type = UserType("zone_item")
 
         self.zones_obj: Dict[Zone, "Object"] = {}
-        for zone in state.world.zones:
+        for zone in world.zones:
             self.zones_obj[zone] = Object(zone.name, self.zone_type)
 
         self.items_obj: Dict[Item, "Object"] = {}
-        for item in state.world.items:
+        for item in world.items:
             self.items_obj[item] = Object(item.name, self.player_item_type)
 
         self.zone_items_obj: Dict[Item, "Object"] = {}
-        for item in state.world.zones_items:
+        for item in world.zones_items:
             self.zone_items_obj[item] = Object(
                 f"{item.name}_in_zone", self.zone_item_type
             )
 
-        upf_problem.add_objects(self.zones_obj.values())
-        upf_problem.add_objects(self.items_obj.values())
-        upf_problem.add_objects(self.zone_items_obj.values())
+        domain = Problem("hcraft_domain")
+        domain.add_objects(self.zones_obj.values())
+        domain.add_objects(self.items_obj.values())
+        domain.add_objects(self.zone_items_obj.values())
 
         self.pos = Fluent("pos", BoolType(), zone=self.zone_type)
         self.visited = Fluent("visited", BoolType(), zone=self.zone_type)
@@ -275,24 +529,42 @@ class HcraftPlanningProblem:
             "amount_at", IntType(), item=self.zone_item_type, zone=self.zone_type
         )
 
-        upf_problem.add_fluent(self.pos, default_initial_value=False)
-        upf_problem.add_fluent(self.visited, default_initial_value=False)
-        upf_problem.add_fluent(self.amount, default_initial_value=0)
-        upf_problem.add_fluent(self.amount_at, default_initial_value=0)
+        domain.add_fluent(self.pos, default_initial_value=False)
+        domain.add_fluent(self.visited, default_initial_value=False)
+        domain.add_fluent(self.amount, default_initial_value=0)
+        domain.add_fluent(self.amount_at, default_initial_value=0)
 
         actions = []
-        for t_id, transfo in enumerate(state.world.transformations):
+        for t_id, transfo in enumerate(world.transformations):
             actions.append(self._action_from_transformation(transfo, t_id))
 
-        upf_problem.add_actions(actions)
-
-        if purpose is not None and purpose.terminal_groups:
-            upf_problem.add_goal(self._purpose_to_goal(purpose))
-        else:
-            warn("No purpose was given, thus all plans will be empty.")
+        domain.add_actions(actions)
+        return _PlanningTemplate(
+            problem=domain,
+            zone_type=self.zone_type,
+            player_item_type=self.player_item_type,
+            zone_item_type=self.zone_item_type,
+            zones_obj=self.zones_obj,
+            items_obj=self.items_obj,
+            zone_items_obj=self.zone_items_obj,
+            pos=self.pos,
+            visited=self.visited,
+            amount=self.amount,
+            amount_at=self.amount_at,
+        )
 
-        self.update_problem_to_state(upf_problem, state)
-        return upf_problem
+    def _use_template(self, template: "_PlanningTemplate") -> None:
+        self._template = template
+        self.zone_type = template.zone_type
+        self.player_item_type = template.player_item_type
+        self.zone_item_type = template.zone_item_type
+        self.zones_obj = template.zones_obj
+        self.items_obj = template.items_obj
+        self.zone_items_obj = template.zone_items_obj
+        self.pos = template.pos
+        self.visited = template.visited
+        self.amount = template.amount
+        self.amount_at = template.amount_at
 
     def _action_from_transformation(
         self, transformation: "Transformation", transformation_id: int
@@ -387,7 +659,53 @@ class HcraftPlanningProblem:
             return OR(*conditions)
         if isinstance(task, GoToZoneTask):
             return self.visited(self.zones_obj[task.zone])
-        raise NotImplementedError
+        if isinstance(task, LinearConstraintsTask):
+            conditions = [
+                self._constraint_to_goal(task, constraint)
+                for constraint in task.constraints
+            ]
+            if len(conditions) == 1:
+                return conditions[0]
+            if task.any_constraint:
+                return OR(*conditions)
+            return AND(*conditions)
+        raise NotImplementedError(
+            f"Tasks of type {type(task).__name__} cannot be planned with"
+            " unified planning, use NativePlanningProblem instead."
+        )
+
+    def _constraint_to_goal(
+        self, task: LinearConstraintsTask, constraint: LinearConstraint
+    ):
+        terms = constraint.terms
+        if any(term.item is None for term in terms):
+            # Being in a zone is only planned as having visited it, as in hcraft.pddl
+            if (
+                len(terms) != 1
+                or constraint.at_most
+                or not 0 < constraint.threshold <= terms[0].coefficient
+            ):
+                raise NotImplementedError(
+                    f"Conditions on positions of {type(task).__name__} {task}"
+                    " cannot be planned with unified planning,"
+                    " use NativePlanningProblem instead."
+                )
+            return self.visited(self.zones_obj[terms[0].zone])
+        expressions = [
+            self._term_fluent(term)
+            if term.coefficient == 1
+            else Times(term.coefficient, self._term_fluent(term))
+            for term in terms
+        ]
+        expression = expressions[0] if len(expressions) == 1 else Plus(*expressions)
+        if constraint.at_most:
+            return LE(expression, constraint.threshold)
+        return GE(expression, constraint.threshold)
+
+    def _term_fluent(self, term: Term):
+        if term.zone is None:
+            return self.amount(self.items_obj[term.item])
+        return self.amount_at(self.zone_items_obj[term.item], self.zones_obj[term.zone])
 
     def _purpose_to_goal(self, purpose: "Purpose"):
         # Individual tasks goals
@@ -399,6 +717,511 @@ class HcraftPlanningProblem:
         return AND(*[goals[task] for task in purpose.best_terminal_group.tasks])
 
 
+@dataclass(frozen=True)
+class _PlanningTemplate:
+    """Unified planning domain of a world, without initial state nor goal.
+
+    Templates are shared by planning problems of worlds with the same content,
+    each problem cloning the template domain.
+    """
+
+    problem: "Problem"
+    zone_type: "UserType"
+    player_item_type: "UserType"
+    zone_item_type: "UserType"
+    zones_obj: Dict[Zone, "Object"]
+    items_obj: Dict[Item, "Object"]
+    zone_items_obj: Dict[Item, "Object"]
+    pos: "Fluent"
+    visited: "Fluent"
+    amount: "Fluent"
+    amount_at: "Fluent"
+
+
+_PLANNING_TEMPLATES_CACHE_SIZE = 16
+_planning_templates: "OrderedDict[str, _PlanningTemplate]" = OrderedDict()
+
+
+def _planning_template(
+    world: "World", build: Callable[["World"], _PlanningTemplate]
+) -> _PlanningTemplate:
+    """Planning template of the given world, built once per world content."""
+    key = world.content_hash()
+    template = _planning_templates.get(key)
+    if template is not None:
+        _planning_templates.move_to_end(key)
+        return template
+    template = build(world)
+    _planning_templates[key] = template
+    if len(_planning_templates) > _PLANNING_TEMPLATES_CACHE_SIZE:
+        _planning_templates.popitem(last=False)
+    return template
+
+
+@dataclass(frozen=True)
+class _SyncedState:
+    """State arrays last set as the initial state of a unified planning problem."""
+
+    position: np.ndarray
+    discovered_zones: np.ndarray
+    player_inventory: np.ndarray
+    zones_inventories: np.ndarray
+
+    @classmethod
+    def from_state(cls, state: "HcraftState") -> "_SyncedState":
+        return cls(
+            position=state.position > 0,
+            discovered_zones=state.discovered_zones > 0,
+            player_inventory=state.player_inventory.copy(),
+            zones_inventories=state.zones_inventories.copy(),
+        )
+
+    def flat_state(self) -> np.ndarray:
+        """Flat state of the synced arrays, see `hcraft.compiled`."""
+        return np.concatenate(
+            (
+                self.player_inventory,
+                self.position,
+                self.zones_inventories.ravel(),
+            )
+        ).astype(np.int32)
+
+    def changed(
+        self, previous: Optional["_SyncedState"], array_name: str
+    ) -> List[Tuple[int, ...]]:
+        """Indexes of the given array that changed since the previous synced state.
+
+        All indexes are given if there is no previous synced state.
+        """
+        array: np.ndarray = getattr(self, array_name)
+        if previous is None:
+            changed = np.ones(array.shape, dtype=bool)
+        else:
+            changed = array != getattr(previous, array_name)
+        return [tuple(index) for index in np.argwhere(changed).tolist()]
+
+
+class SearchAlgorithm(Enum):
+    """Graph search algorithms of the native planner."""
+
+    BFS = "bfs"
+    """Breadth-first search, plans have the fewest possible steps."""
+    GBFS = "gbfs"
+    """Greedy best-first search on the heuristic only, fast but plans may be longer."""
+    ASTAR = "astar"
+    """A* search, plans have the fewest possible steps if the heuristic is admissible."""
+
+
+Heuristic = Callable[[np.ndarray, np.ndarray], np.ndarray]
+"""Estimated number of steps to the goal of a batch of search nodes.
+
+Called with flat states of shape (N, S) and goal tasks achievements of shape (N, G),
+returns an array of shape (N,).
+"""
+
+
+def goal_count_heuristic(_states: np.ndarray, achieved: np.ndarray) -> np.ndarray:
+    """Number of goal tasks not achieved yet, not admissible."""
+    return np.count_nonzero(~achieved, axis=-1)
+
+
+def blind_heuristic(_states: np.ndarray, achieved: np.ndarray) -> np.ndarray:
+    """One step if some goal task is not achieved yet, admissible."""
+    return (~np.all(achieved, axis=-1)).astype(np.int64)
+
+
+@dataclass
+class SearchResult:
+    """Result of a native graph search."""
+
+    plan: Optional[List[int]]
+    """Transformations indexes to apply in order, None if no plan was found."""
+    expanded: int = 0
+    """Number of expanded search nodes."""
+    generated: int = 0
+    """Number of distinct search nodes generated."""
+    search_time: float = 0.0
+    """Time spent searching in seconds."""
+
+    @property
+    def stats(self) -> Statistics:
+        """Statistics of the search."""
+        stats = {
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "search_time": self.search_time,
+        }
+        if self.plan is not None:
+            stats["plan_length"] = len(self.plan)
+        return stats
+
+
+def search_plan(
+    compiled_world: "CompiledWorld",
+    compiled_purpose: "CompiledPurpose",
+    state: np.ndarray,
+    goal_tasks: Union[List[int], np.ndarray],
+    achieved: Optional[np.ndarray] = None,
+    algorithm: Union[str, SearchAlgorithm] = SearchAlgorithm.ASTAR,
+    heuristic: Optional[Heuristic] = None,
+    timeout: Optional[float] = None,
+    max_expansions: Optional[int] = None,
+) -> SearchResult:
+    """Search a plan achieving all goal tasks from the given flat state.
+
+    Search nodes are flat states of the compiled world together with
+    the goal tasks already achieved on the way, as tasks stay achieved once done.
+    Nodes are hashed by their bytes to detect already visited nodes.
+
+    Args:
+        compiled_world: Compiled world to search in, see `hcraft.compiled`.
+        compiled_purpose: Compiled purpose evaluating tasks, see `hcraft.compiled_purpose`.
+        state: Flat state to start the search from.
+        goal_tasks: Indexes of the tasks of the purpose to achieve.
+        achieved: Whether each goal task is already achieved. Defaults to none of them.
+        algorithm: Search algorithm to use. Defaults to A*.
+        heuristic: Heuristic guiding GBFS and A*, see also `hcraft.heuristics`.
+            Defaults to `goal_count_heuristic` for GBFS and `blind_heuristic` for A*.
+            Nodes with an infinite estimate are pruned.
+        timeout: Time budget (s) of the search. Defaults to None, hence no limit.
+        max_expansions: Maximum number of expanded nodes. Defaults to None, hence no limit.
+
+    Returns:
+        The search result, with no plan if the goal is unreachable or the budget exceeded.
+    """
+    start_time = time.perf_counter()
+    algorithm = SearchAlgorithm(algorithm)
+    goal_tasks = np.asarray(goal_tasks, dtype=np.int64)
+    if not np.all(compiled_purpose.compiled_tasks[goal_tasks]):
+        raise ValueError("Native planning needs all goal tasks to be compiled.")
+    if heuristic is None:
+        heuristic = blind_heuristic
+        if algorithm is SearchAlgorithm.GBFS:
+            heuristic = goal_count_heuristic
+
+    state = np.asarray(state, dtype=np.int32)
+    if achieved is None:
+        achieved = np.zeros(goal_tasks.shape[0], dtype=bool)
+    achieved = achieved | compiled_purpose.tasks_done(state)[goal_tasks]
+    root = state.tobytes() + achieved.tobytes()
+    parents: Dict[bytes, Optional[Tuple[bytes, int]]] = {root: None}
+    depths: Dict[bytes, int] = {root: 0}
+    result = SearchResult(plan=None, generated=1)
+    if np.all(achieved):
+        result.plan = []
+        return result
+
+    tie_breaker = itertools.count()
+    frontier = deque() if algorithm is SearchAlgorithm.BFS else []
+    _push(frontier, algorithm, 0, 0, next(tie_breaker), (root, state, achieved))
+    while frontier:
+        if max_expansions is not None and result.expanded >= max_expansions:
+            break
+        if timeout is not None and time.perf_counter() - start_time > timeout:
+            break
+        depth, key, state, achieved = _pop(frontier, algorithm)
+        if depth > depths[key]:
+            continue  # Outdated A* entry, a shorter path was found since
+        if algorithm is SearchAlgorithm.ASTAR and np.all(achieved):
+            result.plan = _plan_to(key, parents)
+            break
+        result.expanded += 1
+
+        actions = np.flatnonzero(compiled_world.valid_mask(state))
+        if actions.shape[0] == 0:
+            continue
+        children = compiled_world.apply(
+            np.broadcast_to(state, (actions.shape[0], state.shape[0])), actions
+        )
+        children_achieved = (
+            achieved | compiled_purpose.tasks_done(children)[:, goal_tasks]
+        )
+        new_children = []
+        for child_index, action in enumerate(actions.tolist()):
+            child_key = (
+                children[child_index].tobytes()
+                + children_achieved[child_index].tobytes()
+            )
+            if child_key in depths:
+                # Only A* reopens nodes reached again by a shorter path
+                if algorithm is not SearchAlgorithm.ASTAR:
+                    continue
+                if depths[child_key] <= depth + 1:
+                    continue
+            else:
+                result.generated += 1
+            parents[child_key] = (key, action)
+            depths[child_key] = depth + 1
+            new_children.append((child_index, child_key))
+        if not new_children:
+            continue
+
+        if algorithm is not SearchAlgorithm.ASTAR:
+            for child_index, child_key in new_children:
+                if np.all(children_achieved[child_index]):
+                    result.plan = _plan_to(child_key, parents)
+                    break
+            if result.plan is not None:
+                break
+
+        indexes = [child_index for child_index, _ in new_children]
+        estimates = np.zeros(len(indexes), dtype=np.int64)
+        if algorithm is not SearchAlgorithm.BFS:
+            estimates = heuristic(children[indexes], children_achieved[indexes])
+        for (child_index, child_key), estimate in zip(new_children, estimates.tolist()):
+            if estimate == np.inf:
+                continue  # Dead end for a relaxed heuristic
+            node = (child_key, children[child_index], children_achieved[child_index])
+            _push(frontier, algorithm, depth + 1, estimate, next(tie_breaker), node)
+
+    result.search_time = time.perf_counter() - start_time
+    return result
+
+
+def _push(
+    frontier: Union[list, deque],
+    algorithm: SearchAlgorithm,
+    depth: int,
+    estimate: float,
+    tie: int,
+    node: Tuple[bytes, np.ndarray, np.ndarray],
+) -> None:
+    if algorithm is SearchAlgorithm.BFS:
+        frontier.append((depth, *node))
+        return
+    priority = estimate
+    if algorithm is SearchAlgorithm.ASTAR:
+        priority = depth + estimate
+    heapq.heappush(frontier, (priority, estimate, tie, depth, *node))
+
+
+def _pop(
+    frontier: Union[list, deque], algorithm: SearchAlgorithm
+) -> Tuple[int, bytes, np.ndarray, np.ndarray]:
+    if algorithm is SearchAlgorithm.BFS:
+        return frontier.popleft()
+    return heapq.heappop(frontier)[3:]
+
+
+def _plan_to(
+    key: bytes, parents: Dict[bytes, Optional[Tuple[bytes, int]]]
+) -> List[int]:
+    plan = []
+    while parents[key] is not None:
+        key, action = parents[key]
+        plan.append(action)
+    plan.reverse()
+    return plan
+
+
+class NativePlanningProblem:
+    """Planning problem solved by a native graph search over the compiled world.
+
+    It needs no external planner and has the same interface as `HcraftPlanningProblem`,
+    plans being lists of transformations indexes.
+    The goal is to achieve all tasks of the best terminal group of the purpose.
+    """
+
+    def __init__(
+        self,
+        state: "HcraftState",
+        name: str,
+        purpose: Optional["Purpose"],
+        timeout: float = 60,
+        algorithm: Union[str, SearchAlgorithm] = SearchAlgorithm.ASTAR,
+        heuristic: Optional[Union[str, "RelaxedCost", Heuristic]] = None,
+        max_expansions: Optional[int] = None,
+    ) -> None:
+        """Initialize a native planning problem on the given state and purpose.
+
+        Args:
+            state: Initial state of the HierarchyCraft environment.
+            name: Name of the planning problem.
+            purpose: Purpose used to compute the planning goal.
+            timeout: Time budget (s) for the plan to be found before giving up.
+                Set to -1 for no limit. Defaults to 60.
+            algorithm: Search algorithm to use. Defaults to A*.
+            heuristic: Heuristic guiding the search, see `search_plan`,
+                or the name of a relaxed heuristic ("hmax" or "hadd"),
+                see `hcraft.heuristics`.
+            max_expansions: Maximum number of expanded nodes. Defaults to None, hence no limit.
+        """
+        self.name = name
+        self.world = state.world
+        self.purpose = purpose
+        self.timeout = timeout
+        self.algorithm = SearchAlgorithm(algorithm)
+        self.heuristic = heuristic
+        self.max_expansions = max_expansions
+        self.state = self.world.compiled.state_from(state)
+        """Flat state the next plan will start from."""
+        self.plan: Optional[List[int]] = None
+        self.plans: List[List[int]] = []
+        self.stats: List[Statistics] = []
+        self._reachability: Optional["Reachability"] = None
+        self._relaxed_heuristics: Optional[RelaxedHeuristics] = None
+        if purpose is None or not purpose.terminal_groups:
+            warn("No purpose was given, thus all plans will be empty.")
+
+    def action_from_plan(self, state: "HcraftState") -> Optional[int]:
+        """Get the next gym action from a given state.
+
+        If a plan is already existing, just use the next action in the plan.
+        If no plan exists, first update and solve the planning problem.
+
+        Args:
+            state (HcraftState): Current state of the hcraft environement.
+
+        Returns:
+            int: Action to take according to the plan. Returns None if no action is required.
+        """
+        if self.plan is None:
+            self.update_problem_to_state(state)
+            self.solve()
+        if not self.plan:  # Empty plan, nothing to do
+            return None
+        action = self.plan.pop(0)
+        if not self.plan:
+            self.plan = None
+        return action
+
+    def update_problem_to_state(self, state: "HcraftState") -> None:
+        """Update the planning problem initial state to the given state."""
+        self.state = self.world.compiled.state_from(state)
+
+    def solve(self) -> SearchResult:
+        """Search a plan from the current initial state."""
+        if self.purpose is None or not self.purpose.terminal_groups:
+            result = SearchResult(plan=[])
+        else:
+            result = self._search()
+        if result.plan is None:
+            raise ValueError("Not plan could be found for this problem.")
+        self.plan = list(result.plan)
+        self.plans.append(list(result.plan))
+        self.stats.append(result.stats)
+        return result
+
+    def _may_be_solvable(self, task: "Task") -> bool:
+        """Whether the task is reachable in the relaxed world.
+
+        States reached later are reachable from the world initial state,
+        so tasks unreachable from it never need to be searched for.
+        """
+        if self._reachability is None:
+            self._reachability = analyze_reachability(self.world)
+        return self._reachability.is_solvable(task)
+
+    def _search(self) -> SearchResult:
+        purpose = self.purpose
+        compiled_purpose = purpose.compiled
+        if compiled_purpose is None:
+            compiled_purpose = compile_purpose(purpose, self.world)
+        goal = purpose.best_terminal_group.tasks
+        if not all(self._may_be_solvable(task) for task in goal):
+            return SearchResult(plan=None)
+        goal_tasks = [purpose.tasks.index(task) for task in goal]
+        achieved = np.array([task.terminated for task in goal], dtype=bool)
+        heuristic = self.heuristic
+        if isinstance(heuristic, (str, RelaxedCost)):
+            if self._relaxed_heuristics is None:
+                self._relaxed_heuristics = RelaxedHeuristics(self.world.compiled)
+            heuristic = self._relaxed_heuristics.heuristic(
+                compiled_purpose, goal_tasks, heuristic
+            )
+        timeout = self.timeout if self.timeout >= 0 else None
+        return search_plan(
+            self.world.compiled,
+            compiled_purpose,
+            self.state,
+            goal_tasks,
+            achieved=achieved,
+            algorithm=self.algorithm,
+            heuristic=heuristic,
+            timeout=timeout,
+            max_expansions=self.max_expansions,
+        )
+
+
+_PORTFOLIO_POLL_INTERVAL = 0.1
+"""Time (s) between checks that portfolio planners are still running."""
+_PORTFOLIO_GRACE_TIME = 5.0
+"""Time (s) given to portfolio planners after the timeout to report their results."""
+
+
+def _portfolio_planner(planner: PortfolioPlanner) -> Tuple[str, Dict[str, Any]]:
+    if isinstance(planner, str):
+        return planner, {}
+    planner_name, params = planner
+    return planner_name, dict(params)
+
+
+def _portfolio_label(planner_name: str, params: Dict[str, Any]) -> str:
+    if not params:
+        return planner_name
+    params_str = ", ".join(f"{key}={value}" for key, value in params.items())
+    return f"{planner_name}({params_str})"
+
+
+def _solve_in_portfolio(
+    index: int,
+    solver: Union["NativePlanningProblem", Tuple[str, Dict[str, Any]]],
+    upf_problem: "Problem",
+    timeout: float,
+    results_queue: "multiprocessing.Queue",
+) -> None:
+    """Solve the planning problem in a portfolio process and send back the plan found.
+
+    Plans are sent as transformations ids, None if no plan was found.
+    """
+    if hasattr(os, "setpgrp"):  # Planners subprocesses are stopped with this process
+        os.setpgrp()
+    actions, stats = None, {}
+    try:
+        if isinstance(solver, NativePlanningProblem):
+            result = solver.solve()
+            actions, stats = list(result.plan), result.stats
+        else:
+            planner_name, params = solver
+            with OneshotPlanner(name=planner_name, params=params) as planner:
+                results: "PlanGenerationResult" = planner.solve(
+                    upf_problem, timeout=timeout
+                )
+            if results.plan is not None:
+                actions = [
+                    int(str(action).split("_")[0]) for action in results.plan.actions
+                ]
+                try:
+                    stats = _read_statistics(results)
+                except NotImplementedError:
+                    stats = {}
+    except Exception:  # Planners failing leave others running
+        actions, stats = None, {}
+    results_queue.put((index, actions, stats))
+
+
+def _queued_results(
+    results_queue: "multiprocessing.Queue",
+) -> List[Tuple[int, Optional[List[int]], Statistics]]:
+    """All results left in the queue of portfolio results."""
+    results = []
+    while True:
+        try:
+            results.append(results_queue.get_nowait())
+        except queue.Empty:
+            return results
+
+
+def _stop_portfolio_process(process: multiprocessing.Process) -> None:
+    """Stop a portfolio process along with the planners subprocesses it started."""
+    if process.is_alive():
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except (AttributeError, OSError):  # No process group to stop
+            process.terminate()
+    process.join()
+
+
 def _read_statistics(results: "PlanGenerationResult") -> Statistics:
     if results.engine_name == "enhsp":
         return _read_enhsp_stats(results)
@@ -9,6 +9,7 @@ Tasks can be one of:
 * Get the given item: `hcraft.task.GetItemTask`
 * Go to the given zone: `hcraft.task.GoToZoneTask`
 * Place the given item in the given zone (or any zone if none given): `hcraft.task.PlaceItemTask`
+* Satisfy all (or any) of given linear constraints over the state: `hcraft.task.LinearConstraintsTask`
 
 
 ## Single task purpose
@@ -92,15 +93,21 @@ but it will still reward the player if completed.
 
 Just like this last task, reward shaping subtasks are always optional.
 
+Reward shaping targets only depend on the world content and on the goal of each task,
+so they are computed once and shared by all purposes built on the same world
+(see `hcraft.purpose.reward_shaping_targets`).
+A subtask shared by several tasks is added only once to the purpose.
+
 """
 
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Union
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
 
-import networkx as nx
 import numpy as np
 
+from hcraft.compiled_purpose import CompiledPurpose, compile_purpose
 from hcraft.requirements import RequirementNode, req_node_name
 from hcraft.task import GetItemTask, GoToZoneTask, PlaceItemTask, Task
 from hcraft.elements import Item, Zone
@@ -178,6 +185,11 @@ class Purpose:
         self.shaping_value = shaping_value
         self.default_reward_shaping = default_reward_shaping
         self.built = False
+        self.compiled: Optional[CompiledPurpose] = None
+        """Compiled tasks of the built purpose, see `hcraft.compiled_purpose`."""
+        self._tasks_terminated: Optional[np.ndarray] = None
+        self._tasks_done: Optional[np.ndarray] = None
+        self._last_flat_state: Optional[np.ndarray] = None
 
         self.reward_shaping: Dict[Task, RewardShaping] = {}
         self.terminal_groups: List[TerminalGroup] = []
@@ -237,18 +249,36 @@ class Purpose:
 
         if not self.tasks:
             return
-        # Add reward shaping subtasks
+        # Add reward shaping subtasks, once for each target shared by several tasks
+        world_hash = None
+        if any(
+            shaping != RewardShaping.NONE for shaping in self.reward_shaping.values()
+        ):
+            world_hash = env.world.content_hash()
+        shaping_items: Dict[Item, None] = {}
+        shaping_zones: Dict[Zone, None] = {}
+        shaping_zones_items: Dict[Item, None] = {}
         for task in self.tasks:
-            subtasks = self._add_reward_shaping_subtasks(
-                task, env, self.reward_shaping[task]
+            targets = reward_shaping_targets(
+                task, env.world, self.reward_shaping[task], world_hash=world_hash
             )
-            for subtask in subtasks:
-                self.add_task(subtask, RewardShaping.NONE, terminal_groups=None)
+            shaping_items.update(dict.fromkeys(targets.items))
+            shaping_zones.update(dict.fromkeys(targets.zones))
+            shaping_zones_items.update(dict.fromkeys(targets.zones_items))
+        subtasks = _build_reward_shaping_subtasks(
+            shaping_items, shaping_zones, shaping_zones_items, self.shaping_value
+        )
+        for subtask in subtasks:
+            self.add_task(subtask, RewardShaping.NONE, terminal_groups=None)
 
         # Build all tasks
         for task in self.tasks:
             task.build(env.world)
 
+        self.compiled = compile_purpose(self, env.world)
+        self._tasks_terminated = np.array([task.terminated for task in self.tasks])
+        self._python_tasks_indexes = np.flatnonzero(~self.compiled.compiled_tasks)
+        self._python_tasks = [self.tasks[index] for index in self._python_tasks_indexes]
         self.built = True
 
     def reward(self, state: "HcraftState") -> float:
@@ -258,7 +288,14 @@ class Purpose:
         reward = self.timestep_reward
         if not self.tasks:
             return reward
-        for task in self.tasks:
+        if self.compiled is None:
+            for task in self.tasks:
+                reward += task.reward(state)
+            return reward
+        tasks_done = self._compiled_tasks_done(state)
+        newly_done = tasks_done & ~self._tasks_terminated
+        reward += float(np.sum(self.compiled.rewards[newly_done]))
+        for task in self._python_tasks:
             reward += task.reward(state)
         return reward
 
@@ -268,17 +305,49 @@ class Purpose:
         """
         if not self.tasks:
             return False
-        for task in self.tasks:
+        if self.compiled is None:
+            for task in self.tasks:
+                task.is_terminal(state)
+            return any(group.terminated for group in self.terminal_groups)
+        tasks_done = self._compiled_tasks_done(state)
+        for task in self._python_tasks:
             task.is_terminal(state)
-        for terminal_group in self.terminal_groups:
-            if terminal_group.terminated:
-                return True
-        return False
+        self._update_tasks_terminated(tasks_done)
+        return bool(np.any(self.compiled.groups_done(self._tasks_terminated)))
 
     def reset(self) -> None:
         """Reset the purpose."""
         for task in self.tasks:
             task.reset()
+        if self._tasks_terminated is not None:
+            self._tasks_terminated[:] = False
+        self._last_flat_state = None
+
+    def _compiled_tasks_done(self, state: "HcraftState") -> np.ndarray:
+        """Completion of compiled tasks, only evaluating tasks watching changed slots.
+
+        Values of already terminated tasks are not kept up to date.
+        """
+        flat_state = self.compiled.state_from(state)
+        last_flat_state = self._last_flat_state
+        if last_flat_state is None or last_flat_state.shape != flat_state.shape:
+            self._tasks_done = self.compiled.tasks_done(flat_state)
+        else:
+            changed_slots = np.flatnonzero(flat_state != last_flat_state)
+            if changed_slots.size > 0:
+                tasks = self.compiled.watching_tasks(changed_slots)
+                tasks = tasks[~self._tasks_terminated[tasks]]
+                self._tasks_done[tasks] = self.compiled.tasks_done_of(flat_state, tasks)
+        self._last_flat_state = flat_state
+        return self._tasks_done
+
+    def _update_tasks_terminated(self, tasks_done: np.ndarray) -> None:
+        """Latch newly done compiled tasks and sync tasks terminated flags."""
+        for task_index in np.flatnonzero(tasks_done & ~self._tasks_terminated):
+            self.tasks[task_index].terminated = True
+        self._tasks_terminated |= tasks_done
+        for task_index in self._python_tasks_indexes:
+            self._tasks_terminated[task_index] = self.tasks[task_index].terminated
 
     @property
     def optional_tasks(self) -> List[Task]:
@@ -318,19 +387,6 @@ class Purpose:
         group_id = self.terminal_groups.index(name)
         return self.terminal_groups[group_id]
 
-    def _add_reward_shaping_subtasks(
-        self, task: Task, env: "HcraftEnv", reward_shaping: RewardShaping
-    ) -> List[Task]:
-        if reward_shaping == RewardShaping.NONE:
-            return []
-        if reward_shaping == RewardShaping.ALL_ACHIVEMENTS:
-            return _all_subtasks(env.world, self.shaping_value)
-        if reward_shaping == RewardShaping.INPUTS_ACHIVEMENT:
-            return _inputs_subtasks(task, env.world, self.shaping_value)
-        if reward_shaping == RewardShaping.REQUIREMENTS_ACHIVEMENTS:
-            return _required_subtasks(task, env, self.shaping_value)
-        raise NotImplementedError
-
     def __str__(self) -> str:
         terminal_groups_str = []
         for terminal_group in self.terminal_groups:
@@ -370,15 +426,86 @@ def platinium_purpose(
     return purpose
 
 
-def _all_subtasks(world: "World", shaping_reward: float) -> List[Task]:
-    return _build_reward_shaping_subtasks(
-        world.items, world.zones, world.zones_items, shaping_reward
+@dataclass(frozen=True)
+class ShapingTargets:
+    """Items, zones and zones items rewarded by a reward shaping, in world order."""
+
+    items: Tuple[Item, ...] = ()
+    zones: Tuple[Zone, ...] = ()
+    zones_items: Tuple[Item, ...] = ()
+
+
+_SHAPING_TARGETS_CACHE_SIZE = 4096
+_shaping_targets_cache: "OrderedDict[tuple, ShapingTargets]" = OrderedDict()
+
+
+def reward_shaping_targets(
+    task: Task,
+    world: "World",
+    reward_shaping: RewardShaping,
+    world_hash: Optional[str] = None,
+) -> ShapingTargets:
+    """Targets of the given reward shaping for the given task.
+
+    Targets only depend on the world content and on the goal of the task,
+    so they are computed once and shared by all purposes and environments
+    built on worlds with the same content.
+
+    Args:
+        task: Task to shape the reward of.
+        world: World the task is built on.
+        reward_shaping: Kind of reward shaping.
+        world_hash: Content hash of the world if already known.
+            Defaults to `world.content_hash()`.
+    """
+    reward_shaping = RewardShaping(reward_shaping)
+    if reward_shaping == RewardShaping.NONE:
+        return ShapingTargets()
+    if world_hash is None:
+        world_hash = world.content_hash()
+    goal = None
+    if reward_shaping != RewardShaping.ALL_ACHIVEMENTS:
+        goal = _task_goal(task, reward_shaping)
+    key = (world_hash, reward_shaping, goal)
+    targets = _shaping_targets_cache.get(key)
+    if targets is not None:
+        _shaping_targets_cache.move_to_end(key)
+        return targets
+
+    if reward_shaping == RewardShaping.ALL_ACHIVEMENTS:
+        targets = _all_targets(world)
+    elif reward_shaping == RewardShaping.INPUTS_ACHIVEMENT:
+        targets = _inputs_targets(task, world)
+    elif reward_shaping == RewardShaping.REQUIREMENTS_ACHIVEMENTS:
+        targets = _required_targets(task, world)
+    else:
+        raise NotImplementedError
+    _shaping_targets_cache[key] = targets
+    if len(_shaping_targets_cache) > _SHAPING_TARGETS_CACHE_SIZE:
+        _shaping_targets_cache.popitem(last=False)
+    return targets
+
+
+def _task_goal(task: Task, reward_shaping: RewardShaping) -> tuple:
+    if isinstance(task, GetItemTask):
+        return (RequirementNode.ITEM, task.item_stack.item)
+    if isinstance(task, PlaceItemTask):
+        return (RequirementNode.ZONE_ITEM, task.item_stack.item, task.zone)
+    if isinstance(task, GoToZoneTask):
+        return (RequirementNode.ZONE, task.zone)
+    raise NotImplementedError(
+        f"Unsupported reward shaping {reward_shaping}"
+        f"for given task type: {type(task)} of {task}"
     )
 
 
-def _required_subtasks(
-    task: Task, env: "HcraftEnv", shaping_reward: float
-) -> List[Task]:
+def _all_targets(world: "World") -> ShapingTargets:
+    return ShapingTargets(
+        tuple(world.items), tuple(world.zones), tuple(world.zones_items)
+    )
+
+
+def _required_targets(task: Task, world: "World") -> ShapingTargets:
     relevant_items = set()
     relevant_zones = set()
     relevant_zone_items = set()
@@ -403,9 +530,10 @@ def _required_subtasks(
             f"for given task type: {type(task)} of {task}"
         )
 
-    requirements_acydigraph = env.world.requirements.acydigraph
+    requirements = world.requirements
+    requirements_acydigraph = requirements.acydigraph
     for requirement_node in goal_requirement_nodes:
-        for ancestor in nx.ancestors(requirements_acydigraph, requirement_node):
+        for ancestor in requirements.ancestors(requirement_node):
             if ancestor == "START#":
                 continue
             ancestor_node = requirements_acydigraph.nodes[ancestor]
@@ -417,15 +545,12 @@ def _required_subtasks(
                 relevant_zones.add(item_or_zone)
             if ancestor_type is RequirementNode.ZONE_ITEM:
                 relevant_zone_items.add(item_or_zone)
-    return _build_reward_shaping_subtasks(
-        relevant_items,
-        relevant_zones,
-        relevant_zone_items,
-        shaping_reward,
+    return _targets_in_world_order(
+        world, relevant_items, relevant_zones, relevant_zone_items
     )
 
 
-def _inputs_subtasks(task: Task, world: "World", shaping_reward: float) -> List[Task]:
+def _inputs_targets(task: Task, world: "World") -> ShapingTargets:
     relevant_items = set()
     relevant_zones = set()
     relevant_zone_items = set()
@@ -447,23 +572,23 @@ def _inputs_subtasks(task: Task, world: "World", shaping_reward: float) -> List[
             f"Unsupported reward shaping {RewardShaping.INPUTS_ACHIVEMENT}"
             f"for given task type: {type(task)} of {task}"
         )
-    transfo_giving_item = [
-        transfo
-        for transfo in world.transformations
-        if goal_item in transfo.production("player")
-        and goal_item not in transfo.min_required("player")
-    ]
-    transfo_placing_zone_item = [
-        transfo
-        for transfo in world.transformations
-        if goal_zone_item in transfo.produced_zones_items
-        and goal_zone_item not in transfo.min_required_zones_items
-    ]
-    transfo_going_to_goal_zone = [
-        transfo
-        for transfo in world.transformations
-        if transfo.destination is not None and transfo.destination == goal_zone
-    ]
+    transfo_giving_item = []
+    if goal_item is not None:
+        transfo_giving_item = [
+            transfo
+            for transfo in world.producers(goal_item)
+            if goal_item not in transfo.min_required("player")
+        ]
+    transfo_placing_zone_item = []
+    if goal_zone_item is not None:
+        transfo_placing_zone_item = [
+            transfo
+            for transfo in world.zone_item_producers(goal_zone_item)
+            if goal_zone_item not in transfo.min_required_zones_items
+        ]
+    transfo_going_to_goal_zone = []
+    if goal_zone is not None:
+        transfo_going_to_goal_zone = world.entering(goal_zone)
     relevant_transformations = (
         transfo_giving_item + transfo_placing_zone_item + transfo_going_to_goal_zone
     )
@@ -476,18 +601,28 @@ def _inputs_subtasks(task: Task, world: "World", shaping_reward: float) -> List[
         if transfo.zone:
             relevant_zones.add(transfo.zone)
 
-    return _build_reward_shaping_subtasks(
-        relevant_items,
-        relevant_zones,
-        relevant_zone_items,
-        shaping_reward,
+    return _targets_in_world_order(
+        world, relevant_items, relevant_zones, relevant_zone_items
+    )
+
+
+def _targets_in_world_order(
+    world: "World",
+    items: Set[Item],
+    zones: Set[Zone],
+    zones_items: Set[Item],
+) -> ShapingTargets:
+    return ShapingTargets(
+        items=tuple(item for item in world.items if item in items),
+        zones=tuple(zone for zone in world.zones if zone in zones),
+        zones_items=tuple(item for item in world.zones_items if item in zones_items),
     )
 
 
 def _build_reward_shaping_subtasks(
-    items: Optional[Union[List[Item], Set[Item]]] = None,
-    zones: Optional[Union[List[Zone], Set[Zone]]] = None,
-    zone_items: Optional[Union[List[Item], Set[Item]]] = None,
+    items: Optional[Iterable[Item]] = None,
+    zones: Optional[Iterable[Zone]] = None,
+    zone_items: Optional[Iterable[Item]] = None,
     shaping_reward: float = 1.0,
 ) -> List[Task]:
     subtasks = []
@@ -0,0 +1,352 @@
+"""# Reachability
+
+Fast analysis of what can be reached in a HierarchyCraft world.
+
+The analysis is a fixed point over the compiled transformations (see `hcraft.compiled`)
+where amounts are never consumed (delete relaxation) and maximum conditions are ignored.
+Each transformation is considered once all its minimum conditions can be met,
+and each state slot is given the first layer at which it can become positive.
+
+Anything unreachable in this relaxation is truly unreachable,
+and layers give a lower bound on the number of steps needed to reach each slot.
+It runs in linear time in the size of the compiled world,
+so it can be used to validate generated worlds in bulk before training.
+
+## Example
+
+```python
+from hcraft.reachability import analyze_reachability
+
+reachability = analyze_reachability(env.world)
+unreachable_items = [
+    item
+    for item, reachable in zip(env.world.items, reachability.reachable_items)
+    if not reachable
+]
+solvable = reachability.solvable_tasks(env.purpose)
+min_steps = reachability.purpose_lower_bound(env.purpose)
+```
+
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from hcraft.compiled import NO_ZONE, CompiledWorld, SparseRows
+from hcraft.compiled_purpose import compile_task
+from hcraft.task import Task
+
+if TYPE_CHECKING:
+    from hcraft.purpose import Purpose
+    from hcraft.world import World
+
+
+@dataclass
+class Reachability:
+    """Result of a reachability analysis of a world.
+
+    Levels are the first relaxed layer where something becomes possible,
+    np.inf if it never does.
+    """
+
+    compiled: CompiledWorld
+    slots_level: np.ndarray
+    """Level at which each flat state slot can first be positive."""
+    transformations_level: np.ndarray
+    """Level at which each transformation can first be applied."""
+    max_gains: np.ndarray
+    """Maximum amount a single reachable transformation adds to each slot."""
+    world: Optional["World"] = None
+    """Analyzed world if any, needed to analyze tasks."""
+
+    @property
+    def reachable_items(self) -> np.ndarray:
+        """Whether each item can be obtained by the player."""
+        return np.isfinite(self.slots_level[: self.compiled.n_items])
+
+    @property
+    def reachable_zones(self) -> np.ndarray:
+        """Whether each zone can be visited."""
+        compiled = self.compiled
+        return np.isfinite(
+            self.slots_level[compiled.position_offset : compiled.zones_offset]
+        )
+
+    @property
+    def reachable_zones_items(self) -> np.ndarray:
+        """Whether each zone item can be placed in each zone, of shape (Z, J)."""
+        compiled = self.compiled
+        return np.isfinite(self.slots_level[compiled.zones_offset :]).reshape(
+            compiled.n_zones, compiled.n_zones_items
+        )
+
+    @property
+    def reachable_transformations(self) -> np.ndarray:
+        """Whether each transformation can be applied at some point."""
+        return np.isfinite(self.transformations_level)
+
+    @property
+    def everything_reachable(self) -> bool:
+        """True if every item, zone and zone item (in any zone) is reachable."""
+        return bool(
+            np.all(self.reachable_items)
+            and np.all(self.reachable_zones)
+            and np.all(np.any(self.reachable_zones_items, axis=0))
+        )
+
+    def slot_lower_bound(self, slot: int, quantity: int = 1) -> float:
+        """Lower bound on the steps needed to have the given quantity in a slot.
+
+        Args:
+            slot: Flat state slot.
+            quantity: Amount needed in the slot. Defaults to 1.
+
+        Returns:
+            Lower bound on the number of steps, np.inf if unreachable.
+        """
+        missing = quantity - self.compiled.initial_state[slot]
+        if missing <= 0:
+            return 0.0
+        if not np.isfinite(self.slots_level[slot]) or self.max_gains[slot] <= 0:
+            return np.inf
+        return float(
+            max(self.slots_level[slot], np.ceil(missing / self.max_gains[slot]))
+        )
+
+    def row_lower_bound(
+        self, slots: Sequence[int], coefficients: Sequence[int], threshold: int
+    ) -> float:
+        """Lower bound on the steps needed for a threshold row to hold.
+
+        Rows are those of compiled tasks (see `hcraft.compiled_purpose`),
+        meaning sum(coefficients * x[slots]) >= threshold.
+        Amounts held at the start in slots with negative coefficients
+        are assumed to be all consumed in a single step.
+
+        Returns:
+            Lower bound on the number of steps, np.inf if the row can never hold.
+        """
+        slots, coefficients = np.asarray(slots), np.asarray(coefficients)
+        initial_amounts = self.compiled.initial_state[slots]
+        missing = threshold - np.dot(coefficients, initial_amounts)
+        if missing <= 0:
+            return 0.0
+        increasing = (
+            (coefficients > 0)
+            & np.isfinite(self.slots_level[slots])
+            & (self.max_gains[slots] > 0)
+        )
+        decreasing = (coefficients < 0) & (initial_amounts > 0)
+        max_decrease = -np.dot(coefficients[decreasing], initial_amounts[decreasing])
+        if missing <= max_decrease:
+            return 1.0
+        if not np.any(increasing):
+            return np.inf
+        levels = self.slots_level[slots[increasing]]
+        max_gain = np.dot(coefficients[increasing], self.max_gains[slots[increasing]])
+        return float(
+            max(1.0, np.min(levels), np.ceil((missing - max_decrease) / max_gain))
+        )
+
+    def task_lower_bound(self, task: Task) -> float:
+        """Lower bound on the steps needed to achieve the given task.
+
+        Tasks are bounded through their compiled threshold rows
+        (see `hcraft.compiled_purpose`), tasks without compiler are given 0.
+
+        Returns:
+            Lower bound on the number of steps, np.inf if the task is unsolvable.
+        """
+        compiled_task = compile_task(task, self._world())
+        if compiled_task is None:
+            return 0.0
+        rows, any_row = compiled_task
+        bounds = [self.row_lower_bound(*row) for row in rows]
+        if any_row:
+            return min(bounds, default=np.inf)
+        return max(bounds, default=0.0)
+
+    def is_solvable(self, task: Task) -> bool:
+        """Whether the given task may be achieved."""
+        return bool(np.isfinite(self.task_lower_bound(task)))
+
+    def solvable_tasks(self, purpose: "Purpose") -> Dict[Task, bool]:
+        """Whether each task of the given purpose may be achieved."""
+        return {task: self.is_solvable(task) for task in purpose.tasks}
+
+    def purpose_lower_bound(self, purpose: "Purpose") -> float:
+        """Lower bound on the steps needed to terminate the given purpose.
+
+        The purpose terminates when all tasks of any terminal group are achieved.
+
+        Returns:
+            Lower bound on the number of steps, np.inf if the purpose cannot terminate.
+        """
+        return min(
+            (
+                max((self.task_lower_bound(task) for task in group.tasks), default=0)
+                for group in purpose.terminal_groups
+            ),
+            default=np.inf,
+        )
+
+    def _world(self) -> "World":
+        if self.world is None:
+            raise ValueError("Analyzing tasks needs a reachability built from a World.")
+        return self.world
+
+
+def analyze_reachability(world: Union["World", CompiledWorld]) -> Reachability:
+    """Compute what can be reached from the initial state of the given world.
+
+    Args:
+        world: World or directly a compiled world to analyze.
+            Tasks can only be analyzed when given a World.
+
+    Returns:
+        The reachability analysis of the world.
+    """
+    if isinstance(world, CompiledWorld):
+        compiled, world = world, None
+    else:
+        compiled = world.compiled
+
+    conditions, gains, rows_transformation = _relaxed_rows(compiled)
+    initial_state = compiled.initial_state
+    unmet = initial_state[conditions.indices] < conditions.values
+    missing = conditions.count_per_row(unmet)
+    waiting = SparseRows.from_coo(
+        conditions.indices[unmet],
+        conditions.rows[unmet],
+        np.ones(np.count_nonzero(unmet), dtype=np.int64),
+        n_rows=compiled.state_size,
+    )
+
+    rows_level = np.full(conditions.n_rows, np.inf)
+    slots_level = np.where(initial_state > 0, 0.0, np.inf)
+    produced = np.zeros(compiled.state_size, dtype=bool)
+    frontier = np.flatnonzero(missing == 0)
+    level = 0
+    while frontier.size > 0:
+        rows_level[frontier] = level
+        _, positions = gains.gather(frontier)
+        new_slots = np.unique(gains.indices[positions])
+        new_slots = new_slots[~produced[new_slots]]
+        produced[new_slots] = True
+        slots_level[new_slots] = np.minimum(slots_level[new_slots], level + 1)
+
+        _, positions = waiting.gather(new_slots)
+        unlocked = waiting.indices[positions]
+        np.subtract.at(missing, unlocked, 1)
+        frontier = np.unique(unlocked[missing[unlocked] == 0])
+        level += 1
+
+    transformations_level = np.full(compiled.n_transformations, np.inf)
+    np.minimum.at(transformations_level, rows_transformation, rows_level)
+    max_gains = np.zeros(compiled.state_size, dtype=np.int64)
+    reachable_gains = np.isfinite(rows_level[gains.rows])
+    np.maximum.at(
+        max_gains, gains.indices[reachable_gains], gains.values[reachable_gains]
+    )
+    return Reachability(
+        compiled=compiled,
+        slots_level=slots_level,
+        transformations_level=transformations_level,
+        max_gains=max_gains,
+        world=world,
+    )
+
+
+def _relaxed_rows(
+    compiled: CompiledWorld,
+) -> Tuple[SparseRows, SparseRows, np.ndarray]:
+    """Relaxed conditions and gains over absolute slots.
+
+    Transformations with operations on the current zone are expanded
+    into one relaxed row per zone, restricted to this zone.
+
+    Returns:
+        Minimum conditions and positive gains of relaxed rows,
+        and the transformation of each relaxed row.
+    """
+    n_transformations = compiled.n_transformations
+    relative = np.array([], dtype=np.int64)
+    if compiled.n_zones > 0:
+        min_conditions = compiled.current_min_conditions
+        changes = compiled.current_changes
+        relative = np.union1d(
+            min_conditions.rows[min_conditions.values > 0],
+            changes.rows[changes.values > 0],
+        )
+    absolute = np.setdiff1d(np.arange(n_transformations), relative)
+    sources = np.concatenate((absolute, np.repeat(relative, compiled.n_zones)))
+    zones = np.concatenate(
+        (compiled.zone[absolute], np.tile(np.arange(compiled.n_zones), relative.size))
+    )
+    destinations = compiled.destination[sources]
+    rows = np.arange(sources.shape[0])
+
+    restricted = zones != NO_ZONE
+    conditions = _expanded_coo(
+        compiled,
+        compiled.min_conditions,
+        compiled.current_min_conditions,
+        sources,
+        zones,
+    )
+    conditions = _concatenate_coo(
+        conditions,
+        (
+            rows[restricted],
+            compiled.position_offset + zones[restricted],
+            np.ones(np.count_nonzero(restricted), dtype=np.int64),
+        ),
+    )
+    moving = destinations != NO_ZONE
+    gains = _expanded_coo(
+        compiled, compiled.changes, compiled.current_changes, sources, zones
+    )
+    gains = _concatenate_coo(
+        gains,
+        (
+            rows[moving],
+            compiled.position_offset + destinations[moving],
+            np.ones(np.count_nonzero(moving), dtype=np.int64),
+        ),
+    )
+    return (
+        SparseRows.from_coo(*conditions, n_rows=rows.shape[0], reduce=np.maximum),
+        SparseRows.from_coo(*gains, n_rows=rows.shape[0], reduce=np.maximum),
+        sources,
+    )
+
+
+def _expanded_coo(
+    compiled: CompiledWorld,
+    absolute: SparseRows,
+    current: SparseRows,
+    sources: np.ndarray,
+    zones: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positive values of the source rows, with current zone slots made absolute."""
+    rows, positions = absolute.gather(sources)
+    values = absolute.values[positions]
+    positive = values > 0
+    coo = (rows[positive], absolute.indices[positions][positive], values[positive])
+
+    rows, positions = current.gather(sources)
+    values = current.values[positions]
+    positive = (values > 0) & (zones[rows] != NO_ZONE)
+    rows = rows[positive]
+    slots = (
+        compiled.zones_offset
+        + zones[rows] * compiled.n_zones_items
+        + current.indices[positions][positive]
+    )
+    return _concatenate_coo(coo, (rows, slots, values[positive]))
+
+
+def _concatenate_coo(*coos: Tuple[np.ndarray, np.ndarray, np.ndarray]):
+    return tuple(np.concatenate(arrays) for arrays in zip(*coos))
@@ -65,6 +65,21 @@ env.world.requirements.draw(ax)
 plt.show()
 ```
 
+## Caching
+
+Requirements nodes, edges, levels and drawing layouts can be cached on disk,
+keyed by the content hash of the world (see `hcraft.world.World.content_hash`).
+Repeated runs and worker processes then skip building the requirements graph
+and computing layouts.
+
+The cache is disabled by default, it is enabled by giving a `cache_dir`
+to `Requirements` or by setting the `HCRAFT_REQUIREMENTS_CACHE` environment variable
+to a cache directory.
+
+```bash
+export HCRAFT_REQUIREMENTS_CACHE=~/.cache/hcraft/requirements
+```
+
 For a concrete example, here is the underlying hierarchy of the toy environment MinicraftUnlock:
 <img
 src="https://raw.githubusercontent.com/IRLL/HierarchyCraft/master/docs/images/requirements_graphs/MiniHCraftUnlock.png"
@@ -72,31 +87,40 @@ width="90%"/>
 
 """
 
+from collections import defaultdict
 from enum import Enum
+from functools import lru_cache
+import json
+import os
 from pathlib import Path
 import random
-from PIL import Image, ImageDraw, ImageFont
 
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import networkx as nx
 import numpy as np
 
-import seaborn as sns
-from matplotlib import pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.axes import Axes
-from matplotlib.legend_handler import HandlerPatch
-
-from hebg.graph import draw_networkx_nodes_images, get_nodes_by_level
-from hebg.layouts.metabased import leveled_layout_energy
 import hcraft
 
-from hcraft.render.utils import load_or_create_image, obj_image_path
+from hcraft.elements import Item, Zone
 from hcraft.transformation import InventoryOperation, InventoryOwner
 
 if TYPE_CHECKING:
-    from hcraft.elements import Item, Stack, Zone
+    from matplotlib.axes import Axes
+    from PIL import Image
+
+    from hcraft.elements import Stack
     from hcraft.transformation import Transformation
     from hcraft.world import World
 
@@ -157,6 +181,8 @@ class RequirementTheme:
             return f"#{hexes.upper()}"
 
         if edge_colors is None:
+            import seaborn as sns
+
             edge_colors = sns.color_palette("colorblind")
             random.shuffle(edge_colors)
         self.edges_colors = [rgba_to_hex(*color) for color in edge_colors]
@@ -177,19 +203,45 @@ class RequirementTheme:
 class DrawEngine(Enum):
     PLT = "matplotlib"
     PYVIS = "pyvis"
+    SVG = "svg"
+    """Streaming SVG (or HTML if the save_path ends with .html), scales to large graphs."""
 
 
 class Requirements:
-    def __init__(self, world: "World"):
+    """Requirements of a world, computed lazily by layers.
+
+    Each layer is only computed when first needed, then cached:
+
+    - `levels`: level of each node, computed directly from requirements edges.
+    - `graph`: the full requirements MultiDiGraph with levels as node attributes.
+    - `digraph`: the collapsed DiGraph.
+    - `acydigraph`: the collapsed leveled acyclic DiGraph.
+    - `closure`: the transitive closure of the acyclic DiGraph as bit matrices.
+
+    Drawing modules are only imported when calling `draw`.
+
+    If a cache directory is given, or set in the `HCRAFT_REQUIREMENTS_CACHE`
+    environment variable, nodes, edges, levels and layouts are saved to and loaded
+    from this directory, keyed by the world content hash.
+    """
+
+    def __init__(self, world: "World", cache_dir: Optional[Union[str, Path]] = None):
         self.world = world
-        self.graph = nx.MultiDiGraph()
+        if cache_dir is None:
+            cache_dir = os.environ.get(REQUIREMENTS_CACHE_ENV_VAR)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._layouts: Dict[str, Dict[str, List[float]]] = {}
+        self._nodes: Optional[Dict[str, Dict[str, Any]]] = None
+        self._edges: Optional[Dict[Tuple[str, str, int], Dict[str, Any]]] = None
+        self._levels: Optional[Dict[str, int]] = None
+        self._graph: Optional[nx.MultiDiGraph] = None
         self._digraph: nx.DiGraph = None
         self._acydigraph: nx.DiGraph = None
-        self._build()
+        self._closure: Optional[RequirementsClosure] = None
 
     def draw(
         self,
-        ax: Optional[Axes] = None,
+        ax: Optional["Axes"] = None,
         theme: Optional[RequirementTheme] = None,
         layout: "RequirementsGraphLayout" = "level",
         engine: DrawEngine = DrawEngine.PLT,
@@ -202,17 +254,18 @@ class Requirements:
             ax: Matplotlib Axes to draw on.
             layout: Drawing layout. Defaults to "level".
         """
+        engine = DrawEngine(engine)
         if theme is None:
-            theme = RequirementTheme()
+            edge_colors = [(0, 0, 0)] if engine is DrawEngine.SVG else None
+            theme = RequirementTheme(edge_colors=edge_colors)
 
         apply_color_theme(self.graph, theme)
 
-        pos = compute_layout(self.digraph, layout=layout)
+        pos = self.layout(layout)
 
         if save_path:
             save_path.parent.mkdir(exist_ok=True)
 
-        engine = DrawEngine(engine)
         if engine is DrawEngine.PLT:
             if ax is None:
                 raise TypeError(f"ax must be given for {engine.value} drawing engine.")
@@ -226,6 +279,8 @@ class Requirements:
             )
 
             if save_path:
+                from matplotlib import pyplot as plt
+
                 plt.gcf().savefig(
                     save_path, dpi=kwargs.get("dpi", 100), transparent=True
                 )
@@ -245,6 +300,72 @@ class Requirements:
                 **kwargs,
             )
 
+        if engine is DrawEngine.SVG:
+            if save_path is None:
+                raise TypeError(
+                    f"save_path must be given for {engine.value} drawing engine."
+                )
+            _draw_svg(
+                self.digraph,
+                theme,
+                resources_path=self.world.resources_path,
+                filepath=save_path,
+                pos=pos,
+                depth=self.depth,
+                width=self.width,
+                with_web_uri=kwargs.get("with_web_uri", False),
+            )
+
+    @property
+    def levels(self) -> Dict[str, int]:
+        """Level of each node of the requirements graph.
+
+        See `hcraft.requirements.compute_levels` for more details.
+
+        """
+        if self._levels is None:
+            self._build_edges()
+        if self._levels is None:
+            self._levels = _compute_nodes_levels(self._nodes, self._edges)
+            self._save_cache()
+        return self._levels
+
+    def layout(
+        self, layout: Union[str, "RequirementsGraphLayout"] = "level"
+    ) -> Dict[str, List[float]]:
+        """Positions of the collapsed DiGraph nodes for the given layout."""
+        layout = RequirementsGraphLayout(layout)
+        if layout.value not in self._layouts:
+            self._build_edges()
+        if layout.value not in self._layouts:
+            pos = compute_layout(self.digraph, layout=layout)
+            self._layouts[layout.value] = {
+                node: [float(coordinate) for coordinate in node_pos]
+                for node, node_pos in pos.items()
+            }
+            self._save_cache()
+        return self._layouts[layout.value]
+
+    @property
+    def nodes_by_level(self) -> Dict[int, List[str]]:
+        """Nodes of the requirements graph grouped by level."""
+        return _nodes_by_level(self.levels)
+
+    @property
+    def graph(self) -> nx.MultiDiGraph:
+        """Requirements graph, see `hcraft.requirements` for more details."""
+        if self._graph is not None:
+            return self._graph
+        self._build_edges()
+        graph = nx.MultiDiGraph()
+        graph.add_nodes_from(self._nodes.items())
+        graph.add_edges_from(
+            (pred, node, key, data) for (pred, node, key), data in self._edges.items()
+        )
+        _set_levels(graph, self.levels)
+        self._graph = graph
+        return self._graph
+
     @property
     def digraph(self) -> nx.DiGraph:
         """Collapsed DiGraph of requirements."""
@@ -261,22 +382,99 @@ class Requirements:
         self._acydigraph = break_cycles_through_level(self.digraph)
         return self._acydigraph
 
+    @property
+    def closure(self) -> "RequirementsClosure":
+        """Transitive closure of the collapsed leveled acyclic DiGraph."""
+        if self._closure is None:
+            self._closure = RequirementsClosure(self.acydigraph)
+        return self._closure
+
+    def ancestors(self, node: str) -> Set[str]:
+        """Nodes from which the given node can be reached in the acyclic DiGraph."""
+        return self.closure.ancestors(node)
+
+    def descendants(self, node: str) -> Set[str]:
+        """Nodes that can be reached from the given node in the acyclic DiGraph."""
+        return self.closure.descendants(node)
+
     @property
     def depth(self) -> int:
         """Depth of the requirements graph."""
-        return self.graph.graph.get("depth")
+        return max(self.levels.values())
 
     @property
     def width(self) -> int:
         """Width of the requirements graph."""
-        return self.graph.graph.get("width")
+        return max(len(nodes) for nodes in self.nodes_by_level.values())
 
-    def _build(self) -> None:
+    def _build_edges(self) -> None:
+        if self._edges is not None or self._load_cache():
+            return
+        self._nodes, self._edges = {}, {}
         self._add_requirements_nodes(self.world)
         self._add_start_edges(self.world)
         for edge_index, transfo in enumerate(self.world.transformations):
             self._add_transformation_edges(transfo, edge_index, transfo.zone)
-        compute_levels(self.graph)
+
+    def _cache_path(self) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{self.world.content_hash()}.json"
+
+    def _load_cache(self) -> bool:
+        """Load nodes, edges, levels and layouts from cache, return True if found."""
+        cache_path = self._cache_path()
+        if cache_path is None or not cache_path.exists():
+            return False
+        try:
+            content = json.loads(cache_path.read_text())
+            if content["version"] != _CACHE_VERSION:
+                return False
+            nodes = {
+                name: _node_data_from_cache(node_type, obj_name)
+                for name, node_type, obj_name in content["nodes"]
+            }
+            edges = {
+                (pred, node, key): {
+                    "type": RequirementEdge(edge_type),
+                    "obj": self.world.transformations[key] if key >= 0 else None,
+                }
+                for pred, node, key, edge_type in content["edges"]
+            }
+            levels = content["levels"]
+            layouts = content["layouts"]
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return False
+        self._nodes, self._edges, self._levels = nodes, edges, levels
+        self._layouts = layouts
+        return True
+
+    def _save_cache(self) -> None:
+        cache_path = self._cache_path()
+        if cache_path is None or self._levels is None:
+            return
+        content = {
+            "version": _CACHE_VERSION,
+            "nodes": [
+                [
+                    name,
+                    data["type"].value if "type" in data else None,
+                    data["obj"].name if data.get("obj") is not None else None,
+                ]
+                for name, data in self._nodes.items()
+            ],
+            "edges": [
+                [pred, node, key, data["type"].value]
+                for (pred, node, key), data in self._edges.items()
+            ],
+            "levels": self._levels,
+            "layouts": self._layouts,
+        }
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so that concurrent processes never read partial files.
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(content))
+        os.replace(tmp_path, cache_path)
 
     def _add_requirements_nodes(self, world: "World") -> None:
         self._add_nodes(world.items, RequirementNode.ITEM)
@@ -289,7 +487,8 @@ class Requirements:
     ) -> None:
         """Add colored nodes to the graph"""
         for obj in objs:
-            self.graph.add_node(req_node_name(obj, node_type), obj=obj, type=node_type)
+            node_data = self._nodes.setdefault(req_node_name(obj, node_type), {})
+            node_data.update(obj=obj, type=node_type)
 
     def _add_transformation_edges(
         self,
@@ -331,7 +530,7 @@ class Requirements:
             ):
                 alternative_transformations = [
                     alt_transfo
-                    for alt_transfo in self.world.transformations
+                    for alt_transfo in self._zone_items_candidates(other_zone_items)
                     if alt_transfo.get_changes("zones", "add") is not None
                     and _available_in_zones_stacks(
                         other_zone_items,
@@ -372,6 +571,17 @@ class Requirements:
             node_name = req_node_name(transfo.destination, RequirementNode.ZONE)
             self._add_crafts(out_node=node_name, **transfo_params)
 
+    def _zone_items_candidates(self, stacks: List["Stack"]) -> List["Transformation"]:
+        """Transformations that could add all the given stacks in some zone."""
+        candidates = None
+        for stack in stacks:
+            producers = self.world.zone_item_producers(stack.item)
+            if candidates is None:
+                candidates = producers
+                continue
+            candidates = [transfo for transfo in candidates if transfo in producers]
+        return candidates if candidates is not None else []
+
     def _add_crafts(
         self,
         in_items: Set["Item"],
@@ -405,9 +615,9 @@ class Requirements:
     ):
         start_name = req_node_name(start_obj, start_type)
         self._add_nodes([start_obj], start_type)
-        self.graph.add_edge(
-            start_name, end_node, type=edge_type, key=index, obj=edge_transformation
-        )
+        self._nodes.setdefault(end_node, {})
+        edge_data = self._edges.setdefault((start_name, end_node, index), {})
+        edge_data.update(type=edge_type, obj=edge_transformation)
 
     def _add_start_edges(self, world: "World"):
         start_index = -1
@@ -436,6 +646,25 @@ class Requirements:
                 start_index -= 1
 
 
+REQUIREMENTS_CACHE_ENV_VAR = "HCRAFT_REQUIREMENTS_CACHE"
+"""Environment variable giving the default requirements cache directory."""
+_CACHE_VERSION = 1
+
+
+def _node_data_from_cache(
+    node_type: Optional[str], obj_name: Optional[str]
+) -> Dict[str, Any]:
+    if node_type is None:
+        return {}
+    node_type = RequirementNode(node_type)
+    obj = None
+    if node_type in (RequirementNode.ITEM, RequirementNode.ZONE_ITEM):
+        obj = Item(obj_name)
+    elif node_type is RequirementNode.ZONE:
+        obj = Zone(obj_name)
+    return {"obj": obj, "type": node_type}
+
+
 def req_node_name(obj: Optional[Union["Item", "Zone"]], node_type: RequirementNode):
     """Get a unique node name for the requirements graph"""
     if node_type == RequirementNode.START:
@@ -446,7 +675,7 @@ def req_node_name(obj: Optional[Union["Item", "Zone"]], node_type: RequirementNo
     return node_type.value + "#" + name
 
 
-def compute_levels(graph: Requirements):
+def compute_levels(graph: nx.MultiDiGraph) -> Dict[int, List[Any]]:
     """Compute the hierachical levels of a RequirementsGraph.
 
     Adds the attribute 'level' to each node in the given graph.
@@ -454,6 +683,11 @@ def compute_levels(graph: Requirements):
     Adds the attribute 'depth' to the given graph.
     Adds the attribute 'width' to the given graph.
 
+    Nodes are leveled in increasing order using buckets of levels.
+    Each edge index of a node counts its predecessors without a level yet,
+    once the last of them is leveled, the node can be leveled just above it.
+    This runs in O(N+E) for N nodes and E edges.
+
     Args:
         graph: A RequirementsGraph.
 
@@ -461,57 +695,117 @@ def compute_levels(graph: Requirements):
         Dictionary of nodes by level.
 
     """
+    levels = _compute_nodes_levels(graph.nodes(), graph.edges(keys=True))
+    return _set_levels(graph, levels)
+
 
-    def _compute_level_dependencies(graph: nx.MultiDiGraph, node):
-        predecessors = list(graph.predecessors(node))
-        if len(predecessors) == 0:
-            graph.nodes[node]["level"] = 0
-            return True
-        if "level" in graph.nodes[node]:
-            return True
-
-        pred_level_by_key = {}
-        for pred, _node, key in graph.in_edges(node, keys=True):
-            pred_level = graph.nodes[pred].get("level", None)
-            if key not in pred_level_by_key:
-                pred_level_by_key[key] = []
-            pred_level_by_key[key].append(pred_level)
-
-        max_level_by_index = []
-        for key, level_list in pred_level_by_key.items():
-            if None in level_list:
+def _compute_nodes_levels(nodes: Any, edges: Any) -> Dict[Any, int]:
+    """Levels of the given nodes from keyed edges (pred, node, key).
+
+    See `hcraft.requirements.compute_levels`.
+    """
+    missing_predecessors: Dict[Tuple[Any, Any], int] = defaultdict(int)
+    successors_by_key: Dict[Any, List[Tuple[Any, Any]]] = defaultdict(list)
+    for pred, node, key in edges:
+        missing_predecessors[(node, key)] += 1
+        successors_by_key[pred].append((node, key))
+
+    nodes_with_predecessors = {node for node, _key in missing_predecessors}
+    levels: Dict[Any, int] = {}
+    buckets = [[node for node in nodes if node not in nodes_with_predecessors]]
+    level = 0
+    while level < len(buckets):
+        for node in buckets[level]:
+            if node in levels:
                 continue
-            max_level_by_index.append(max(level_list))
-        if len(max_level_by_index) == 0:
-            return False
-        level = 1 + min(max_level_by_index)
-        graph.nodes[node]["level"] = level
-        return True
+            levels[node] = level
+            for succ, key in successors_by_key[node]:
+                missing_predecessors[(succ, key)] -= 1
+                if missing_predecessors[(succ, key)] > 0 or succ in levels:
+                    continue
+                if len(buckets) == level + 1:
+                    buckets.append([])
+                buckets[level + 1].append(succ)
+        level += 1
 
-    all_nodes_have_level = True
-    for _ in range(len(graph.nodes())):
-        all_nodes_have_level = True
-        incomplete_nodes = []
-        for node in graph.nodes():
-            incomplete = not _compute_level_dependencies(graph, node)
-            if incomplete:
-                incomplete_nodes.append(node)
-                all_nodes_have_level = False
-        if all_nodes_have_level:
-            break
-
-    if not all_nodes_have_level:
+    if len(levels) < len(nodes):
+        incomplete_nodes = [node for node in nodes if node not in levels]
         raise ValueError(
             "Could not attribute levels to all nodes. "
             f"Incomplete nodes: {incomplete_nodes}"
         )
+    return levels
+
+
+def _nodes_by_level(levels: Dict[Any, int]) -> Dict[int, List[Any]]:
+    nodes_by_level: Dict[int, List[Any]] = {}
+    for node, level in levels.items():
+        nodes_by_level.setdefault(level, []).append(node)
+    return nodes_by_level
 
-    nodes_by_level = get_nodes_by_level(graph)
-    graph.graph["depth"] = max(level for level in nodes_by_level)
+
+def _set_levels(graph: nx.MultiDiGraph, levels: Dict[Any, int]) -> Dict[int, List[Any]]:
+    """Set levels as nodes attributes and levels summaries as graph attributes."""
+    nx.set_node_attributes(graph, levels, "level")
+    nodes_by_level = _nodes_by_level({node: levels[node] for node in graph.nodes()})
+    graph.graph["nodes_by_level"] = nodes_by_level
+    graph.graph["depth"] = max(nodes_by_level)
     graph.graph["width"] = max(len(nodes) for nodes in nodes_by_level.values())
     return nodes_by_level
 
 
+class RequirementsClosure:
+    """Transitive closure of an acyclic DiGraph stored as packed bit matrices.
+
+    Row i of `ancestors_bits` (resp. `descendants_bits`) has the bit j set
+    if the node j is an ancestor (resp. a descendant) of the node i.
+    Matrices are computed once in topological order,
+    then any ancestors or descendants query is a single row lookup.
+    """
+
+    def __init__(self, acydigraph: nx.DiGraph):
+        self.nodes: List[str] = list(nx.topological_sort(acydigraph))
+        self.index: Dict[str, int] = {node: i for i, node in enumerate(self.nodes)}
+        self.ancestors_bits = self._closure_bits(acydigraph.predecessors, self.nodes)
+        self.descendants_bits = self._closure_bits(
+            acydigraph.successors, self.nodes[::-1]
+        )
+
+    def ancestors(self, node: str) -> Set[str]:
+        """Ancestors of the given node."""
+        return self._nodes_from_bits(self.ancestors_bits[self.index[node]])
+
+    def descendants(self, node: str) -> Set[str]:
+        """Descendants of the given node."""
+        return self._nodes_from_bits(self.descendants_bits[self.index[node]])
+
+    def is_ancestor(self, ancestor: str, node: str) -> bool:
+        """Whether ancestor is an ancestor of the given node."""
+        return _get_bit(self.ancestors_bits[self.index[node]], self.index[ancestor])
+
+    def _closure_bits(
+        self, neighbors: Callable[[str], Iterable[str]], ordered_nodes: List[str]
+    ) -> np.ndarray:
+        """Bits of all nodes reached through neighbors, given a compatible order."""
+        n_nodes = len(self.nodes)
+        bits = np.zeros((n_nodes, (n_nodes + 7) // 8), dtype=np.uint8)
+        for node in ordered_nodes:
+            row = bits[self.index[node]]
+            for neighbor in neighbors(node):
+                neighbor_index = self.index[neighbor]
+                row |= bits[neighbor_index]
+                row[neighbor_index >> 3] |= 0x80 >> (neighbor_index & 7)
+        return bits
+
+    def _nodes_from_bits(self, row: np.ndarray) -> Set[str]:
+        indexes = np.flatnonzero(np.unpackbits(row, count=len(self.nodes)))
+        return {self.nodes[index] for index in indexes}
+
+
+def _get_bit(row: np.ndarray, index: int) -> bool:
+    return bool(row[index >> 3] & (0x80 >> (index & 7)))
+
+
 def break_cycles_through_level(digraph: nx.DiGraph):
     """Break cycles in a leveled multidigraph by cutting edges from high to low levels."""
     acygraph = digraph.copy()
@@ -569,6 +863,8 @@ class RequirementsGraphLayout(Enum):
     """Layout using requirement level and a metaheuristic."""
     SPRING = "spring"
     """Classic spring layout."""
+    LAYERED = "layered"
+    """Nodes evenly spread on their requirement level, fast for large graphs."""
 
 
 def apply_color_theme(graph: nx.MultiDiGraph, theme: RequirementTheme):
@@ -583,14 +879,22 @@ def compute_layout(
 ):
     layout = RequirementsGraphLayout(layout)
     if layout == RequirementsGraphLayout.LEVEL:
+        from hebg.layouts.metabased import leveled_layout_energy
+
         pos = leveled_layout_energy(digraph)
     elif layout == RequirementsGraphLayout.SPRING:
         pos = nx.spring_layout(digraph)
+    elif layout == RequirementsGraphLayout.LAYERED:
+        pos = {}
+        for level, level_nodes in digraph.graph["nodes_by_level"].items():
+            n_nodes = len(level_nodes)
+            for index, node in enumerate(level_nodes):
+                pos[node] = [level, (index + 0.5) / n_nodes]
     return pos
 
 
 def _draw_on_plt_ax(
-    ax: Axes,
+    ax: "Axes",
     digraph: nx.DiGraph,
     theme: RequirementTheme,
     resources_path: Path,
@@ -606,11 +910,20 @@ def _draw_on_plt_ax(
         The Axes with requirements_graph drawn on it.
 
     """
+    import matplotlib.patches as mpatches
+    from hebg.graph import draw_networkx_nodes_images
+    from matplotlib.legend_handler import HandlerPatch
+
+    from hcraft.render.utils import load_or_create_image
+
     edges_colors = [
         theme.color_edges([et for et in RequirementEdge].index(edge_type))
         for _, _, edge_type in digraph.edges(data="type")
     ]
-    edges_alphas = [_compute_edge_alpha(*edge, digraph) for edge in digraph.edges()]
+    out_degrees = dict(digraph.out_degree())
+    edges_alphas = [
+        _compute_edge_alpha(out_degrees[pred]) for pred, _ in digraph.edges()
+    ]
     # Plain edges
     nx.draw_networkx_edges(
         digraph,
@@ -738,9 +1051,140 @@ def _draw_html(
     nt.write_html(str(filepath))
 
 
-def _compute_edge_alpha(pred, _succ, graph: nx.DiGraph):
+def _draw_svg(
+    digraph: nx.DiGraph,
+    theme: RequirementTheme,
+    resources_path: Path,
+    filepath: Path,
+    pos: Dict[str, Tuple[float, float]],
+    depth: int,
+    width: int,
+    with_web_uri: bool = False,
+):
+    """Stream the requirements graph to an SVG file, or an HTML file embedding it.
+
+    Nodes and edges are written one by one without intermediate graph copies.
+    Each image, color and arrow head is defined once and referenced afterwards.
+    """
+    from xml.sax.saxutils import escape, quoteattr
+
+    from hcraft.render.utils import obj_image_path
+
+    node_size = 32
+    node_radius = node_size / 2 + 2
+    resolution = [max(96 * width, 600), max(64 * depth, 1000)]
+    poses = np.flip(np.array(list(pos.values()), dtype=float), axis=1)
+    poses_min = np.min(poses, axis=0)
+    poses_range = np.max(poses, axis=0) - poses_min
+    poses_range = np.where(poses_range == 0, 1.0, poses_range)
+    pixel_poses = (poses - poses_min) / poses_range * resolution + node_size
+    pixel_pos = dict(zip(pos.keys(), pixel_poses.tolist()))
+
+    edge_types = [edge_type for edge_type in RequirementEdge]
+    node_types = [node_type for node_type in RequirementNode]
+    view_size = [size + 2 * node_size for size in resolution]
+
+    with open(filepath, "w", encoding="utf-8") as file:
+        as_html = Path(filepath).suffix == ".html"
+        if as_html:
+            file.write(
+                "<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+                "<title>Requirements graph</title></head>\n<body>\n"
+            )
+        file.write(
+            "<svg xmlns='http://www.w3.org/2000/svg' "
+            "xmlns:xlink='http://www.w3.org/1999/xlink' "
+            f"width='{view_size[0]}' height='{view_size[1]}' "
+            f"viewBox='0 0 {view_size[0]} {view_size[1]}'>\n<defs>\n<style>\n"
+        )
+        for index, edge_type in enumerate(edge_types):
+            color = theme.colors.get(edge_type.value, theme.default_color)
+            file.write(f".e{index} {{stroke: {color}; fill: none}}\n")
+        for index, node_type in enumerate(node_types):
+            file.write(f".n{index} {{stroke: {theme.color_node(node_type)}}}\n")
+        file.write("text {font: 10px sans-serif; text-anchor: middle}\n</style>\n")
+        for index, edge_type in enumerate(edge_types):
+            color = theme.colors.get(edge_type.value, theme.default_color)
+            file.write(
+                f"<marker id='a{index}' viewBox='0 0 10 10' refX='10' refY='5' "
+                "markerWidth='6' markerHeight='6' orient='auto-start-reverse'>"
+                f"<path d='M 0 0 L 10 5 L 0 10 z' fill='{color}'/></marker>\n"
+            )
+
+        # Images assets are written on first use then referenced
+        images_ids: Dict[Path, Optional[str]] = {}
+
+        def image_id(node_obj: Union["Item", "Zone"]) -> Optional[str]:
+            image_path = obj_image_path(node_obj, Path(resources_path))
+            if image_path not in images_ids:
+                images_ids[image_path] = None
+                if image_path.exists():
+                    images_ids[image_path] = f"i{len(images_ids)}"
+                    file.write(
+                        f"<defs><image id='{images_ids[image_path]}' "
+                        f"width='{node_size}' height='{node_size}' "
+                        f"href={quoteattr(_image_uri(image_path, with_web_uri))}/>"
+                        "</defs>\n"
+                    )
+            return images_ids[image_path]
+
+        file.write("</defs>\n<g>\n")
+        out_degrees = dict(digraph.out_degree())
+        for pred, node, edge_type in digraph.edges(data="type"):
+            (x1, y1), (x2, y2) = pixel_pos[pred], pixel_pos[node]
+            # Stop arrows at the border of the end node
+            length = max(np.hypot(x2 - x1, y2 - y1), 1.0)
+            x2 -= (x2 - x1) / length * node_radius
+            y2 -= (y2 - y1) / length * node_radius
+            type_index = edge_types.index(RequirementEdge(edge_type))
+            alpha = _compute_edge_alpha(out_degrees[pred])
+            file.write(
+                f"<line class='e{type_index}' x1='{x1:.1f}' y1='{y1:.1f}' "
+                f"x2='{x2:.1f}' y2='{y2:.1f}' stroke-opacity='{alpha}' "
+                f"marker-end='url(#a{type_index})'/>\n"
+            )
+        file.write("</g>\n<g>\n")
+        for node, node_data in digraph.nodes(data=True):
+            x, y = pixel_pos[node]
+            node_type = node_data.get("type")
+            node_obj = node_data.get("obj")
+            title = node if node_obj is None else node_obj.name.capitalize()
+            file.write(f"<g><title>{escape(title)}</title>")
+            node_image_id = image_id(node_obj) if node_obj is not None else None
+            type_index = node_types.index(RequirementNode(node_type))
+            file.write(
+                f"<circle class='n{type_index}' cx='{x:.1f}' cy='{y:.1f}' "
+                f"r='{node_radius}' fill='white'/>"
+            )
+            if node_image_id is not None:
+                file.write(
+                    f"<use href='#{node_image_id}' x='{x - node_size / 2:.1f}' "
+                    f"y='{y - node_size / 2:.1f}'/>"
+                )
+            else:
+                file.write(
+                    f"<text x='{x:.1f}' y='{y + node_size:.1f}'>{escape(title)}</text>"
+                )
+            file.write("</g>\n")
+        file.write("</g>\n</svg>\n")
+        if as_html:
+            file.write("</body></html>\n")
+
+
+def _image_uri(image_path: Path, with_web_uri: bool) -> str:
+    if with_web_uri:
+        relative_path = image_path.relative_to(
+            Path(hcraft.__file__).parent.parent.parent
+        )
+        return (
+            "https://raw.githubusercontent.com/IRLL/HierarchyCraft/master/"
+            f"{relative_path.as_posix()}"
+        )
+    return image_path.as_uri()
+
+
+def _compute_edge_alpha(n_successors: int):
     alphas = [1, 1, 1, 1, 1, 0.5, 0.5, 0.5, 0.2, 0.2, 0.2]
-    n_successors = len(list(graph.successors(pred)))
     alpha = 0.1
     if n_successors < len(alphas):
         alpha = alphas[n_successors - 1]
@@ -755,6 +1199,8 @@ def _serialize_pyvis(
 ):
     """Make a serializable copy of a requirements graph
     by converting objects in it to dicts."""
+    from hcraft.render.utils import obj_image_path
+
     serializable_graph = nx.MultiDiGraph()
 
     for node, node_data in graph.nodes(data=True):
@@ -780,17 +1226,7 @@ def _serialize_pyvis(
             image_path = obj_image_path(node_obj, resources_path)
             if image_path.exists():
                 flat_node_data["shape"] = "image"
-                if with_web_uri:
-                    relative_path = image_path.relative_to(
-                        Path(hcraft.__file__).parent.parent.parent
-                    )
-                    uri = (
-                        "https://raw.githubusercontent.com/IRLL/HierarchyCraft/master/"
-                        f"{relative_path.as_posix()}"
-                    )
-                else:
-                    uri = image_path.as_uri()
-                flat_node_data["image"] = uri
+                flat_node_data["image"] = _image_uri(image_path, with_web_uri)
             label = title
 
         if not label:
@@ -959,38 +1395,51 @@ def _arrows_data_for_image_uri(number_uri: str):
     }
 
 
+_TEXT_IMAGES_CACHE_SIZE = 1024
+"""Maximum number of text images kept in memory for drawings."""
+
+
 def _get_text_image_uri(
     text: str,
     resources_path: Path,
     flipped: bool = False,
 ):
-    numbers_dir = Path(resources_path).joinpath("text_images")
-    numbers_dir.mkdir(exist_ok=True)
+    """Return the URI of an image of the text in the resources, saved if missing."""
+    from PIL import Image
+
+    filename = f"{text}_flipped" if flipped else text
+    number_path = Path(resources_path).joinpath("text_images", f"{filename}.png")
+    if number_path.exists():
+        return number_path.as_uri()
+    number_path.parent.mkdir(exist_ok=True)
     image = _create_text_image(text)
-    filename = text
     if flipped:
-        filename = f"{text}_flipped"
         image = image.transpose(Image.ROTATE_180)
-    number_path = numbers_dir / f"{filename}.png"
     image.save(number_path)
     return number_path.as_uri()
 
 
+@lru_cache(maxsize=_TEXT_IMAGES_CACHE_SIZE)
 def _create_text_image(
     text: str,
     fill_color=(130, 130, 130),
     font_path: Optional[Path] = "arial.ttf",
 ) -> "Image.Image":
-    """Create a PIL image for an Item or Zone.
+    """Create a PIL image of the given text.
+
+    Images are cached and shared between calls, so they must not be modified.
 
     Args:
-        obj: A HierarchyCraft Item, Zone, Recipe or property.
-        resources_path: Path to the resources folder.
+        text: Text to write on the image.
+        fill_color: Color of the text.
+        font_path: Path to the font to use.
 
     Returns:
-        A PIL image corresponding to the given object.
+        A PIL image of the given text.
 
     """
+    from PIL import Image, ImageDraw, ImageFont
+
     image_size = (96, 48)
     image = Image.new("RGBA", image_size, (0, 0, 0, 0))
     draw = ImageDraw.Draw(image)
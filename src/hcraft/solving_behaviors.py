@@ -80,7 +80,7 @@ def build_all_solving_behaviors(env: "HcraftEnv") -> Dict[str, "Behavior"]:
         all_behaviors.pop(name)
 
     # TODO: Use learning complexity instead for more generality
-    requirements_graph = env.world.requirements.graph
+    requirements_levels = env.world.requirements.levels
 
     for behavior in all_behaviors.values():
         if isinstance(behavior, AbleAndPerformTransformation):
@@ -98,7 +98,7 @@ def build_all_solving_behaviors(env: "HcraftEnv") -> Dict[str, "Behavior"]:
             req_node = req_node_name(behavior.item, RequirementNode.ZONE_ITEM)
         else:
             raise NotImplementedError
-        behavior.complexity = requirements_graph.nodes[req_node]["level"]
+        behavior.complexity = requirements_levels[req_node]
         continue
 
     return all_behaviors
@@ -38,6 +38,8 @@ class HcraftState:
         self.discovered_zones_items = np.array([], dtype=np.ubyte)
         self.discovered_transformations = np.array([], dtype=np.ubyte)
 
+        self.valid_actions = np.array([], dtype=bool)
+
         self.world = world
         self.reset()
 
@@ -107,6 +109,12 @@ class HcraftState:
     def _current_zone_slot(self) -> int:
         return self.position.nonzero()[0]
 
+    @property
+    def _zone_slot_or_none(self) -> Optional[int]:
+        if self.position.shape[0] == 0:
+            return None
+        return int(self._current_zone_slot[0])
+
     @property
     def player_inventory_dict(self) -> Dict["Item", int]:
         """Current inventory of the player."""
@@ -135,14 +143,38 @@ class HcraftState:
         choosen_transformation = self.world.transformations[action]
         if not choosen_transformation.is_valid(self):
             return False
+        zone_slot = self._zone_slot_or_none
         choosen_transformation.apply(
             self.player_inventory,
             self.position,
             self.zones_inventories,
         )
         self._update_discoveries(action)
+        self.update_valid_actions(
+            self.world.transformations_affected_by(action, zone_slot)
+        )
         return True
 
+    def update_valid_actions(
+        self, transformations_ids: Optional[np.ndarray] = None
+    ) -> None:
+        """Check again the validity of the given transformations in the current state.
+
+        The mask of valid actions is kept up to date incrementally when applying
+        transformations. This should only be called directly after modifying the
+        state arrays by hand.
+
+        Args:
+            transformations_ids: Indexes of transformations to check.
+                If None, check all of them. Defaults to None.
+        """
+        transformations = self.world.transformations
+        if transformations_ids is None:
+            transformations_ids = np.arange(len(transformations))
+        self.valid_actions[transformations_ids] = [
+            transformations[t_id].is_valid(self) for t_id in transformations_ids
+        ]
+
     def reset(self) -> None:
         """Reset the state to it's initial value."""
         self.player_inventory = np.zeros(self.world.n_items, dtype=np.int32)
@@ -174,6 +206,9 @@ class HcraftState:
         )
         self._update_discoveries()
 
+        self.valid_actions = np.zeros(len(self.world.transformations), dtype=bool)
+        self.update_valid_actions()
+
     def _update_discoveries(self, action: Optional[int] = None) -> None:
         self.discovered_items = np.bitwise_or(
             self.discovered_items, self.player_inventory > 0
@@ -1,5 +1,6 @@
 from abc import abstractmethod
-from typing import TYPE_CHECKING, List, Optional, Union
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -166,6 +167,130 @@ class PlaceItemTask(AchievementTask):
         return f"Place{quantity_str}{stack.item.name}{zones_str}"
 
 
+@dataclass(frozen=True)
+class Term:
+    """Amount of an element in the state weighted by a coefficient.
+
+    The element depends on the given item and zone:
+
+    * item only: quantity of the item in the player inventory.
+    * zone only: 1 if the player is in the zone, 0 otherwise.
+    * item and zone: quantity of the item in the zone inventory.
+
+    """
+
+    coefficient: int
+    item: Optional[Item] = None
+    zone: Optional[Zone] = None
+
+    def __post_init__(self):
+        if self.item is None and self.zone is None:
+            raise ValueError("Term should refer to an item, a zone or both.")
+
+
+@dataclass(frozen=True)
+class LinearConstraint:
+    """Linear inequality over state amounts: sum(terms) >= threshold (or <=)."""
+
+    terms: Tuple[Term, ...]
+    threshold: int
+    at_most: bool = False
+    """If True, the constraint is sum(terms) <= threshold instead."""
+
+    def __post_init__(self):
+        object.__setattr__(self, "terms", tuple(self.terms))
+
+    def threshold_row(self) -> Tuple[List[Term], int]:
+        """Equivalent constraint as terms with their sum being at least a threshold."""
+        if not self.at_most:
+            return list(self.terms), self.threshold
+        terms = [Term(-term.coefficient, term.item, term.zone) for term in self.terms]
+        return terms, -self.threshold
+
+
+class LinearConstraintsTask(AchievementTask):
+    """Task to satisfy all (or any) of the given linear constraints over the state.
+
+    Compiled into the vectorized purpose evaluation like built-in tasks,
+    see `hcraft.compiled_purpose`.
+
+    Example:
+        Have at least 3 more planks than sticks, or any wood placed in the forest:
+        ```python
+        task = LinearConstraintsTask(
+            "More planks than sticks or wood in forest",
+            [
+                LinearConstraint([Term(1, PLANK), Term(-1, STICK)], threshold=3),
+                LinearConstraint([Term(1, WOOD, FOREST)], threshold=1),
+            ],
+            any_constraint=True,
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        name: str,
+        constraints: List[LinearConstraint],
+        any_constraint: bool = False,
+        reward: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            name: Name of the task.
+            constraints: Linear constraints to satisfy.
+            any_constraint: If True, satisfying any constraint is enough,
+                else all constraints have to be satisfied. Defaults to False.
+            reward: Reward given when the task is achieved. Defaults to 1.0.
+        """
+        if not constraints:
+            raise ValueError("LinearConstraintsTask needs at least one constraint.")
+        super().__init__(name=name, reward=reward)
+        self.constraints = list(constraints)
+        self.any_constraint = any_constraint
+        self._thresholds = None
+
+    def build(self, world: "World") -> None:
+        super().build(world)
+        n_constraints = len(self.constraints)
+        self._terminate_player_items = np.zeros(
+            (n_constraints, world.n_items), dtype=np.int32
+        )
+        self._terminate_position = np.zeros(
+            (n_constraints, world.n_zones), dtype=np.int32
+        )
+        self._terminate_zones_items = np.zeros(
+            (n_constraints, world.n_zones, world.n_zones_items), dtype=np.int32
+        )
+        self._thresholds = np.zeros(n_constraints, dtype=np.int32)
+        for index, constraint in enumerate(self.constraints):
+            terms, self._thresholds[index] = constraint.threshold_row()
+            for term in terms:
+                if term.zone is None:
+                    item_slot = world.slot_from_item(term.item)
+                    self._terminate_player_items[index, item_slot] += term.coefficient
+                elif term.item is None:
+                    zone_slot = world.slot_from_zone(term.zone)
+                    self._terminate_position[index, zone_slot] += term.coefficient
+                else:
+                    zone_slot = world.slot_from_zone(term.zone)
+                    item_slot = world.slot_from_zoneitem(term.item)
+                    self._terminate_zones_items[index, zone_slot, item_slot] += (
+                        term.coefficient
+                    )
+
+    def _is_terminal(self, state: "HcraftState") -> bool:
+        sums = (
+            self._terminate_player_items @ state.player_inventory
+            + self._terminate_position @ state.position
+            + np.tensordot(self._terminate_zones_items, state.zones_inventories, 2)
+        )
+        holds = sums >= self._thresholds
+        if self.any_constraint:
+            return bool(np.any(holds))
+        return bool(np.all(holds))
+
+
 def _stack_item(item_or_stack: Union[Item, Stack]) -> Stack:
     if not isinstance(item_or_stack, Stack):
         item_or_stack = Stack(item_or_stack)
@@ -34,14 +34,25 @@ world = world_from_transformations(
 
 """
 
+import hashlib
+from collections import defaultdict
 from dataclasses import dataclass, field
 from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Callable, DefaultDict, Dict, List, Optional, Set, Tuple, Union
 
+import numpy as np
+
+from hcraft.compiled import CompiledWorld, compile_world
 from hcraft.elements import Item, Stack, Zone
 from hcraft.requirements import RequirementNode, Requirements, req_node_name
-from hcraft.transformation import Transformation, InventoryOwner
+from hcraft.transformation import (
+    CURRENT_ZONE,
+    PLAYER,
+    InventoryOperation,
+    InventoryOwner,
+    Transformation,
+)
 
 
 def _default_resources_path() -> Path:
@@ -55,6 +66,9 @@ class World:
 
     Elements are items, zones, zones_items and transformations
     Also contain optional start_zone, start_items and start_zones_items.
+
+    The world also maintains inverted indexes from items and zones to the
+    transformations producing, consuming, requiring or entering them.
     """
 
     items: List[Item]
@@ -71,25 +85,26 @@ class World:
 
     def __post_init__(self):
         self._requirements = None
+        self._compiled = None
+        self._build_transformations_indexes()
 
         if self.order_world:
-            item_rank = partial(
-                _get_node_level, self.requirements, node_type=RequirementNode.ITEM
-            )
+            # Levels are computed before sorting as lists are emptied during sort.
+            levels = self.requirements.levels
+            item_rank = partial(_get_node_level, levels, node_type=RequirementNode.ITEM)
             self.items.sort(key=item_rank)
 
             zone_item_rank = partial(
-                _get_node_level, self.requirements, node_type=RequirementNode.ZONE_ITEM
+                _get_node_level, levels, node_type=RequirementNode.ZONE_ITEM
             )
             self.zones_items.sort(key=zone_item_rank)
 
-            zone_rank = partial(
-                _get_node_level, self.requirements, node_type=RequirementNode.ZONE
-            )
+            zone_rank = partial(_get_node_level, levels, node_type=RequirementNode.ZONE)
             self.zones.sort(key=zone_rank)
 
         for transfo in self.transformations:
             transfo.build(self)
+        self._build_slots_dependents()
 
     @property
     def n_items(self) -> int:
@@ -117,6 +132,114 @@ class World:
             self._requirements = Requirements(self)
         return self._requirements
 
+    @property
+    def compiled(self) -> "CompiledWorld":
+        """Flat array representation of the world for fast batched computations.
+
+        See `hcraft.compiled` for more details.
+
+        """
+        if self._compiled is None:
+            self._compiled = compile_world(self)
+        return self._compiled
+
+    def content_hash(self) -> str:
+        """Hash of the world content, stable across processes.
+
+        Worlds with the same elements, the same transformations in the same order
+        and the same start have the same hash, whatever the order of their elements.
+
+        """
+        content = (
+            sorted(item.name for item in self.items),
+            sorted(zone.name for zone in self.zones),
+            sorted(item.name for item in self.zones_items),
+            [
+                (
+                    transfo.name,
+                    transfo.zone,
+                    transfo.destination,
+                    transfo.inventory_changes,
+                )
+                for transfo in self.transformations
+            ],
+            self.start_zone,
+            self.start_items,
+            self.start_zones_items,
+        )
+        return hashlib.sha256(repr(content).encode()).hexdigest()
+
+    def layout_hash(self) -> str:
+        """Hash of the world content and of the order of its elements.
+
+        Unlike `content_hash`, worlds with elements in another order have different
+        hashes, as their compiled states (see `hcraft.compiled`) use other slots.
+
+        """
+        content = (
+            self.content_hash(),
+            [item.name for item in self.items],
+            [zone.name for zone in self.zones],
+            [item.name for item in self.zones_items],
+        )
+        return hashlib.sha256(repr(content).encode()).hexdigest()
+
+    def producers(self, item: Item) -> List["Transformation"]:
+        """Transformations adding the given item to the player inventory."""
+        return self._item_producers.get(item, [])
+
+    def consumers(self, item: Item) -> List["Transformation"]:
+        """Transformations removing the given item from the player inventory."""
+        return self._item_consumers.get(item, [])
+
+    def requirers(self, item: Item) -> List["Transformation"]:
+        """Transformations requiring a minimum of the given item in the player inventory."""
+        return self._item_requirers.get(item, [])
+
+    def zone_item_producers(self, item: Item) -> List["Transformation"]:
+        """Transformations adding the given item to any zone inventory."""
+        return self._zone_item_producers.get(item, [])
+
+    def zone_item_consumers(self, item: Item) -> List["Transformation"]:
+        """Transformations removing the given item from any zone inventory."""
+        return self._zone_item_consumers.get(item, [])
+
+    def zone_item_requirers(self, item: Item) -> List["Transformation"]:
+        """Transformations requiring a minimum of the given item in any zone inventory."""
+        return self._zone_item_requirers.get(item, [])
+
+    def entering(self, zone: Zone) -> List["Transformation"]:
+        """Transformations having the given zone as destination."""
+        return self._zone_entering.get(zone, [])
+
+    def transformations_affected_by(
+        self, transformation_id: int, zone_slot: Optional[int]
+    ) -> np.ndarray:
+        """Transformations whose validity may change by applying the given one.
+
+        Args:
+            transformation_id: Index of the applied transformation.
+            zone_slot: Slot of the zone where the transformation is applied.
+                None if the world has no zone.
+
+        Returns:
+            Sorted indexes of transformations that need to be checked again.
+        """
+        changes = self._transformations_changes[transformation_id]
+        affected = [self._player_dependents[slot] for slot in changes.player_slots]
+        changed_cells = list(changes.zones_cells)
+        if zone_slot is not None:
+            changed_cells += [(zone_slot, slot) for slot in changes.current_zone_slots]
+        for cell in changed_cells:
+            affected.append(self._zones_dependents.get(cell, _NO_DEPENDENTS))
+            if not changes.moves and cell[0] == zone_slot:
+                affected.append(self._current_zone_dependents[cell[1]])
+        if changes.moves:
+            affected.append(self._position_dependents)
+        if not affected:
+            return _NO_DEPENDENTS
+        return np.unique(np.concatenate(affected))
+
     def slot_from_item(self, item: Item) -> int:
         """Item's slot in the world"""
         return self.items.index(item)
@@ -129,6 +252,144 @@ class World:
         """Item's slot in the world as a zone item."""
         return self.zones_items.index(zone)
 
+    def _build_transformations_indexes(self) -> None:
+        """Build inverted indexes from items and zones to transformations.
+
+        Transformations are kept in the world order in each index.
+        """
+        transfos = self.transformations
+        self._item_producers = _inverted_index(transfos, lambda t: t.production(PLAYER))
+        self._item_consumers = _inverted_index(
+            transfos, lambda t: t.consumption(PLAYER)
+        )
+        self._item_requirers = _inverted_index(
+            transfos, lambda t: t.min_required(PLAYER)
+        )
+        self._zone_item_producers = _inverted_index(
+            transfos, lambda t: t.produced_zones_items
+        )
+        self._zone_item_consumers = _inverted_index(
+            transfos, lambda t: t.consumed_zones_items
+        )
+        self._zone_item_requirers = _inverted_index(
+            transfos, lambda t: t.min_required_zones_items
+        )
+        self._zone_entering = _inverted_index(
+            transfos, lambda t: set() if t.destination is None else {t.destination}
+        )
+
+    def _build_slots_dependents(self) -> None:
+        """Build indexes from state slots to transformations depending on them.
+
+        A transformation depends on a slot if one of its preconditions reads it.
+        Also records which slots each transformation changes when applied.
+        """
+        items_slots = {item: slot for slot, item in enumerate(self.items)}
+        zones_slots = {zone: slot for slot, zone in enumerate(self.zones)}
+        zones_items_slots = {item: slot for slot, item in enumerate(self.zones_items)}
+
+        player_dependents = [[] for _ in range(self.n_items)]
+        current_zone_dependents = [[] for _ in range(self.n_zones_items)]
+        zones_dependents: DefaultDict[Tuple[int, int], List[int]] = defaultdict(list)
+        position_dependents = []
+        self._transformations_changes: List[_TransformationChanges] = []
+
+        for t_id, transfo in enumerate(self.transformations):
+            for item in transfo.min_required(PLAYER) | transfo.max_required(PLAYER):
+                player_dependents[items_slots[item]].append(t_id)
+
+            current_items = transfo.min_required(CURRENT_ZONE) | transfo.max_required(
+                CURRENT_ZONE
+            )
+            for item in current_items:
+                current_zone_dependents[zones_items_slots[item]].append(t_id)
+
+            for cell in _zones_cells(
+                transfo, (InventoryOperation.MIN, InventoryOperation.MAX), zones_slots
+            ):
+                zones_dependents[_slots_cell(cell, zones_items_slots)].append(t_id)
+
+            depends_on_position = current_items or transfo.zone is not None
+            if depends_on_position or transfo.destination is not None:
+                position_dependents.append(t_id)
+
+            changed_cells = _zones_cells(
+                transfo,
+                (InventoryOperation.ADD, InventoryOperation.REMOVE),
+                zones_slots,
+            )
+            self._transformations_changes.append(
+                _TransformationChanges(
+                    player_slots=[
+                        items_slots[item]
+                        for item in transfo.production(PLAYER)
+                        | transfo.consumption(PLAYER)
+                    ],
+                    current_zone_slots=[
+                        zones_items_slots[item]
+                        for item in transfo.production(CURRENT_ZONE)
+                        | transfo.consumption(CURRENT_ZONE)
+                    ],
+                    zones_cells=[
+                        _slots_cell(cell, zones_items_slots) for cell in changed_cells
+                    ],
+                    moves=transfo.destination is not None,
+                )
+            )
+
+        self._player_dependents = [_as_ids(ids) for ids in player_dependents]
+        self._current_zone_dependents = [
+            _as_ids(ids) for ids in current_zone_dependents
+        ]
+        self._zones_dependents = {
+            cell: _as_ids(ids) for cell, ids in zones_dependents.items()
+        }
+        self._position_dependents = _as_ids(position_dependents)
+
+
+@dataclass
+class _TransformationChanges:
+    """Slots changed by applying a transformation."""
+
+    player_slots: List[int]
+    current_zone_slots: List[int]
+    zones_cells: List[Tuple[int, int]]
+    moves: bool
+
+
+_NO_DEPENDENTS = np.array([], dtype=np.int32)
+
+
+def _as_ids(ids: List[int]) -> np.ndarray:
+    return np.array(ids, dtype=np.int32)
+
+
+def _slots_cell(
+    cell: Tuple[int, Item], zones_items_slots: Dict[Item, int]
+) -> Tuple[int, int]:
+    zone_slot, item = cell
+    return (zone_slot, zones_items_slots[item])
+
+
+def _zones_cells(
+    transfo: "Transformation",
+    operations: Tuple[InventoryOperation, ...],
+    zones_slots: Dict[Zone, int],
+) -> Set[Tuple[int, Item]]:
+    """Cells (zone slot, zone item) of specific zones and destination
+    involved in the given operations of a transformation."""
+    cells = set()
+    for operation in operations:
+        zones_stacks = transfo.get_changes(InventoryOwner.ZONES, operation, {})
+        for zone, stacks in zones_stacks.items():
+            cells |= {(zones_slots[zone], stack.item) for stack in stacks}
+        if transfo.destination is None:
+            continue
+        dest_slot = zones_slots[transfo.destination]
+        dest_stacks = transfo.get_changes(InventoryOwner.DESTINATION, operation, [])
+        cells |= {(dest_slot, stack.item) for stack in dest_stacks}
+    return cells
+
 
 def world_from_transformations(
     transformations: List["Transformation"],
@@ -214,10 +475,21 @@ def _transformations_elements(
 
 
 def _get_node_level(
-    requirements: Requirements, obj: Union[Item, Zone], node_type: RequirementNode
+    levels: Dict[str, int], obj: Union[Item, Zone], node_type: RequirementNode
 ):
     node_name = req_node_name(obj, node_type=node_type)
-    return (requirements.graph.nodes[node_name].get("level", 1000), node_name)
+    return (levels.get(node_name, 1000), node_name)
+
+
+def _inverted_index(
+    transformations: List["Transformation"],
+    objs_of: Callable[["Transformation"], Set[Union[Item, Zone]]],
+) -> Dict[Union[Item, Zone], List["Transformation"]]:
+    index: DefaultDict[Union[Item, Zone], List["Transformation"]] = defaultdict(list)
+    for transfo in transformations:
+        for obj in objs_of(transfo):
+            index[obj].append(transfo)
+    return dict(index)
 
 
 def _add_items_to(stacks: Optional[List[Stack]], items_set: Set[Item]):
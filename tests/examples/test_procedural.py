@@ -0,0 +1,76 @@
+import numpy as np
+import pytest_check as check
+
+from hcraft.examples.procedural import ProceduralHcraftEnv, generate_compiled_world
+from hcraft.reachability import analyze_reachability
+from tests.custom_checks import check_np_equal
+
+
+class TestProceduralGeneration:
+    def test_same_seed_same_world(self):
+        compiled = generate_compiled_world(
+            n_items=50, n_zones=4, n_zones_items=3, seed=42
+        )
+        other = generate_compiled_world(n_items=50, n_zones=4, n_zones_items=3, seed=42)
+        check_np_equal(compiled.changes.indptr, other.changes.indptr)
+        check_np_equal(compiled.changes.indices, other.changes.indices)
+        check_np_equal(compiled.min_conditions.values, other.min_conditions.values)
+        check_np_equal(compiled.zone, other.zone)
+
+    def test_different_seed_different_world(self):
+        compiled = generate_compiled_world(n_items=50, seed=42)
+        other = generate_compiled_world(n_items=50, seed=43)
+        check.is_false(np.array_equal(compiled.changes.indices, other.changes.indices))
+
+    def test_sizes(self):
+        compiled = generate_compiled_world(
+            n_items=100, n_zones=5, n_zones_items=4, n_recipes=300, seed=0
+        )
+        check.equal(compiled.n_items, 100)
+        check.equal(compiled.n_zones, 5)
+        check.equal(compiled.n_zones_items, 4)
+        n_moves = 2 * (5 - 1)
+        check.equal(compiled.n_transformations, 300 + n_moves)
+
+    def test_everything_is_reachable(self):
+        compiled = generate_compiled_world(
+            n_items=200,
+            n_zones=10,
+            n_zones_items=10,
+            depth=8,
+            zone_item_required_ratio=0.5,
+            seed=0,
+        )
+        check.is_true(analyze_reachability(compiled).everything_reachable)
+
+    def test_large_world(self):
+        compiled = generate_compiled_world(
+            n_items=10**5, n_zones=100, n_zones_items=1000, depth=20, seed=0
+        )
+        check.greater(compiled.n_transformations, 10**5)
+        check.equal(compiled.valid_mask(compiled.initial_state).shape[0], 101198)
+
+
+class TestProceduralHcraftEnv:
+    def test_world_compiles_back_to_generated(self):
+        env = ProceduralHcraftEnv(seed=42)
+        generated = generate_compiled_world(
+            n_items=30, n_zones=3, n_zones_items=3, depth=5, seed=42
+        )
+        compiled = env.world.compiled
+        check_np_equal(compiled.changes.indices, generated.changes.indices)
+        check_np_equal(compiled.changes.values, generated.changes.values)
+        check_np_equal(compiled.min_conditions.values, generated.min_conditions.values)
+        check_np_equal(compiled.destination, generated.destination)
+
+    def test_solvable(self):
+        env = ProceduralHcraftEnv(seed=0)
+        solving_behavior = env.solving_behavior(env.purpose.tasks[0])
+        observation, _info = env.reset()
+        terminated = False
+        for _ in range(500):
+            action = solving_behavior(observation)
+            observation, _reward, terminated, _truncated, _info = env.step(action)
+            if terminated:
+                break
+        check.is_true(terminated)
@@ -0,0 +1,83 @@
+from typing import Type
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.elements import Item
+from hcraft.env import HcraftEnv
+from hcraft.examples import EXAMPLE_ENVS
+from hcraft.examples.minecraft import MineHcraftEnv
+from hcraft.planning import SearchAlgorithm, search_plan
+from hcraft.purpose import Purpose
+from hcraft.task import GetItemTask
+from tests.envs import classic_env
+
+
+@pytest.mark.parametrize(
+    "env_class", [env for env in EXAMPLE_ENVS if env != MineHcraftEnv]
+)
+@pytest.mark.parametrize(
+    "algorithm", [algorithm.value for algorithm in SearchAlgorithm]
+)
+def test_solve_flat(env_class: Type[HcraftEnv], algorithm: str):
+    env = env_class(max_step=200)
+    problem = env.native_planning_problem(algorithm=algorithm, timeout=10)
+
+    done = False
+    _observation, _info = env.reset()
+    while not done:
+        action = problem.action_from_plan(env.state)
+        _observation, _reward, terminated, truncated, _info = env.step(action)
+        done = terminated or truncated
+    check.is_true(
+        env.purpose.terminated, msg=f"Plans failed they were :{problem.plans}"
+    )
+
+
+def _classic_search(goal_item: Item, **kwargs):
+    _, world, named_transformations, _, _, _, _ = classic_env()
+    purpose = Purpose(GetItemTask(goal_item))
+    env = HcraftEnv(world, purpose=purpose)
+    env.reset()
+    compiled = world.compiled
+    result = search_plan(
+        compiled, purpose.compiled, compiled.state_from(env.state), [0], **kwargs
+    )
+    return result, env, named_transformations
+
+
+def test_bfs_finds_shortest_plan():
+    result, env, named_transformations = _classic_search(Item("plank"), algorithm="bfs")
+    expected_plan = [
+        env.world.transformations.index(named_transformations[name])
+        for name in ("search_wood", "craft_plank")
+    ]
+    check.equal(result.plan, expected_plan)
+    check.equal(result.stats["plan_length"], 2)
+
+
+def test_already_achieved_goal_gives_empty_plan():
+    result, _, _ = _classic_search(
+        Item("wood"), achieved=np.array([True]), algorithm="astar"
+    )
+    check.equal(result.plan, [])
+
+
+def test_budget_exceeded_gives_no_plan():
+    result, _, _ = _classic_search(Item("plank"), algorithm="bfs", max_expansions=1)
+    check.is_none(result.plan)
+    check.equal(result.expanded, 1)
+
+
+def test_unreachable_goal_raises():
+    _, world, _, _, _, _, _ = classic_env()
+    world.transformations = [
+        transfo for transfo in world.transformations if transfo.name != "search_wood"
+    ]
+    world.__post_init__()
+    env = HcraftEnv(world, purpose=GetItemTask(Item("plank")))
+    env.reset()
+    problem = env.native_planning_problem()
+    with pytest.raises(ValueError):
+        problem.action_from_plan(env.state)
@@ -1,7 +1,23 @@
 from typing import Optional, Type, List
+import multiprocessing.queues
+import queue
 import warnings
 import pytest
+from pytest_mock import MockerFixture
+import pytest_check as check
+
 from hcraft.env import HcraftEnv
+from hcraft.examples.minicraft import MiniHCraftUnlock
+from hcraft.plan_cache import PlanCache
+from hcraft.planning import HcraftPlanningProblem
+from hcraft.task import (
+    AchievementTask,
+    GetItemTask,
+    LinearConstraint,
+    LinearConstraintsTask,
+    Term,
+)
+from hcraft.elements import Item
 from tests.envs import classic_env
 
 
@@ -17,6 +33,25 @@ class TestPlanning:
         self.fixture.then_warning_should_be_given(UserWarning, "plans will be empty")
 
 
+def test_update_problem_only_sets_changed_fluents(mocker: MockerFixture):
+    pytest.importorskip("unified_planning")
+    _, world, named_transformations, _, _, _, _ = classic_env()
+    env = HcraftEnv(world, purpose=GetItemTask(Item("plank")))
+    env.reset()
+    planning_problem = env.planning_problem()
+    upf_problem = planning_problem.upf_problem
+    set_initial_value = mocker.spy(upf_problem, "set_initial_value")
+
+    planning_problem.update_problem_to_state(upf_problem, env.state)
+    check.equal(set_initial_value.call_count, 0)
+
+    env.step(env.world.transformations.index(named_transformations["search_wood"]))
+    planning_problem.update_problem_to_state(upf_problem, env.state)
+    check.equal(set_initial_value.call_count, 1)
+    wood = planning_problem.amount(planning_problem.items_obj[Item("wood")])
+    check.equal(upf_problem.initial_value(wood).constant_value(), 1)
+
+
 @pytest.fixture
 def planning_fixture() -> "PlanningFixture":
     return PlanningFixture()
@@ -57,3 +92,125 @@ def _warning_in_records(
             if isinstance(arg, str) and match in arg:
                 return True
     return False
+
+
+def test_cached_plan_suffixes_are_reused_between_problems(mocker: MockerFixture):
+    pytest.importorskip("unified_planning")
+    pytest.importorskip("up_enhsp")
+    env = MiniHCraftUnlock()
+    plan_cache = PlanCache(env.world)
+
+    env.reset()
+    first_problem = env.planning_problem(plan_cache=plan_cache)
+    env.step(first_problem.action_from_plan(env.state))
+    first_plan_suffix = first_problem.plans[0].actions[1:]
+
+    second_problem = env.planning_problem(plan_cache=plan_cache)
+    solve = mocker.spy(second_problem, "solve")
+    second_problem.action_from_plan(env.state)
+    check.equal(solve.call_count, 0)
+    check.equal(plan_cache.hits, 1)
+    check.equal(second_problem.stats, [{"planner": "cache"}])
+    check.equal(
+        [str(action) for action in second_problem.plans[0].actions],
+        [str(action) for action in first_plan_suffix],
+    )
+
+
+def test_portfolio_keeps_first_valid_plan():
+    pytest.importorskip("unified_planning")
+    env = MiniHCraftUnlock()
+    env.reset()
+    portfolio = ["not_a_planner", ("native", {"algorithm": "gbfs"})]
+    planning_problem = env.planning_problem(portfolio=portfolio, timeout=10)
+
+    terminated = False
+    while not terminated:
+        action = planning_problem.action_from_plan(env.state)
+        if action is None:
+            break
+        _observation, _reward, terminated, _truncated, _info = env.step(action)
+
+    check.is_true(env.purpose.terminated)
+    check.equal(planning_problem.stats[0]["planner"], "native(algorithm=gbfs)")
+
+
+def test_portfolio_reads_results_of_planners_ended_while_polling(
+    mocker: MockerFixture,
+):
+    pytest.importorskip("unified_planning")
+    env = MiniHCraftUnlock()
+    env.reset()
+    queue_get = multiprocessing.queues.Queue.get
+
+    def get_only_without_blocking(results_queue, block=True, timeout=None):
+        if block:
+            raise queue.Empty
+        return queue_get(results_queue, block, timeout)
+
+    mocker.patch.object(multiprocessing.queues.Queue, "get", get_only_without_blocking)
+    planning_problem = env.planning_problem(
+        portfolio=[("native", {"algorithm": "gbfs"})], timeout=10
+    )
+    planning_problem.solve()
+    check.equal(planning_problem.stats[0]["planner"], "native(algorithm=gbfs)")
+
+
+def test_portfolio_without_plan_raises():
+    pytest.importorskip("unified_planning")
+    env = MiniHCraftUnlock()
+    env.reset()
+    planning_problem = env.planning_problem(portfolio=["not_a_planner"], timeout=10)
+    with pytest.raises(ValueError, match="Not plan could be found"):
+        planning_problem.solve()
+
+
+def test_planning_domain_is_built_once_per_world(mocker: MockerFixture):
+    pytest.importorskip("unified_planning")
+    env = MiniHCraftUnlock()
+    env.reset()
+    first_problem = env.planning_problem()
+    build_template = mocker.spy(HcraftPlanningProblem, "_build_template")
+    second_problem = MiniHCraftUnlock().planning_problem()
+
+    check.equal(build_template.call_count, 0)
+    check.is_not(second_problem.upf_problem, first_problem.upf_problem)
+    check.equal(str(second_problem.upf_problem), str(first_problem.upf_problem))
+
+
+def test_linear_constraints_goal_is_planned():
+    pytest.importorskip("unified_planning")
+    pytest.importorskip("up_enhsp")
+    world = MiniHCraftUnlock().world
+    start_room = world.zones[0]
+    open_door_without_key = LinearConstraintsTask(
+        "Open door without key",
+        [
+            LinearConstraint([Term(1, Item("open_door"), start_room)], threshold=1),
+            LinearConstraint([Term(1, Item("key"))], threshold=0, at_most=True),
+        ],
+    )
+    env = HcraftEnv(world, purpose=open_door_without_key, max_step=50)
+    env.reset()
+    planning_problem = env.planning_problem(timeout=20)
+
+    terminated = False
+    while not terminated:
+        action = planning_problem.action_from_plan(env.state)
+        if action is None:
+            break
+        _observation, _reward, terminated, _truncated, _info = env.step(action)
+    check.is_true(env.purpose.terminated)
+
+
+def test_uncompiled_tasks_point_to_native_planning():
+    pytest.importorskip("unified_planning")
+
+    class CustomTask(AchievementTask):
+        def _is_terminal(self, state) -> bool:
+            return bool(state.player_inventory.sum() > 10)
+
+    _, world, _, _, _, _, _ = classic_env()
+    env = HcraftEnv(world, purpose=CustomTask("Many items", reward=1.0))
+    with pytest.raises(NotImplementedError, match="NativePlanningProblem"):
+        env.planning_problem()
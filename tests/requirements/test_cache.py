@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import networkx as nx
+import pytest
+import pytest_check as check
+
+from hcraft.examples import MineHcraftEnv
+from hcraft.requirements import REQUIREMENTS_CACHE_ENV_VAR, Requirements
+
+
+def _forbid_build(*args, **kwargs):
+    raise AssertionError("Requirements should have been loaded from cache.")
+
+
+def test_requirements_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv(REQUIREMENTS_CACHE_ENV_VAR, raising=False)
+    world = MineHcraftEnv().world
+    requirements = Requirements(world, cache_dir=tmp_path)
+    levels = requirements.levels
+    spring_pos = requirements.layout("spring")
+    check.equal(
+        [path.name for path in tmp_path.iterdir()], [f"{world.content_hash()}.json"]
+    )
+
+    other_world = MineHcraftEnv().world
+    expected_graph = Requirements(other_world).graph
+    monkeypatch.setattr(Requirements, "_add_requirements_nodes", _forbid_build)
+    monkeypatch.setattr("hcraft.requirements.compute_layout", _forbid_build)
+    cached_requirements = Requirements(other_world, cache_dir=tmp_path)
+    check.equal(cached_requirements.levels, levels)
+    check.equal(cached_requirements.layout("spring"), spring_pos)
+    check.is_true(nx.utils.graphs_equal(cached_requirements.graph, expected_graph))
+
+
+def test_cache_from_environment_variable(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setenv(REQUIREMENTS_CACHE_ENV_VAR, str(tmp_path))
+    world = MineHcraftEnv().world
+    check.equal(world.requirements.cache_dir, tmp_path)
+    world.requirements.levels
+    check.is_true((tmp_path / f"{world.content_hash()}.json").exists())
+
+
+def test_no_cache_by_default(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv(REQUIREMENTS_CACHE_ENV_VAR, raising=False)
+    check.is_none(Requirements(MineHcraftEnv().world).cache_dir)
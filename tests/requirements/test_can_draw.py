@@ -1,5 +1,6 @@
 from pathlib import Path
 from typing import TYPE_CHECKING, Type
+from xml.etree import ElementTree
 
 import pytest
 from pytest_mock import MockerFixture
@@ -49,3 +50,19 @@ def test_can_draw(env_class: Type[HcraftEnv], mocker: MockerFixture):
         if not save:
             mocker.patch("pyvis.network.Network.write_html")
         requirements.draw(engine="pyvis", save_path=filepath, with_web_uri=True)
+
+
+@pytest.mark.parametrize("env_class", EXAMPLE_ENVS)
+@pytest.mark.parametrize("suffix", [".svg", ".html"])
+def test_can_draw_svg(env_class: Type[HcraftEnv], suffix: str, tmp_path: Path):
+    requirements = env_class().world.requirements
+    filepath = tmp_path / f"requirements{suffix}"
+    requirements.draw(engine="svg", layout="layered", save_path=filepath)
+    svg_text = filepath.read_text()
+    if suffix == ".html":
+        svg_text = svg_text[svg_text.index("<svg") : svg_text.index("</svg>") + 6]
+    svg = ElementTree.fromstring(svg_text)
+    circles = svg.findall(".//{http://www.w3.org/2000/svg}circle")
+    lines = svg.findall(".//{http://www.w3.org/2000/svg}line")
+    assert len(circles) == requirements.digraph.number_of_nodes()
+    assert len(lines) == requirements.digraph.number_of_edges()
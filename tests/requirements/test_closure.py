@@ -0,0 +1,30 @@
+from typing import Type
+
+import networkx as nx
+import pytest
+import pytest_check as check
+
+from hcraft.examples import EXAMPLE_ENVS
+from hcraft.env import HcraftEnv
+from hcraft.requirements import RequirementsClosure
+
+
+def test_closure_of_small_graph():
+    graph = nx.DiGraph([("a", "b"), ("b", "c"), ("a", "d")])
+    closure = RequirementsClosure(graph)
+    check.equal(closure.ancestors("c"), {"a", "b"})
+    check.equal(closure.descendants("a"), {"b", "c", "d"})
+    check.equal(closure.descendants("c"), set())
+    check.is_true(closure.is_ancestor("a", "c"))
+    check.is_false(closure.is_ancestor("d", "c"))
+
+
+@pytest.mark.parametrize(
+    "env_class", EXAMPLE_ENVS, ids=[env_class.__name__ for env_class in EXAMPLE_ENVS]
+)
+def test_closure_matches_networkx(env_class: Type[HcraftEnv]):
+    requirements = env_class().world.requirements
+    acydigraph = requirements.acydigraph
+    for node in acydigraph.nodes():
+        check.equal(requirements.ancestors(node), nx.ancestors(acydigraph, node))
+        check.equal(requirements.descendants(node), nx.descendants(acydigraph, node))
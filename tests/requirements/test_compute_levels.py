@@ -0,0 +1,43 @@
+import networkx as nx
+import pytest
+import pytest_check as check
+
+from hcraft.requirements import compute_levels
+
+
+class TestComputeLevels:
+    def test_min_over_keys_of_max_predecessors(self):
+        graph = nx.MultiDiGraph()
+        graph.add_edge("start", "a", key=-1)
+        graph.add_edge("a", "b", key=0)
+        graph.add_edge("b", "c", key=1)
+        # c can be obtained from a and b together, or from a alone
+        graph.add_edge("a", "d", key=2)
+        graph.add_edge("c", "d", key=2)
+        graph.add_edge("a", "d", key=3)
+
+        nodes_by_level = compute_levels(graph)
+
+        levels = dict(graph.nodes(data="level"))
+        check.equal(levels, {"start": 0, "a": 1, "b": 2, "c": 3, "d": 2})
+        check.equal(nodes_by_level, {0: ["start"], 1: ["a"], 2: ["b", "d"], 3: ["c"]})
+        check.equal(graph.graph["nodes_by_level"], nodes_by_level)
+        check.equal(graph.graph["depth"], 3)
+        check.equal(graph.graph["width"], 2)
+
+    def test_cycles(self):
+        graph = nx.MultiDiGraph()
+        graph.add_edge("start", "a", key=-1)
+        graph.add_edge("a", "b", key=0)
+        graph.add_edge("b", "a", key=1)
+        graph.add_edge("b", "b", key=2)
+        compute_levels(graph)
+        check.equal(dict(graph.nodes(data="level")), {"start": 0, "a": 1, "b": 2})
+
+    def test_unreachable_node_raises(self):
+        graph = nx.MultiDiGraph()
+        graph.add_edge("start", "a", key=-1)
+        graph.add_edge("b", "c", key=0)
+        graph.add_edge("c", "b", key=1)
+        with pytest.raises(ValueError):
+            compute_levels(graph)
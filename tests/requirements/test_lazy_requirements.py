@@ -0,0 +1,25 @@
+import pytest_check as check
+
+from hcraft.examples import TowerHcraftEnv
+from hcraft.requirements import Requirements
+
+
+def test_levels_without_graph():
+    env = TowerHcraftEnv(height=2, width=3)
+    requirements = Requirements(env.world)
+    levels = requirements.levels
+    check.is_none(requirements._graph)
+    check.equal(requirements.depth, max(levels.values()))
+
+    graph_levels = dict(requirements.graph.nodes(data="level"))
+    check.equal(graph_levels, levels)
+    check.equal(requirements.graph.graph["depth"], requirements.depth)
+    check.equal(requirements.graph.graph["width"], requirements.width)
+
+
+def test_graphs_are_cached():
+    env = TowerHcraftEnv(height=2, width=3)
+    requirements = env.world.requirements
+    check.is_true(requirements.graph is requirements.graph)
+    check.is_true(requirements.digraph is requirements.digraph)
+    check.is_true(requirements.acydigraph is requirements.acydigraph)
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest_check as check
+from pytest_mock import MockerFixture
+
+from hcraft.requirements import _create_text_image, _get_text_image_uri
+from hcraft.world import _default_resources_path
+
+
+def test_text_images_are_memoized(tmp_path: Path, mocker: MockerFixture):
+    font_path = _default_resources_path() / "font.ttf"
+    image = _create_text_image("+1", font_path=font_path)
+    check.is_true(_create_text_image("+1", font_path=font_path) is image)
+
+    create_text_image = mocker.patch(
+        "hcraft.requirements._create_text_image", return_value=image
+    )
+    uri = _get_text_image_uri("+2", tmp_path)
+    check.equal(_get_text_image_uri("+2", tmp_path), uri)
+    check.equal(create_text_image.call_count, 1)
+    check.is_true((tmp_path / "text_images" / "+2.png").exists())
+
+
+def test_deleted_text_images_are_written_again(tmp_path: Path, mocker: MockerFixture):
+    font_path = _default_resources_path() / "font.ttf"
+    mocker.patch(
+        "hcraft.requirements._create_text_image",
+        return_value=_create_text_image("-3", font_path=font_path),
+    )
+    image_path = tmp_path / "text_images" / "-3_flipped.png"
+    uri = _get_text_image_uri("-3", tmp_path, flipped=True)
+    check.equal(uri, image_path.as_uri())
+    image_path.unlink()
+    check.equal(_get_text_image_uri("-3", tmp_path, flipped=True), uri)
+    check.is_true(image_path.exists())
@@ -4,6 +4,7 @@ import pytest_check as check
 from hcraft.cli import hcraft_cli
 from hcraft.examples import (
     MineHcraftEnv,
+    ProceduralHcraftEnv,
     RandomHcraftEnv,
     LightRecursiveHcraftEnv,
     RecursiveHcraftEnv,
@@ -13,7 +14,14 @@ from hcraft.examples import (
 pygame = pytest.importorskip("pygame")
 
 
-ENV_NAMES = ("minecraft", "tower", "recursive", "light-recursive", "random")
+ENV_NAMES = (
+    "minecraft",
+    "tower",
+    "recursive",
+    "light-recursive",
+    "random",
+    "procedural",
+)
 
 
 def test_purposeless_minehcraft_cli():
@@ -81,3 +89,20 @@ def test_random_cli():
     )
     check.is_instance(env, RandomHcraftEnv)
     check.equal(env.n_items, 14)
+
+
+def test_procedural_cli():
+    env = hcraft_cli(
+        [
+            "procedural",
+            *("--n-items", "20"),
+            *("--n-zones", "2"),
+            *("--n-zones-items", "1"),
+            *("--depth", "4"),
+            *("--seed", "42"),
+        ]
+    )
+    check.is_instance(env, ProceduralHcraftEnv)
+    check.equal(env.world.n_items, 20)
+    check.equal(env.world.n_zones, 2)
+    check.equal(env.world.n_zones_items, 1)
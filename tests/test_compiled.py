@@ -0,0 +1,54 @@
+from typing import Type
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.env import HcraftEnv
+from hcraft.examples import EXAMPLE_ENVS
+from tests.custom_checks import check_np_equal
+
+
+@pytest.mark.parametrize("env_class", EXAMPLE_ENVS)
+def test_compiled_world_follows_transformations(env_class: Type[HcraftEnv]):
+    env = env_class()
+    compiled = env.world.compiled
+    np.random.seed(42)
+    env.reset()
+    states, actions = [], []
+    for _ in range(50):
+        state = compiled.state_from(env.state)
+        expected = [t.is_valid(env.state) for t in env.world.transformations]
+        check.is_true(np.array_equal(compiled.valid_mask(state), expected))
+        action = np.random.choice(np.flatnonzero(expected))
+        _, _, terminated, _, _ = env.step(action)
+        check_np_equal(compiled.apply(state, action), compiled.state_from(env.state))
+        states.append(state)
+        actions.append(action)
+        if terminated:
+            env.reset()
+
+    states = np.array(states)
+    check.is_true(
+        np.array_equal(
+            compiled.valid_mask(states),
+            [compiled.valid_mask(state) for state in states],
+        )
+    )
+    check_np_equal(
+        compiled.apply(states, np.array(actions)),
+        np.array([compiled.apply(s, a) for s, a in zip(states, actions)]),
+    )
+
+
+@pytest.mark.parametrize("env_class", EXAMPLE_ENVS)
+def test_compiled_world_to_world(env_class: Type[HcraftEnv]):
+    world = env_class().world
+    compiled = world.compiled
+    rebuilt = compiled.to_world(world.items, world.zones, world.zones_items).compiled
+    for rows_name in ("min_conditions", "max_conditions", "changes", "current_changes"):
+        rows, rebuilt_rows = getattr(compiled, rows_name), getattr(rebuilt, rows_name)
+        check_np_equal(rows.indptr, rebuilt_rows.indptr)
+        check_np_equal(rows.indices, rebuilt_rows.indices)
+        check_np_equal(rows.values, rebuilt_rows.values)
+    check_np_equal(compiled.initial_state, rebuilt.initial_state)
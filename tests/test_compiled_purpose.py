@@ -0,0 +1,184 @@
+from typing import Type
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.env import HcraftEnv
+from hcraft.examples import EXAMPLE_ENVS
+from hcraft.purpose import Purpose, platinium_purpose
+from hcraft.elements import Item, Zone
+from hcraft.task import GetItemTask, LinearConstraint, LinearConstraintsTask, Term
+from tests.envs import classic_env
+
+
+def _platinium_env(env_class: Type[HcraftEnv]) -> HcraftEnv:
+    world = env_class().world
+    purpose = platinium_purpose(world.items, world.zones, world.zones_items)
+    return HcraftEnv(world, purpose=purpose, max_step=50)
+
+
+@pytest.mark.parametrize(
+    "env_class", EXAMPLE_ENVS, ids=[env_class.__name__ for env_class in EXAMPLE_ENVS]
+)
+def test_compiled_tasks_match_tasks(env_class: Type[HcraftEnv]):
+    env = _platinium_env(env_class)
+    rng = np.random.default_rng(0)
+    env.reset()
+    compiled = env.purpose.compiled
+    check.is_true(np.all(compiled.compiled_tasks))
+
+    states = []
+    for _ in range(50):
+        action = rng.choice(np.flatnonzero(env.action_masks()))
+        env.step(action)
+        state = compiled.state_from(env.state)
+        expected = [bool(task._is_terminal(env.state)) for task in env.purpose.tasks]
+        check.equal(compiled.tasks_done(state).tolist(), expected)
+        states.append(state)
+
+    batch_done = compiled.tasks_done(np.stack(states))
+    check.is_true(
+        np.array_equal(batch_done[-1], compiled.tasks_done(states[-1])),
+    )
+
+
+def test_uncompiled_tasks_fallback():
+    class SubclassedGetItemTask(GetItemTask):
+        pass
+
+    _, world, named_transformations, _, _, _, _ = classic_env()
+    wood = Item("wood")
+    custom_task = SubclassedGetItemTask(wood, reward=5)
+    purpose = Purpose(custom_task)
+    env = HcraftEnv(world, purpose=purpose)
+    env.reset()
+    check.is_false(purpose.compiled.compiled_tasks[0])
+
+    search_wood = env.world.transformations.index(named_transformations["search_wood"])
+    _, reward, terminated, _, _ = env.step(search_wood)
+    check.equal(reward, 5)
+    check.is_true(terminated)
+    check.is_true(custom_task.terminated)
+
+
+@pytest.mark.parametrize(
+    "env_class", EXAMPLE_ENVS, ids=[env_class.__name__ for env_class in EXAMPLE_ENVS]
+)
+def test_change_driven_evaluation(env_class: Type[HcraftEnv]):
+    env = _platinium_env(env_class)
+    rng = np.random.default_rng(1)
+    env.reset()
+    purpose = env.purpose
+    achieved = np.zeros(len(purpose.tasks), dtype=bool)
+    for _ in range(50):
+        action = rng.choice(np.flatnonzero(env.action_masks()))
+        env.step(action)
+        achieved |= [task._is_terminal(env.state) for task in purpose.tasks]
+        terminated = [task.terminated for task in purpose.tasks]
+        check.equal(terminated, achieved.tolist())
+
+
+def test_hand_modified_state_is_evaluated():
+    env, world, _, _, _, _, _ = classic_env()
+    wood = Item("wood")
+    get_wood = GetItemTask(wood, reward=3)
+    env.purpose = Purpose(get_wood)
+    env.reset()
+    check.is_false(env.purpose.is_terminal(env.state))
+
+    env.state.player_inventory[world.slot_from_item(wood)] = 1
+    check.equal(env.purpose.reward(env.state), 3)
+    check.is_true(env.purpose.is_terminal(env.state))
+
+
+def test_evaluate_batch_matches_envs():
+    n_envs = 4
+    envs = [_platinium_env(EXAMPLE_ENVS[0]) for _ in range(n_envs)]
+    rng = np.random.default_rng(2)
+    for env in envs:
+        env.reset()
+    compiled = envs[0].purpose.compiled
+    tasks_terminated = np.zeros((n_envs, compiled.n_tasks), dtype=bool)
+
+    for _ in range(30):
+        expected_rewards, expected_terminated = [], []
+        for env in envs:
+            action = rng.choice(np.flatnonzero(env.action_masks()))
+            _, reward, terminated, _, _ = env.step(action)
+            expected_rewards.append(reward)
+            expected_terminated.append(terminated)
+        states = compiled.states_from_arrays(
+            np.stack([env.state.player_inventory for env in envs]),
+            np.stack([env.state.position for env in envs]),
+            np.stack([env.state.zones_inventories for env in envs]),
+        )
+        rewards, terminated, tasks_terminated = compiled.evaluate_batch(
+            states, tasks_terminated
+        )
+        check.is_true(np.allclose(rewards, expected_rewards))
+        check.equal(terminated.tolist(), expected_terminated)
+        for env, env_tasks_terminated in zip(envs, tasks_terminated):
+            terminated_tasks = [task.terminated for task in env.purpose.tasks]
+            check.equal(env_tasks_terminated.tolist(), terminated_tasks)
+
+
+def test_evaluate_batch_needs_compiled_tasks():
+    class SubclassedGetItemTask(GetItemTask):
+        pass
+
+    _, world, _, _, _, _, _ = classic_env()
+    env = HcraftEnv(world, purpose=SubclassedGetItemTask(Item("wood")))
+    env.reset()
+    compiled = env.purpose.compiled
+    states = compiled.state_from(env.state)[np.newaxis]
+    with pytest.raises(ValueError):
+        compiled.evaluate_batch(states, np.zeros((1, 1), dtype=bool))
+
+
+def test_linear_constraints_tasks_are_compiled():
+    _, world, _, _, _, _, _ = classic_env()
+    wood, plank, table = Item("wood"), Item("plank"), Item("table")
+    start, other_zone = Zone("start"), Zone("other_zone")
+    tasks = [
+        LinearConstraintsTask(
+            "More planks than wood",
+            [LinearConstraint([Term(1, plank), Term(-2, wood)], threshold=4)],
+        ),
+        LinearConstraintsTask(
+            "Table at start or in other zone",
+            [
+                LinearConstraint([Term(1, table, start)], threshold=1),
+                LinearConstraint([Term(1, zone=other_zone)], threshold=1),
+            ],
+            any_constraint=True,
+        ),
+        LinearConstraintsTask(
+            "Little wood with a table",
+            [
+                LinearConstraint([Term(1, wood)], threshold=1, at_most=True),
+                LinearConstraint(
+                    [Term(1, table, start), Term(1, table, other_zone)], threshold=1
+                ),
+            ],
+        ),
+    ]
+    purpose = Purpose()
+    for task in tasks:
+        purpose.add_task(task, terminal_groups=None)
+    env = HcraftEnv(world, purpose=purpose)
+    env.reset()
+    compiled = purpose.compiled
+    check.is_true(np.all(compiled.compiled_tasks))
+
+    rng = np.random.default_rng(3)
+    achieved = np.zeros(len(tasks), dtype=bool)
+    for _ in range(100):
+        action = rng.choice(np.flatnonzero(env.action_masks()))
+        env.step(action)
+        expected = [bool(task._is_terminal(env.state)) for task in tasks]
+        state = compiled.state_from(env.state)
+        check.equal(compiled.tasks_done(state).tolist(), expected)
+        achieved |= expected
+        check.equal([task.terminated for task in tasks], achieved.tolist())
+    check.is_true(np.any(achieved))
@@ -0,0 +1,159 @@
+import csv
+import json
+import threading
+from pathlib import Path
+
+import pytest
+import pytest_check as check
+
+from hcraft.elements import Item
+from hcraft.env import HcraftEnv
+from hcraft.episode_metrics import (
+    CSVMetricsSink,
+    EpisodeSummary,
+    JSONLinesMetricsSink,
+    MetricsSink,
+    ParquetMetricsSink,
+)
+from hcraft.purpose import GetItemTask, PlaceItemTask, Purpose
+from tests.envs import classic_env
+
+
+def _run_episodes(sink: MetricsSink) -> HcraftEnv:
+    _, world, named_transformations, _, _, _, _ = classic_env()
+    purpose = Purpose()
+    purpose.add_task(GetItemTask(Item("wood")), terminal_groups=None)
+    purpose.add_task(PlaceItemTask(Item("table"), reward=10), terminal_groups="table")
+    env = HcraftEnv(world, purpose=purpose, max_step=3, metrics_sink=sink)
+    actions_per_episodes = [
+        ["search_wood", "craft_plank", "craft_table"],
+        ["search_stone", "search_stone", "search_stone"],
+        ["search_stone", "search_wood"],
+    ]
+    for actions in actions_per_episodes:
+        env.reset()
+        for action in actions:
+            transfo = named_transformations[action]
+            env.step(env.world.transformations.index(transfo))
+    env.close()
+    return env
+
+
+def _expected_rows(env: HcraftEnv):
+    wood_task, table_task = env.purpose.tasks
+    return [
+        {
+            "episode": 1,
+            "length": 3,
+            "terminated": True,
+            "truncated": True,
+            "terminal_group": "table",
+            f"{wood_task.name} completion step": 1,
+            f"{table_task.name} completion step": 3,
+        },
+        {
+            "episode": 2,
+            "length": 3,
+            "terminated": False,
+            "truncated": True,
+            "terminal_group": None,
+            f"{wood_task.name} completion step": None,
+            f"{table_task.name} completion step": None,
+        },
+        {
+            "episode": 3,
+            "length": 2,
+            "terminated": False,
+            "truncated": False,
+            "terminal_group": None,
+            f"{wood_task.name} completion step": 2,
+            f"{table_task.name} completion step": None,
+        },
+    ]
+
+
+def test_jsonl_sink(tmp_path: Path):
+    path = tmp_path / "episodes.jsonl"
+    with JSONLinesMetricsSink(path, batch_size=2) as sink:
+        env = _run_episodes(sink)
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    check.equal(len(rows), 3)
+    for row, expected_row in zip(rows, _expected_rows(env)):
+        for column, value in expected_row.items():
+            check.equal(row[column], value, msg=f"{column}")
+
+
+def test_csv_sink(tmp_path: Path):
+    path = tmp_path / "episodes.csv"
+    with CSVMetricsSink(path) as sink:
+        env = _run_episodes(sink)
+    with open(path, newline="") as csv_file:
+        rows = list(csv.DictReader(csv_file))
+    check.equal(len(rows), 3)
+    for row, expected_row in zip(rows, _expected_rows(env)):
+        for column, value in expected_row.items():
+            expected_str = "" if value is None else str(value)
+            check.equal(row[column], expected_str, msg=f"{column}")
+
+
+def test_parquet_sink(tmp_path: Path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "episodes.parquet"
+    with ParquetMetricsSink(path, batch_size=2) as sink:
+        env = _run_episodes(sink)
+    rows = pq.read_table(path).to_pylist()
+    check.equal(len(rows), 3)
+    for row, expected_row in zip(rows, _expected_rows(env)):
+        for column, value in expected_row.items():
+            check.equal(row[column], value, msg=f"{column}")
+
+
+def test_flush_writes_queued_summaries(tmp_path: Path):
+    path = tmp_path / "episodes.jsonl"
+    sink = JSONLinesMetricsSink(path, batch_size=100, flush_interval=60)
+    for episode in range(1, 4):
+        sink.write(EpisodeSummary(episode=episode, score=1.0, length=2))
+    sink.flush()
+    check.equal(len(path.read_text().splitlines()), 3)
+    sink.close()
+    with pytest.raises(ValueError):
+        sink.write(EpisodeSummary(episode=4, score=1.0, length=2))
+
+
+def test_background_errors_are_raised(tmp_path: Path):
+    class FailingSink(MetricsSink):
+        def _open_file(self):
+            pass
+
+        def _write_batch(self, rows):
+            raise OSError("Disk full")
+
+        def _close_file(self):
+            pass
+
+    sink = FailingSink(tmp_path / "episodes.txt")
+    sink.write(EpisodeSummary(episode=1, score=1.0, length=2))
+    with pytest.raises(RuntimeError):
+        sink.flush()
+
+
+def test_failing_open_starts_no_thread(tmp_path: Path):
+    n_threads = threading.active_count()
+    with pytest.raises(OSError):
+        JSONLinesMetricsSink(tmp_path)
+    check.equal(threading.active_count(), n_threads)
+
+
+def test_steps_after_termination_are_summarized_once(tmp_path: Path):
+    path = tmp_path / "episodes.jsonl"
+    _, world, named_transformations, _, _, _, _ = classic_env()
+    with JSONLinesMetricsSink(path) as sink:
+        env = HcraftEnv(world, purpose=GetItemTask(Item("wood")), metrics_sink=sink)
+        env.reset()
+        search_wood = env.world.transformations.index(
+            named_transformations["search_wood"]
+        )
+        for _ in range(3):
+            env.step(search_wood)
+        env.close()
+    check.equal(len(path.read_text().splitlines()), 1)
@@ -8,6 +8,7 @@ from hcraft.env import HcraftEnv
 from hcraft.examples import HCRAFT_GYM_ENVS
 from hcraft.examples.light_recursive import LightRecursiveHcraftEnv
 from hcraft.examples.minecraft.env import MineHcraftEnv
+from hcraft.examples.procedural import ProceduralHcraftEnv
 from hcraft.examples.random_simple.env import RandomHcraftEnv
 from hcraft.examples.recursive import RecursiveHcraftEnv
 from hcraft.examples.tower import TowerHcraftEnv
@@ -47,6 +48,19 @@ def test_gym_make_RandomHcraftEnv():
     check.equal(env.seed, 42)
 
 
+def test_gym_make_ProceduralHcraftEnv():
+    env = _given_env_from_gym_make(
+        ProceduralHcraftEnv,
+        "ProceduralHcraft-v1",
+        n_items=20,
+        n_zones=2,
+        depth=3,
+        seed=42,
+    )
+    check.equal(env.world.n_items, 20)
+    check.equal(env.name, "ProceduralHcraft-I20-Z2-ZI3-D3-S42")
+
+
 def test_gym_make_light_recursive():
     n_items = 10
     n_required_previous = 3
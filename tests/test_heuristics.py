@@ -0,0 +1,79 @@
+from typing import Type
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.env import HcraftEnv
+from hcraft.examples import EXAMPLE_ENVS
+from hcraft.examples.minecraft import MineHcraftEnv
+from hcraft.heuristics import RelaxedHeuristics
+from hcraft.planning import search_plan
+from hcraft.reachability import analyze_reachability
+
+SEARCHABLE_ENVS = [env for env in EXAMPLE_ENVS if env != MineHcraftEnv]
+
+
+@pytest.mark.parametrize("env_class", EXAMPLE_ENVS)
+def test_initial_hmax_costs_are_reachability_levels(env_class: Type[HcraftEnv]):
+    env = env_class()
+    heuristics = RelaxedHeuristics(env.world.compiled)
+    reachability = analyze_reachability(env.world)
+    check.is_true(np.array_equal(heuristics.initial_costs(), reachability.slots_level))
+    check.is_true(
+        np.all(heuristics.initial_costs("hadd") >= heuristics.initial_costs("hmax"))
+    )
+    check.equal(heuristics.items_costs().shape, (env.world.n_items,))
+    check.equal(
+        heuristics.zones_items_costs().shape,
+        (env.world.n_zones, env.world.n_zones_items),
+    )
+
+
+def _goal_search(env: HcraftEnv, **kwargs):
+    env.reset()
+    purpose, compiled = env.purpose, env.world.compiled
+    goal_tasks = [
+        purpose.tasks.index(task) for task in purpose.best_terminal_group.tasks
+    ]
+    state = compiled.state_from(env.state)
+    return search_plan(compiled, purpose.compiled, state, goal_tasks, **kwargs)
+
+
+@pytest.mark.parametrize("env_class", SEARCHABLE_ENVS)
+def test_hmax_is_admissible(env_class: Type[HcraftEnv]):
+    env = env_class()
+    result = _goal_search(env, algorithm="bfs")
+    heuristics = RelaxedHeuristics(env.world.compiled)
+    purpose = env.purpose
+    goal_tasks = [
+        purpose.tasks.index(task) for task in purpose.best_terminal_group.tasks
+    ]
+    hmax = heuristics.heuristic(purpose.compiled, goal_tasks, "hmax")
+
+    states = [env.world.compiled.state_from(env.state)]
+    for action in result.plan:
+        states.append(env.world.compiled.apply(states[-1], action))
+    states = np.stack(states)
+    achieved = np.logical_or.accumulate(
+        purpose.compiled.tasks_done(states)[:, goal_tasks], axis=0
+    )
+    remaining_steps = len(result.plan) - np.arange(states.shape[0])
+    check.is_true(np.all(hmax(states, achieved) <= remaining_steps))
+
+    astar_result = _goal_search(env, algorithm="astar", heuristic=hmax)
+    check.equal(len(astar_result.plan), len(result.plan))
+    check.less_equal(astar_result.expanded, result.expanded)
+
+
+@pytest.mark.parametrize("env_class", SEARCHABLE_ENVS)
+def test_solve_with_hadd(env_class: Type[HcraftEnv]):
+    env = env_class(max_step=200)
+    problem = env.native_planning_problem(algorithm="gbfs", heuristic="hadd")
+    done = False
+    env.reset()
+    while not done:
+        action = problem.action_from_plan(env.state)
+        _observation, _reward, terminated, truncated, _info = env.step(action)
+        done = terminated or truncated
+    check.is_true(env.purpose.terminated)
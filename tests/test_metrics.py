@@ -3,6 +3,7 @@ import pytest_check as check
 
 from hcraft.elements import Item
 from hcraft.env import HcraftEnv
+from hcraft.metrics import SuccessCounter
 from hcraft.purpose import GetItemTask, PlaceItemTask, Purpose
 from tests.envs import classic_env
 
@@ -184,3 +185,39 @@ class TestMetricsMultiPurpose:
                         msg=f"cumulated_score={self.env.cumulated_score}"
                         f"episode={self.env.episodes}",
                     )
+
+
+class TestSuccessCounter:
+    def test_rates_over_window(self):
+        tasks = [GetItemTask(Item("wood")), GetItemTask(Item("stone"))]
+        counter = SuccessCounter(tasks, window=3)
+        wood_successes = [True, False, True, True, False]
+        for episode, wood_success in enumerate(wood_successes, start=1):
+            counter.new_episode(episode)
+            for task in tasks:
+                task.reset()
+            counter.step_reset()
+            tasks[0].terminated = wood_success
+            counter.update(episode)
+            last_successes = wood_successes[max(0, episode - 3) : episode]
+            check.almost_equal(
+                counter.rates_infos[f"{tasks[0].name} success rate"],
+                sum(last_successes) / len(last_successes),
+                msg=f"episode={episode}",
+            )
+            check.equal(counter.rates_infos[f"{tasks[1].name} success rate"], 0.0)
+            check.equal(counter.done_infos[f"{tasks[0].name} is done"], wood_success)
+
+    def test_success_counted_once_per_episode(self):
+        task = GetItemTask(Item("wood"))
+        counter = SuccessCounter([task], window=2)
+        counter.new_episode(1)
+        for terminated in (True, False, True):
+            counter.step_reset()
+            task.terminated = terminated
+            counter.update(1)
+        check.equal(counter.rates.tolist(), [1.0])
+
+    def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            SuccessCounter([], window=0)
@@ -0,0 +1,183 @@
+import io
+from pathlib import Path
+from typing import Type
+
+import pytest
+import pytest_check as check
+
+from hcraft.elements import Item, Zone
+from hcraft.env import HcraftEnv
+from hcraft.examples.minicraft import MiniHCraftDoorKey, MiniHCraftUnlock
+from hcraft.examples.tower import TowerHcraftEnv
+from hcraft.pddl import PDDLExporter
+from hcraft.task import (
+    GetItemTask,
+    LinearConstraint,
+    LinearConstraintsTask,
+    PlaceItemTask,
+    Term,
+)
+from tests.envs import classic_env
+
+
+class TestPDDLExporter:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        _, self.world, self.named_transformations, _, _, _, _ = classic_env()
+        self.env = HcraftEnv(self.world, purpose=GetItemTask(Item("plank")))
+        self.env.reset()
+        self.exporter = PDDLExporter(self.world, name="classic")
+
+    def _domain(self) -> str:
+        domain = io.StringIO()
+        self.exporter.write_domain(domain)
+        return domain.getvalue()
+
+    def _problem(self, state, purpose) -> str:
+        problem = io.StringIO()
+        self.exporter.write_problem(problem, state, purpose)
+        return problem.getvalue()
+
+    def test_names_are_valid_pddl(self):
+        check.equal(self.exporter.zones_names, ["start_", "other_zone"])
+        check.equal(
+            self.exporter.zones_items_names, ["table_in_zone", "wood_house_in_zone"]
+        )
+        check.equal(self.exporter.actions_names[0], "a_0_move_to_other_zone")
+
+    def test_domain_has_an_action_per_transformation(self):
+        domain = self._domain()
+        check.equal(domain.count("(:action "), len(self.world.transformations))
+        check.is_in(":negative-preconditions", domain)
+
+    def test_actions_follow_transformations(self):
+        domain = self._domain()
+        check.is_in(
+            " (:action a_0_move_to_other_zone\n"
+            "  :parameters (?loc - zone)\n"
+            "  :precondition (and (pos ?loc) (pos start_) (not (pos other_zone)))\n"
+            "  :effect (and (not (pos ?loc)) (pos other_zone) (visited other_zone)))\n",
+            domain,
+        )
+        check.is_in(
+            "  :effect (and (decrease (amount plank) 4)"
+            " (increase (amount_at table_in_zone ?loc) 1)))\n",
+            domain,
+        )
+
+    def test_disjunctive_goals_require_disjunctive_preconditions(self):
+        requirement = "(:requirements :disjunctive-preconditions)"
+        check.is_not_in("disjunctive", self._domain())
+        check.is_not_in(requirement, self._problem(self.env.state, self.env.purpose))
+        table_anywhere = self._problem(self.env.state, PlaceItemTask(Item("table")))
+        check.is_in(f"classic-domain)\n {requirement}\n (:init\n", table_anywhere)
+        check.is_in("(:goal (and (or ", table_anywhere)
+
+    def test_problem_init_and_goal(self):
+        problem = self._problem(self.env.state, self.env.purpose)
+        check.is_in("  (pos start_)\n  (visited start_)\n", problem)
+        check.is_in("  (= (amount wood) 0)\n", problem)
+        check.is_in("  (= (amount_at table_in_zone other_zone) 0)\n", problem)
+        check.is_in(" (:goal (and (>= (amount plank) 1)))\n", problem)
+
+    def test_flat_states_only_visit_their_position(self):
+        self.env.step(
+            self.world.transformations.index(
+                self.named_transformations["move_to_other_zone"]
+            )
+        )
+        flat_state = self.world.compiled.state_from(self.env.state)
+        problem = self._problem(flat_state, None)
+        check.is_not_in("(visited start_)", problem)
+        check.is_in("(visited other_zone)", problem)
+        check.is_in("(visited start_)", self._problem(self.env.state, None))
+
+    def test_linear_constraints_goal(self):
+        more_planks = LinearConstraint(
+            [Term(2, Item("plank")), Term(-1, Item("wood"))], threshold=3
+        )
+        in_other_zone = LinearConstraint([Term(1, zone=Zone("other_zone"))], 1)
+        task = LinearConstraintsTask("task", [more_planks, in_other_zone])
+        problem = self._problem(self.env.state, task)
+        check.is_in(
+            "(:goal (and (>= (+ (* (- 1) (amount wood)) (* 2 (amount plank))) 3)"
+            " (visited other_zone)))",
+            problem,
+        )
+
+    def test_uncompiled_tasks_raise(self):
+        class CustomTask(GetItemTask):
+            pass
+
+        with pytest.raises(NotImplementedError, match="not compiled"):
+            self._problem(self.env.state, CustomTask(Item("plank")))
+
+    def test_export_batch(self, tmp_path: Path):
+        compiled = self.world.compiled
+        instances = [
+            (f"instance_{quantity}", compiled.initial_state, GetItemTask(item))
+            for quantity, item in enumerate((Item("wood"), Item("stone")))
+        ]
+        problems_paths = self.exporter.export_batch(tmp_path, instances)
+
+        check.equal(
+            problems_paths, [tmp_path / "instance_0.pddl", tmp_path / "instance_1.pddl"]
+        )
+        check.equal(
+            sorted(path.name for path in tmp_path.iterdir()),
+            ["domain.pddl", "instance_0.pddl", "instance_1.pddl"],
+        )
+        check.is_in("(>= (amount stone) 1)", problems_paths[1].read_text())
+
+    def test_transformation_id(self):
+        check.equal(self.exporter.transformation_id("a_3_craft_plank"), 3)
+        check.equal(self.exporter.transformation_id("(a_12_search_wood start_)"), 12)
+        check.equal(self.exporter.transformation_id("a_1_search_wood(start_)"), 1)
+
+
+@pytest.mark.parametrize(
+    "env_class", [MiniHCraftUnlock, MiniHCraftDoorKey, TowerHcraftEnv]
+)
+def test_exported_problems_are_solved(env_class: Type[HcraftEnv], tmp_path: Path):
+    ups = pytest.importorskip("unified_planning.shortcuts")
+    pytest.importorskip("up_enhsp")
+    from unified_planning.io import PDDLReader
+
+    env = env_class(max_step=200)
+    env.reset()
+    exporter = PDDLExporter(env.world, name=env.name)
+    exporter.write_domain(tmp_path / "domain.pddl")
+    exporter.write_problem(tmp_path / "problem.pddl", env.state, env.purpose)
+
+    problem = PDDLReader().parse_problem(
+        str(tmp_path / "domain.pddl"), str(tmp_path / "problem.pddl")
+    )
+    with ups.OneshotPlanner(name="enhsp") as planner:
+        results = planner.solve(problem, timeout=20)
+    check.is_not_none(results.plan)
+    for action in results.plan.actions:
+        env.step(exporter.transformation_id(str(action)))
+    check.is_true(env.purpose.terminated)
+
+
+def test_disjunctive_problems_are_solved(tmp_path: Path):
+    ups = pytest.importorskip("unified_planning.shortcuts")
+    pytest.importorskip("up_enhsp")
+    from unified_planning.io import PDDLReader
+
+    _, world, _, _, _, _, _ = classic_env()
+    env = HcraftEnv(world, purpose=PlaceItemTask(Item("table")), max_step=50)
+    env.reset()
+    exporter = PDDLExporter(world, name="classic")
+    exporter.write_domain(tmp_path / "domain.pddl")
+    exporter.write_problem(tmp_path / "problem.pddl", env.state, env.purpose)
+
+    problem = PDDLReader().parse_problem(
+        str(tmp_path / "domain.pddl"), str(tmp_path / "problem.pddl")
+    )
+    with ups.OneshotPlanner(name="enhsp") as planner:
+        results = planner.solve(problem, timeout=20)
+    check.is_not_none(results.plan)
+    for action in results.plan.actions:
+        env.step(exporter.transformation_id(str(action)))
+    check.is_true(env.purpose.terminated)
@@ -0,0 +1,100 @@
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+import pytest_check as check
+
+from hcraft.plan_cache import PlanCache
+from tests.envs import classic_env, player_only_env
+
+GOAL = "table in start"
+
+
+class TestPlanCache:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.env, self.world, named_transformations, _, _, _, _ = classic_env()
+        self.plan = [
+            self.world.transformations.index(named_transformations[name])
+            for name in ("search_wood", "craft_plank", "craft_table")
+        ]
+        self.env.reset()
+
+    def test_miss_then_hit(self):
+        plan_cache = PlanCache(self.world)
+        check.is_none(plan_cache.get(self.env.state, GOAL))
+        plan_cache.add(self.env.state, GOAL, self.plan)
+        check.equal(plan_cache.get(self.env.state, GOAL), self.plan)
+        check.equal((plan_cache.hits, plan_cache.misses), (1, 1))
+
+    def test_goal_is_part_of_the_key(self):
+        plan_cache = PlanCache(self.world)
+        plan_cache.add(self.env.state, GOAL, self.plan)
+        check.is_none(plan_cache.get(self.env.state, "other goal"))
+
+    def test_suffix_of_visited_states(self):
+        plan_cache = PlanCache(self.world)
+        plan_cache.add(self.env.state, GOAL, self.plan)
+        for step, action in enumerate(self.plan):
+            self.env.step(action)
+            check.equal(plan_cache.get(self.env.state, GOAL), self.plan[step + 1 :])
+
+    def test_other_states_are_missed(self):
+        plan_cache = PlanCache(self.world)
+        plan_cache.add(self.env.state, GOAL, self.plan)
+        self.env.step(self.plan[0])
+        self.env.step(self.plan[0])
+        check.is_none(plan_cache.get(self.env.state, GOAL))
+
+    def test_least_recently_used_plans_are_dropped(self):
+        plan_cache = PlanCache(self.world, max_size=2)
+        plan_cache.add(self.env.state, "first", self.plan)
+        plan_cache.add(self.env.state, "second", self.plan)
+        plan_cache.get(self.env.state, "first")
+        plan_cache.add(self.env.state, "third", self.plan)
+
+        check.equal(len(plan_cache), 2)
+        check.is_none(plan_cache.get(self.env.state, "second"))
+        check.equal(plan_cache.get(self.env.state, "first"), self.plan)
+        self.env.step(self.plan[0])
+        check.equal(plan_cache.get(self.env.state, "third"), self.plan[1:])
+
+    def test_save_and_load(self, tmp_path: Path):
+        path = tmp_path / "plans.json"
+        plan_cache = PlanCache(self.world, path=path)
+        plan_cache.add(self.env.state, GOAL, self.plan)
+        plan_cache.save()
+
+        loaded_cache = PlanCache(self.world, path=path)
+        check.equal(len(loaded_cache), 1)
+        self.env.step(self.plan[0])
+        check.equal(loaded_cache.get(self.env.state, GOAL), self.plan[1:])
+
+    def test_load_from_other_world_is_ignored(self, tmp_path: Path):
+        path = tmp_path / "plans.json"
+        plan_cache = PlanCache(self.world, path=path)
+        plan_cache.add(self.env.state, GOAL, self.plan)
+        plan_cache.save()
+
+        _, other_world, _, _, _, _, _ = player_only_env()
+        with pytest.warns(UserWarning, match="another world"):
+            other_cache = PlanCache(other_world, path=path)
+        check.equal(len(other_cache), 0)
+
+    def test_load_with_other_elements_order_is_ignored(self, tmp_path: Path):
+        path = tmp_path / "plans.json"
+        plan_cache = PlanCache(self.world, path=path)
+        plan_cache.add(self.env.state, GOAL, self.plan)
+        plan_cache.save()
+
+        reversed_world = replace(
+            self.world,
+            items=self.world.items[::-1],
+            zones=self.world.zones[::-1],
+            zones_items=self.world.zones_items[::-1],
+            order_world=False,
+        )
+        check.equal(reversed_world.content_hash(), self.world.content_hash())
+        with pytest.warns(UserWarning, match="another world"):
+            reversed_cache = PlanCache(reversed_world, path=path)
+        check.equal(len(reversed_cache), 0)
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.elements import Item
+from hcraft.env import HcraftEnv
+from hcraft.plan_validation import NO_ACTION, validate_plan, validate_plans
+from hcraft.purpose import Purpose
+from hcraft.task import GetItemTask
+from tests.envs import classic_env
+
+
+class TestPlanValidation:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        _, self.world, named_transformations, _, _, _, _ = classic_env()
+        self.purpose = Purpose(
+            [GetItemTask(Item("wood"), reward=1), GetItemTask(Item("plank"), reward=2)]
+        )
+        self.env = HcraftEnv(self.world, purpose=self.purpose)
+        self.env.reset()
+        self.ids = {
+            name: self.world.transformations.index(transfo)
+            for name, transfo in named_transformations.items()
+        }
+
+    def _env_rollout(self, plan):
+        score = 0.0
+        for action in plan:
+            _observation, reward, _terminated, _truncated, _info = self.env.step(action)
+            score += reward
+        return score
+
+    def test_valid_plan_matches_env(self):
+        plan = [
+            self.ids["search_wood"],
+            self.ids["craft_plank"],
+            self.ids["craft_table"],
+        ]
+        validation = validate_plan(self.world, self.env.state, plan, self.purpose)
+        score = self._env_rollout(plan)
+
+        check.is_true(validation.valid)
+        check.is_none(validation.first_invalid_step)
+        check.equal(validation.reward, score)
+        check.is_true(validation.terminated)
+        check.is_true(
+            np.array_equal(
+                validation.final_state, self.world.compiled.state_from(self.env.state)
+            )
+        )
+
+    def test_stops_at_first_invalid_step(self):
+        plan = [
+            self.ids["search_wood"],
+            self.ids["craft_table"],
+            self.ids["craft_plank"],
+        ]
+        validation = validate_plan(self.world, self.env.state, plan, self.purpose)
+        self._env_rollout(plan[:1])
+
+        check.is_false(validation.valid)
+        check.equal(validation.first_invalid_step, 1)
+        check.equal(validation.reward, 1)
+        check.is_false(validation.terminated)
+        check.is_true(
+            np.array_equal(
+                validation.final_state, self.world.compiled.state_from(self.env.state)
+            )
+        )
+
+    def test_unknown_transformations_are_invalid(self):
+        validation = validate_plan(self.world, self.env.state, [len(self.ids)])
+        check.equal(validation.first_invalid_step, 0)
+
+    def test_batch_matches_single_plans(self):
+        plans = [
+            [self.ids["search_wood"], self.ids["craft_plank"]],
+            [self.ids["craft_plank"]],
+            [],
+            [self.ids["search_stone"]] * 3 + [self.ids["search_wood"]],
+        ]
+        validations = validate_plans(self.world, self.env.state, plans, self.purpose)
+
+        check.is_true(np.array_equal(validations.valid, [True, False, True, True]))
+        for index, plan in enumerate(plans):
+            validation = validate_plan(self.world, self.env.state, plan, self.purpose)
+            batch_validation = validations.plan(index)
+            check.equal(
+                batch_validation.first_invalid_step, validation.first_invalid_step
+            )
+            check.equal(batch_validation.reward, validation.reward)
+            check.equal(batch_validation.terminated, validation.terminated)
+            check.is_true(
+                np.array_equal(batch_validation.final_state, validation.final_state)
+            )
+
+    def test_padded_plans_array(self):
+        plans = np.array(
+            [
+                [self.ids["search_wood"], NO_ACTION, self.ids["craft_table"]],
+                [self.ids["search_wood"], self.ids["craft_plank"], NO_ACTION],
+            ]
+        )
+        validations = validate_plans(self.world, self.env.state, plans, self.purpose)
+        check.is_true(np.array_equal(validations.valid, [True, True]))
+        check.is_true(np.array_equal(validations.rewards, [1, 3]))
+
+    def test_terminated_tasks_give_no_reward_again(self):
+        self._env_rollout([self.ids["search_wood"]])
+        validation = validate_plan(
+            self.world, self.env.state, [self.ids["search_wood"]], self.purpose
+        )
+        check.equal(validation.reward, 0)
+
+    def test_uncompiled_tasks_raise(self):
+        class CustomTask(GetItemTask):
+            pass
+
+        with pytest.raises(ValueError, match="compiled"):
+            validate_plan(
+                self.world, self.env.state, [], Purpose(CustomTask(Item("wood")))
+            )
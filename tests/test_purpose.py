@@ -3,6 +3,9 @@ from typing import Any, List, Tuple
 
 import pytest
 import pytest_check as check
+from pytest_mock import MockerFixture
+
+import hcraft.purpose
 
 from hcraft.elements import Item, Stack, Zone
 from hcraft.env import HcraftEnv
@@ -356,6 +359,46 @@ class TestPurposeRewardShaping:
             purpose.tasks,
         )
 
+    def test_shared_shaping_subtasks_are_deduplicated(self):
+        purpose = Purpose()
+        purpose.add_task(self.get_item_2, reward_shaping=RewardShaping.ALL_ACHIVEMENTS)
+        purpose.add_task(self.go_to_4, reward_shaping=RewardShaping.ALL_ACHIVEMENTS)
+        purpose.build(self.env)
+        task_names = [task.name for task in purpose.optional_tasks]
+        check.equal(len(task_names), len(set(task_names)))
+        check.equal(
+            len(purpose.tasks),
+            2 + len(self.items) + len(self.zones) + len(self.zone_items),
+        )
+
+    def test_shaping_targets_are_shared_by_same_worlds(self, mocker: MockerFixture):
+        purpose = Purpose()
+        purpose.add_task(
+            self.get_item_2, reward_shaping=RewardShaping.REQUIREMENTS_ACHIVEMENTS
+        )
+        purpose.build(self.env)
+
+        other_world = world_from_transformations(
+            self.env.world.transformations,
+            start_zones_items={self.zones[4]: [Stack(self.items[2], 2)]},
+        )
+        required_targets = mocker.spy(hcraft.purpose, "_required_targets")
+        other_purpose = Purpose()
+        other_purpose.add_task(
+            GetItemTask(self.items[2], reward=10.0),
+            reward_shaping=RewardShaping.REQUIREMENTS_ACHIVEMENTS,
+        )
+        other_purpose.build(HcraftEnv(other_world))
+        check.equal(required_targets.call_count, 0)
+        check.equal(
+            [task.name for task in other_purpose.tasks],
+            [task.name for task in purpose.tasks],
+        )
+        check.is_false(
+            any(task in purpose.tasks for task in other_purpose.tasks),
+            "Subtasks objects should not be shared between purposes",
+        )
+
 
 def _check_get_item_tasks(items: List[Item], tasks: List[Task]):
     all_items_stacks = [Stack(item) for item in items]
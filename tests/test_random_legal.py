@@ -1,7 +1,11 @@
+from typing import Type
+
 import numpy as np
+import pytest
 import pytest_check as check
 
 from hcraft.env import HcraftEnv
+from hcraft.examples import EXAMPLE_ENVS
 from tests.envs import classic_env
 
 
@@ -24,3 +28,18 @@ def test_random_legal_agent():
         total_reward += reward
 
     check.greater_equal(total_reward, 0)
+
+
+@pytest.mark.parametrize("env_class", EXAMPLE_ENVS)
+def test_incremental_action_masks(env_class: Type[HcraftEnv]):
+    env = env_class()
+    np.random.seed(42)
+    observation, _info = env.reset()
+    for _ in range(100):
+        action_is_legal = env.action_masks()
+        expected = [t.is_valid(env.state) for t in env.world.transformations]
+        check.is_true(np.array_equal(action_is_legal, np.array(expected)))
+        action = random_legal_agent(observation, action_is_legal)
+        observation, _reward, terminated, _truncated, _info = env.step(action)
+        if terminated:
+            observation, _info = env.reset()
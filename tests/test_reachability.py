@@ -0,0 +1,172 @@
+from typing import Type
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.elements import Item, Stack, Zone
+from hcraft.env import HcraftEnv
+from hcraft.examples import EXAMPLE_ENVS
+from hcraft.examples.tower import TowerHcraftEnv
+from hcraft.purpose import Purpose
+from hcraft.reachability import analyze_reachability
+from hcraft.task import (
+    GetItemTask,
+    GoToZoneTask,
+    LinearConstraint,
+    LinearConstraintsTask,
+    PlaceItemTask,
+    Term,
+)
+from hcraft.transformation import CURRENT_ZONE, PLAYER, Transformation, Use, Yield
+from hcraft.world import world_from_transformations
+from tests.envs import classic_env
+
+
+@pytest.mark.parametrize("env_class", EXAMPLE_ENVS)
+def test_examples_are_reachable(env_class: Type[HcraftEnv]):
+    env = env_class()
+    reachability = analyze_reachability(env.world)
+    check.is_true(reachability.everything_reachable)
+    check.is_true(np.all(reachability.reachable_transformations))
+    for task, solvable in reachability.solvable_tasks(env.purpose).items():
+        check.is_true(solvable, msg=f"{task} should be solvable")
+
+
+def test_tower_lower_bound():
+    env = TowerHcraftEnv(height=3, width=2)
+    reachability = analyze_reachability(env.world)
+    check.equal(reachability.purpose_lower_bound(env.purpose), 4)
+
+
+class TestClassicEnvReachability:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        _env, world, named_transformations, start_zone, items, zones, zones_items = (
+            classic_env()
+        )
+        self.world = world
+        self.items = items
+        self.zones = zones
+        self.zones_items = zones_items
+        self.reachability = analyze_reachability(world)
+
+    def test_everything_reachable(self):
+        check.is_true(self.reachability.everything_reachable)
+
+    def test_lower_bounds(self):
+        _start, other_zone = self.zones
+        check.equal(self.reachability.task_lower_bound(GoToZoneTask(other_zone)), 1)
+        for item in self.items:
+            bound = self.reachability.task_lower_bound(GetItemTask(item))
+            check.greater(bound, 0)
+            check.less(bound, np.inf)
+        for zone_item in self.zones_items:
+            bound = self.reachability.task_lower_bound(PlaceItemTask(zone_item))
+            check.less(bound, np.inf)
+
+    def test_quantity_lower_bound(self):
+        item = self.items[0]
+        one_bound = self.reachability.task_lower_bound(GetItemTask(item))
+        many_bound = self.reachability.task_lower_bound(GetItemTask(Stack(item, 100)))
+        check.greater(many_bound, one_bound)
+
+    def test_linear_constraints_lower_bound(self):
+        wood, stone = self.items[0], self.items[1]
+        more_wood = LinearConstraint([Term(1, wood), Term(-1, stone)], threshold=1)
+        task = LinearConstraintsTask("more wood", [more_wood])
+        check.equal(
+            self.reachability.task_lower_bound(task),
+            self.reachability.task_lower_bound(GetItemTask(wood)),
+        )
+        check.equal(
+            self.reachability.purpose_lower_bound(Purpose(task)),
+            self.reachability.task_lower_bound(task),
+        )
+        negative_wood = LinearConstraint([Term(-1, wood)], threshold=1)
+        check.is_false(
+            self.reachability.is_solvable(
+                LinearConstraintsTask("negative wood", [negative_wood])
+            )
+        )
+
+    def test_uncompiled_tasks_are_not_bounded(self):
+        class CustomTask(GetItemTask):
+            pass
+
+        task = CustomTask(Stack(self.items[0], 1000))
+        check.equal(self.reachability.task_lower_bound(task), 0)
+        check.is_true(self.reachability.is_solvable(task))
+
+
+def test_unreachable_elements():
+    wood, plank, gold = Item("wood"), Item("plank"), Item("gold")
+    forest, cave = Zone("forest"), Zone("cave")
+    table = Item("table")
+    transformations = [
+        Transformation(inventory_changes=[Yield(PLAYER, wood)], zone=forest),
+        Transformation(
+            inventory_changes=[Use(PLAYER, wood, consume=1), Yield(PLAYER, plank)]
+        ),
+        Transformation(
+            inventory_changes=[Use(PLAYER, gold), Yield(CURRENT_ZONE, table)]
+        ),
+        Transformation(
+            inventory_changes=[Use(CURRENT_ZONE, table), Use(PLAYER, gold, consume=1)],
+            destination=cave,
+        ),
+    ]
+    world = world_from_transformations(transformations, start_zone=forest)
+    reachability = analyze_reachability(world)
+
+    check.is_false(reachability.everything_reachable)
+    reachable_items = dict(zip(world.items, reachability.reachable_items))
+    check.equal(reachable_items, {wood: True, plank: True, gold: False})
+    reachable_zones = dict(zip(world.zones, reachability.reachable_zones))
+    check.equal(reachable_zones, {forest: True, cave: False})
+
+    purpose = Purpose([GetItemTask(plank), PlaceItemTask(table)])
+    purpose.add_task(GetItemTask(wood), terminal_groups="wood")
+    check.equal(
+        reachability.solvable_tasks(purpose),
+        {
+            purpose.tasks[0]: True,
+            purpose.tasks[1]: False,
+            purpose.tasks[2]: True,
+        },
+    )
+    check.equal(reachability.purpose_lower_bound(purpose), 1)
+
+
+def test_consumption_alone_satisfies_linear_constraint():
+    apple, seed, sapling, tree = (
+        Item("apple"),
+        Item("seed"),
+        Item("sapling"),
+        Item("tree"),
+    )
+    transformations = [
+        Transformation("eat apple", inventory_changes=[Use(PLAYER, apple, consume=1)]),
+        Transformation(inventory_changes=[Yield(PLAYER, seed)]),
+        Transformation(
+            inventory_changes=[Use(PLAYER, seed, consume=1), Yield(PLAYER, sapling)]
+        ),
+        Transformation(
+            inventory_changes=[Use(PLAYER, sapling, consume=1), Yield(PLAYER, tree)]
+        ),
+    ]
+    world = world_from_transformations(transformations, start_items=[Stack(apple)])
+    reachability = analyze_reachability(world)
+
+    no_apple = LinearConstraint([Term(1, tree), Term(-1, apple)], threshold=0)
+    check.equal(
+        reachability.task_lower_bound(LinearConstraintsTask("no apple", [no_apple])),
+        1,
+    )
+    tree_and_no_apple = LinearConstraint([Term(1, tree), Term(-1, apple)], threshold=2)
+    check.equal(
+        reachability.task_lower_bound(
+            LinearConstraintsTask("tree and no apple", [tree_and_no_apple])
+        ),
+        3,
+    )
@@ -6,7 +6,14 @@ import pytest
 import pytest_check as check
 
 from hcraft.elements import Item, Stack, Zone
-from hcraft.task import GetItemTask, GoToZoneTask, PlaceItemTask
+from hcraft.task import (
+    GetItemTask,
+    GoToZoneTask,
+    LinearConstraint,
+    LinearConstraintsTask,
+    PlaceItemTask,
+    Term,
+)
 from hcraft.world import World
 from tests.custom_checks import check_np_equal
 
@@ -158,3 +165,66 @@ class TestPlaceItem:
         check.equal(self.task.reward(state), 5)
         self.task.terminated = True
         check.equal(self.task.reward(state), 0)
+
+
+class TestLinearConstraints:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        self.world = simple_world()
+        self.wood, self.plank = Item("wood"), Item("plank")
+        self.start, self.other_zone = Zone("start"), Zone("other_zone")
+        self.table = Item("table")
+        self.more_planks = LinearConstraint(
+            [Term(1, self.plank), Term(-1, self.wood)], threshold=2
+        )
+        self.few_tables = LinearConstraint(
+            [Term(1, self.table, self.start), Term(1, self.table, self.other_zone)],
+            threshold=1,
+            at_most=True,
+        )
+        self.in_other_zone = LinearConstraint([Term(1, zone=self.other_zone)], 1)
+
+    def _state(self, wood: int, plank: int, tables: int, in_other_zone: bool):
+        zones_inventories = np.zeros((2, 3), dtype=np.int32)
+        zones_inventories[0, 1] = tables
+        return DummyState(
+            player_inventory=np.array([0, wood, 0, plank]),
+            position=np.array([0, 1]) if in_other_zone else np.array([1, 0]),
+            zones_inventories=zones_inventories,
+        )
+
+    def test_build(self):
+        """should build one row of coefficients per constraint."""
+        task = LinearConstraintsTask("task", [self.more_planks, self.few_tables])
+        task.build(self.world)
+        check_np_equal(
+            task._terminate_player_items, np.array([[0, -1, 0, 1], [0, 0, 0, 0]])
+        )
+        check_np_equal(task._terminate_zones_items[1, :, 1], np.array([-1, -1]))
+        check_np_equal(task._thresholds, np.array([2, -1]))
+
+    def test_terminate_all(self):
+        """should terminate only when all constraints hold."""
+        task = LinearConstraintsTask("task", [self.more_planks, self.few_tables])
+        task.build(self.world)
+        check.is_false(task.is_terminal(self._state(1, 2, 0, False)))
+        check.is_false(task.is_terminal(self._state(1, 3, 2, False)))
+        check.is_true(task.is_terminal(self._state(1, 3, 1, False)))
+
+    def test_terminate_any(self):
+        """should terminate when any constraint holds."""
+        task = LinearConstraintsTask(
+            "task", [self.more_planks, self.in_other_zone], any_constraint=True
+        )
+        task.build(self.world)
+        check.is_false(task.is_terminal(self._state(1, 2, 0, False)))
+        check.is_true(task.is_terminal(self._state(0, 0, 0, True)))
+        task.reset()
+        check.is_true(task.is_terminal(self._state(0, 2, 0, False)))
+
+    def test_invalid(self):
+        """should need constraints and terms referring to an element."""
+        with pytest.raises(ValueError):
+            LinearConstraintsTask("task", [])
+        with pytest.raises(ValueError):
+            Term(1)
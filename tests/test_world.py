@@ -3,6 +3,7 @@ import pytest_check as check
 
 from hcraft.elements import Item, Zone
 from hcraft.world import World
+from tests.envs import classic_env
 
 
 class TestWorld:
@@ -29,3 +30,52 @@ class TestWorld:
     def test_slot_from_zoneitem(self):
         zone_3 = self.zones_items[1]
         check.equal(self.world.slot_from_zoneitem(zone_3), 1)
+
+
+class TestWorldTransformationsIndexes:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        (
+            _env,
+            self.world,
+            self.named_transformations,
+            self.start_zone,
+            self.items,
+            self.zones,
+            self.zones_items,
+        ) = classic_env()
+
+    def test_producers(self):
+        wood, _stone, plank = self.items
+        check.equal(
+            self.world.producers(wood), [self.named_transformations["search_wood"]]
+        )
+        check.equal(
+            self.world.producers(plank), [self.named_transformations["craft_plank"]]
+        )
+
+    def test_consumers_and_requirers(self):
+        wood, _stone, plank = self.items
+        expected = [
+            self.named_transformations["craft_plank"],
+            self.named_transformations["build_house"],
+        ]
+        check.equal(self.world.consumers(wood), expected)
+        check.equal(self.world.requirers(wood), expected)
+        check.equal(self.world.consumers(Item("unknown")), [])
+
+    def test_zone_item_producers(self):
+        table, _wood_house = self.zones_items
+        check.equal(
+            self.world.zone_item_producers(table),
+            [self.named_transformations["craft_table"]],
+        )
+        check.equal(self.world.zone_item_consumers(table), [])
+
+    def test_entering(self):
+        _start_zone, other_zone = self.zones
+        check.equal(
+            self.world.entering(other_zone),
+            [self.named_transformations["move_to_other_zone"]],
+        )
+        check.equal(self.world.entering(self.start_zone), [])